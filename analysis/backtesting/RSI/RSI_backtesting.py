@@ -1,95 +1,37 @@
-import json
 import os
+import sys
 
-# Path to enriched data (update as needed)
-ENRICHED_DATA_PATH = os.path.join(os.path.dirname(__file__), '../../../historical_data_327_enriched.json')
 BACKTEST_DIR = os.path.dirname(__file__)
+PROJECT_ROOT = os.path.abspath(os.path.join(BACKTEST_DIR, '../../..'))
+ITEM_ID = 327
 
-RSI_PERIODS = [7, 14]  # Use the periods present in your enriched data
-RSI_BUY = 30
-RSI_SELL = 70
+sys.path.insert(0, PROJECT_ROOT)
+from utils.backtest_kernel import equity_records
+from utils.results_store import ResultsStore, run_record
+from utils.strategies import (
+    RSI_BUY, RSI_SELL, RSIThreshold, StrategyEngine, print_backtest_summary, save_json, summarize
+)
 
-def load_enriched_data(path=ENRICHED_DATA_PATH):
-    with open(path, 'r') as f:
-        return json.load(f)
+RSI_PERIODS = [7, 14]
 
-def get_rsi(row, period):
-    return row['indicators']['rsi'].get(str(period))
+def load_indicator_data(item_id=ITEM_ID, provider=None):
+    """Compute the RSI columns this backtest needs from the raw item history."""
+    return StrategyEngine(provider).bars(item_id, [RSIThreshold(period) for period in RSI_PERIODS])
 
 def run_rsi_backtest(data, period, buy_level=RSI_BUY, sell_level=RSI_SELL):
-    position = None
-    entry_price = 0
-    trades = []
-    cumulative = 0
-    equity_curve = []
-    for row in data:
-        rsi = get_rsi(row, period)
-        price = row['price']
-        date = row['date']
-        if rsi is None or price is None:
-            equity_curve.append({'date': date, 'equity': cumulative if position is None else cumulative + (price - entry_price)})
-            continue
-        # Buy signal
-        if position is None and rsi < buy_level:
-            position = 'long'
-            entry_price = price
-            entry_date = date
-        # Sell signal
-        elif position == 'long' and rsi > sell_level:
-            exit_price = price
-            exit_date = date
-            profit = exit_price - entry_price
-            trades.append({
-                'entry_date': entry_date,
-                'entry_price': entry_price,
-                'exit_date': exit_date,
-                'exit_price': exit_price,
-                'profit': profit
-            })
-            cumulative += profit
-            position = None
-        equity_curve.append({'date': date, 'equity': cumulative if position is None else cumulative + (price - entry_price)})
-    # Close any open position at the end
-    if position == 'long':
-        exit_price = data[-1]['price']
-        exit_date = data[-1]['date']
-        profit = exit_price - entry_price
-        trades.append({
-            'entry_date': entry_date,
-            'entry_price': entry_price,
-            'exit_date': exit_date,
-            'exit_price': exit_price,
-            'profit': profit
-        })
-        cumulative += profit
-    # Add cumulative profit to each trade
-    running = 0
-    for trade in trades:
-        running += trade['profit']
-        trade['cumulative_profit'] = running
-    total_profit = running
-    return trades, total_profit, equity_curve
-
-def save_json(data, filename):
-    with open(filename, 'w') as f:
-        json.dump(data, f, indent=2)
-
-def print_backtest_summary(period, trades, total_profit):
-    print(f"\nRSI Period: {period}")
-    print(f"Number of trades: {len(trades)}")
-    print(f"Total profit: {total_profit:.2f}")
-    if trades:
-        print(f"First trade: {trades[0]}")
-        print(f"Last trade: {trades[-1]}")
+    """Returns (trades, total_profit, equity array) for BarArrays or enriched-style rows."""
+    return RSIThreshold(period, buy_level, sell_level).backtest(data)
 
 def main():
-    data = load_enriched_data()
+    data = load_indicator_data()
     summary = []
+    records = []
     for period in RSI_PERIODS:
         trades, total_profit, equity_curve = run_rsi_backtest(data, period)
         save_json(trades, os.path.join(BACKTEST_DIR, f'trades_rsi_{period}.json'))
-        save_json(equity_curve, os.path.join(BACKTEST_DIR, f'equity_curve_rsi_{period}.json'))
-        print_backtest_summary(period, trades, total_profit)
+        save_json(equity_records(data.dates, equity_curve, trades),
+                  os.path.join(BACKTEST_DIR, f'equity_curve_rsi_{period}.json'))
+        print_backtest_summary(f"RSI Period: {period}", trades, total_profit)
         summary.append({
             'rsi_period': period,
             'num_trades': len(trades),
@@ -97,7 +39,11 @@ def main():
             'first_trade': trades[0] if trades else None,
             'last_trade': trades[-1] if trades else None
         })
+        records.append(run_record('RSI_backtesting', RSIThreshold.name, ITEM_ID, RSIThreshold(period).params,
+                                  summarize(trades, total_profit, equity_curve, data.dates), trades))
     save_json(summary, os.path.join(BACKTEST_DIR, 'rsi_summary.json'))
+    with ResultsStore() as store:
+        store.add_runs(records)
 
 if __name__ == "__main__":
     main()
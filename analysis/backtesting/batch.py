@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import sweep
+from sweep import PROJECT_ROOT
+
+sys.path.insert(0, PROJECT_ROOT)
+from utils.bulk_snapshot import BulkSnapshot, MISSING
+from utils.indicator_cache import DEFAULT_CACHE_DIR, IndicatorCache
+from utils.indicator_provider import IndicatorProvider
+from utils.metrics import rank
+from utils.price_db import PriceDatabase
+from utils.results_store import DEFAULT_RESULTS_PATH, METRIC_COLUMNS, ResultsStore, run_record
+from utils.strategies import STRATEGIES, StrategyEngine, expand_grid, make_strategy
+
+BULK_DATA_PATH = os.path.join(PROJECT_ROOT, 'osrs_bulk_data.json')
+OUTPUT_PATH = os.path.join(sweep.BACKTEST_DIR, 'batch_leaderboard.json')
+
+# Configs every worker runs against each item, its database connection, indicator cache
+# and results shard, set once by _init_worker
+_CONFIGS = None
+_DATABASE = None
+_CACHE = None
+_STORE = None
+
+def _init_worker(configs, db_path=None, cache_dir=None, results_path=None, owner=None):
+    global _CONFIGS, _DATABASE, _CACHE, _STORE
+    _CONFIGS = configs
+    _DATABASE = PriceDatabase(db_path) if db_path else None
+    _CACHE = IndicatorCache(cache_dir=cache_dir)
+    _STORE = ResultsStore.shard(results_path, owner) if results_path else None
+
+def select_items(bulk_path=BULK_DATA_PATH, members=None, min_limit=None, min_price=None, max_price=None, max_items=None):
+    """Pick catalogue item ids from the bulk dump, filtered by members flag, GE buy limit and price band."""
+    columns = BulkSnapshot.from_file(bulk_path).columns
+    mask = np.ones(len(columns['id']), dtype=bool)
+    if members is not None:
+        mask &= columns['members'] == members
+    if min_limit is not None:
+        mask &= columns['limit'] >= min_limit
+    if min_price is not None:
+        mask &= (columns['price'] != MISSING) & (columns['price'] >= min_price)
+    if max_price is not None:
+        mask &= (columns['price'] != MISSING) & (columns['price'] <= max_price)
+    selected = np.sort(columns['id'][mask]).tolist()
+    return selected[:max_items] if max_items else selected
+
+def run_item(item_id):
+    """Backtest every config on one item; only this item's history is held in memory."""
+    engine = StrategyEngine(IndicatorProvider(database=_DATABASE, cache=_CACHE))
+    if not engine.provider.has_history(item_id):
+        return []
+    strategies = [make_strategy(strategy, **params) for strategy, params in _CONFIGS]
+    rows = engine.run(item_id, strategies, with_trades=_STORE is not None)
+    if _STORE is not None:
+        _STORE.add_runs([run_record('batch', strategy.name, item_id, strategy.params,
+                                    {key: row[key] for key in METRIC_COLUMNS}, row.pop('trades'))
+                         for strategy, row in zip(strategies, rows)])
+    return rows
+
+def run_batch(item_ids, configs, workers=None, rank_by='total_profit', chunksize=None, db_path=None,
+              cache_dir=None, results_path=None):
+    """Run configs over many items in parallel; returns (all results, per-item leaderboard).
+
+    With ``db_path`` each worker reads histories through its own ``PriceDatabase``;
+    with ``cache_dir`` indicator columns are reused from (and saved to) disk;
+    with ``results_path`` every run is recorded in that ``ResultsStore``
+    through per-worker shards merged at the end.
+    """
+    item_ids = list(item_ids)
+    configs = list(configs)
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(item_ids) // (workers * 8))
+    initargs = (configs, db_path, cache_dir, results_path, os.getpid())
+    if workers == 1:
+        _init_worker(*initargs)
+        rows = [row for item_id in item_ids for row in run_item(item_id)]
+        if _STORE is not None:
+            _STORE.close()
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as executor:
+            rows = [row for item_rows in executor.map(run_item, item_ids, chunksize=chunksize) for row in item_rows]
+    if results_path:
+        with ResultsStore(results_path) as store:
+            store.merge_shards()
+    results = pd.DataFrame(rows)
+    if results.empty:
+        return results, results
+    results = results.iloc[rank(results, rank_by)].reset_index(drop=True)
+    # Best config per item, items ordered by that config's score
+    leaderboard = results.drop_duplicates('item_id', keep='first').reset_index(drop=True)
+    return results, leaderboard
+
+def main():
+    parser = argparse.ArgumentParser(description='Run strategy backtests across the GE catalogue.')
+    parser.add_argument('--strategies', nargs='+', default=list(STRATEGIES), choices=list(STRATEGIES))
+    parser.add_argument('--items', nargs='+', type=int, help='Explicit item ids (default: filtered bulk catalogue)')
+    parser.add_argument('--members', choices=['yes', 'no'], default=None)
+    parser.add_argument('--min-limit', type=int, default=None)
+    parser.add_argument('--min-price', type=int, default=None)
+    parser.add_argument('--max-price', type=int, default=None)
+    parser.add_argument('--max-items', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--rank-by', default='total_profit')
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--db', default=None, help='Load histories from a price database (SQLite path or postgresql:// DSN)')
+    parser.add_argument('--cache', action='store_true', help=f'Reuse indicator columns saved in {DEFAULT_CACHE_DIR}')
+    parser.add_argument('--results', nargs='?', const=DEFAULT_RESULTS_PATH, default=None,
+                        help=f'Also record every run in a results database (default: {DEFAULT_RESULTS_PATH})')
+    args = parser.parse_args()
+
+    if args.items:
+        item_ids = args.items
+    else:
+        members = None if args.members is None else args.members == 'yes'
+        item_ids = select_items(members=members, min_limit=args.min_limit, min_price=args.min_price,
+                                max_price=args.max_price, max_items=args.max_items)
+    configs = [config for strategy in args.strategies for config in expand_grid(strategy)]
+    print(f"Running {len(configs)} configs over {len(item_ids)} items")
+
+    cache_dir = DEFAULT_CACHE_DIR if args.cache else None
+    results, leaderboard = run_batch(item_ids, configs, workers=args.workers, rank_by=args.rank_by,
+                                     db_path=args.db, cache_dir=cache_dir, results_path=args.results)
+    if leaderboard.empty:
+        print("No items with price history found.")
+        return
+    print(f"{leaderboard['item_id'].nunique()} items had price history")
+    print(leaderboard.head(args.top).to_string())
+
+    records = [{k: v for k, v in row.items() if not pd.isna(v)} for row in leaderboard.to_dict(orient='records')]
+    with open(OUTPUT_PATH, 'w') as f:
+        json.dump(records, f, indent=2)
+    print(f"\nSaved: {OUTPUT_PATH}")
+    if args.results:
+        print(f"Recorded {len(results)} runs in {args.results}")
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,10 @@
 import json
 import os
+import sys
 
-ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+from utils.results_store import DEFAULT_RESULTS_PATH, ResultsStore
 
 PATHS = {
     'dual_ma': os.path.join(ROOT, 'analysis/backtesting/dual_MA_crossover/ma_crossover_summary.json'),
@@ -10,7 +13,20 @@ PATHS = {
     'bollinger': os.path.join(ROOT, 'analysis/backtesting/bollinger-bands/bollinger_summary.json'),
 }
 
+# The results store source each summary above comes from
+SOURCES = {
+    'dual_ma': 'dual_ma_crossover_backtest',
+    'single_ma': 'single_ma_backtest',
+    'rsi': 'RSI_backtesting',
+    'bollinger': 'bollinger_bands_bt',
+}
+ITEM_ID = 327
+
 OUTPUT_PATH = os.path.join(ROOT, 'analysis/backtesting/best_strategies_summary.json')
+# Written by walk_forward.py: out-of-sample totals of parameters re-optimized per fold
+WALK_FORWARD_PATH = os.path.join(ROOT, 'analysis/backtesting/walk_forward_summary.json')
+# Filled by the strategy scripts, and by sweep.py / batch.py with --results
+RESULTS_PATH = DEFAULT_RESULTS_PATH
 
 
 def load_json(path: str):
@@ -26,7 +42,33 @@ def best_by_total_profit(entries, key='total_profit'):
     return max(entries, key=lambda x: x.get(key, float('-inf')))
 
 
+def compute_best_from_store(results_path=RESULTS_PATH, by='total_profit', item_id=ITEM_ID):
+    """Same layout as compute_best, from indexed queries on the results database.
+
+    Only the strategy scripts' own runs on ``item_id`` count, the runs their
+    summaries hold, not sweep or batch runs over other items.
+    """
+    results = {}
+    with ResultsStore(results_path) as store:
+        for strategy, source in SOURCES.items():
+            best = store.best_per_strategy(by, item_id=item_id, source=source).get(strategy)
+            if best is not None:
+                results[strategy] = {'best': best[0], 'total_configs': best[1]}
+    candidates = [(strategy, data['best']) for strategy, data in results.items()]
+    overall = None
+    if candidates:
+        strategy, row = max(candidates, key=lambda x: x[1].get(by, float('-inf')))
+        overall = {'strategy': strategy, 'config': row}
+    results['overall_best_by_total_profit'] = overall
+    return results
+
+
 def compute_best():
+    if os.path.exists(RESULTS_PATH):
+        results = compute_best_from_store()
+        # A store holding only sweep/batch runs falls back to the summaries
+        if results['overall_best_by_total_profit'] is not None:
+            return add_walk_forward(results)
     results = {}
 
     # Dual MA crossover
@@ -79,6 +121,15 @@ def compute_best():
             'config': best,
         }
     results['overall_best_by_total_profit'] = overall
+    return add_walk_forward(results)
+
+
+def add_walk_forward(results):
+    # The maxima above are in-sample; prefer the walk-forward ranking when it has been run
+    walk_forward = load_json(WALK_FORWARD_PATH)
+    if walk_forward:
+        results['walk_forward'] = walk_forward
+        results['overall_best_out_of_sample'] = best_by_total_profit(walk_forward['per_strategy'], 'oos_total_profit')
     return results
 
 
@@ -95,6 +146,11 @@ def main():
         print(f"- {strat}: total_configs={data['total_configs']}, best_total_profit={tp}, best={best}")
     print("\nOverall best:")
     print(results.get('overall_best_by_total_profit'))
+    if 'overall_best_out_of_sample' in results:
+        print("\nOverall best out-of-sample (walk-forward):")
+        print(results['overall_best_out_of_sample'])
+    else:
+        print("\nRun walk_forward.py for out-of-sample results; the figures above are in-sample.")
 
     # Save JSON
     with open(OUTPUT_PATH, 'w') as f:
@@ -0,0 +1,93 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+import sweep
+from sweep import PROJECT_ROOT, ITEM_ID
+
+sys.path.insert(0, PROJECT_ROOT)
+from utils.indicator_cache import DEFAULT_CACHE_DIR, IndicatorCache
+from utils.indicator_provider import IndicatorProvider
+from utils.metrics import rank
+from utils.monte_carlo import DEFAULT_BLOCK_SIZE, DEFAULT_PATHS, METHODS, robustness_summary, run_monte_carlo
+from utils.price_db import PriceDatabase
+from utils.strategies import STRATEGIES, expand_grid, make_strategy
+
+OUTPUT_PATH = os.path.join(sweep.BACKTEST_DIR, 'robustness_results.json')
+
+def config_label(strategy, params):
+    return f"{strategy}(" + ', '.join(f"{key}={value}" for key, value in params.items()) + ")"
+
+def run_robustness(data, configs, n_paths=DEFAULT_PATHS, method='bootstrap', block_size=DEFAULT_BLOCK_SIZE,
+                   seed=0, workers=None):
+    """Backtest every config once, then resample each one's trades ``n_paths`` times.
+
+    Returns one row per config: strategy, params, observed trade count and
+    profit, and the resampled distribution of each metric.
+    """
+    configs = list(configs)
+    trades = {}
+    for strategy, params in configs:
+        trades[config_label(strategy, params)] = make_strategy(strategy, **params).backtest(data)[0]
+    trade_profits = {label: [t['profit'] for t in config_trades] for label, config_trades in trades.items()}
+    metrics = run_monte_carlo(trade_profits, n_paths, method, block_size, seed, workers)
+    return [{'strategy': strategy, **params, **robustness_summary(trades[label], metrics[label])}
+            for (strategy, params), label in zip(configs, trades)]
+
+def to_frame(rows):
+    """Flatten each metric's distribution into columns like ``total_profit_p5``."""
+    flat = []
+    for row in rows:
+        record = {}
+        for key, value in row.items():
+            if isinstance(value, dict):
+                record.update({f"{key}_{stat}": stat_value for stat, stat_value in value.items()})
+            else:
+                record[key] = value
+        flat.append(record)
+    return pd.DataFrame(flat)
+
+def main():
+    parser = argparse.ArgumentParser(description='Monte Carlo / bootstrap robustness of the backtest strategies.')
+    parser.add_argument('--strategies', nargs='+', default=list(STRATEGIES), choices=list(STRATEGIES))
+    parser.add_argument('--item', type=int, default=ITEM_ID)
+    parser.add_argument('--paths', type=int, default=DEFAULT_PATHS)
+    parser.add_argument('--method', choices=METHODS, default='bootstrap')
+    parser.add_argument('--block-size', type=int, default=DEFAULT_BLOCK_SIZE, help="Trades per block for --method block")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--rank-by', default='total_profit_p5', help='Column to sort by, e.g. total_profit_p5 or prob_loss')
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--db', default=None, help='Load history from a price database (SQLite path or postgresql:// DSN)')
+    parser.add_argument('--cache', action='store_true', help=f'Reuse indicator columns saved in {DEFAULT_CACHE_DIR}')
+    parser.add_argument('--output', default=OUTPUT_PATH, help='Where to save the per-config results JSON')
+    args = parser.parse_args()
+
+    configs = [config for strategy in args.strategies for config in expand_grid(strategy)]
+    database = PriceDatabase(args.db) if args.db else None
+    cache = IndicatorCache(cache_dir=DEFAULT_CACHE_DIR if args.cache else None)
+    data = IndicatorProvider(database=database, cache=cache).bars(args.item, sweep.required_indicators(configs))
+    print(f"Resampling {len(configs)} configs x {args.paths} paths ({args.method})")
+
+    start = time.perf_counter()
+    rows = run_robustness(data, configs, args.paths, args.method, args.block_size, args.seed, args.workers)
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+
+    table = to_frame(rows)
+    table = table.iloc[rank(table, args.rank_by)].reset_index(drop=True)
+    param_columns = list(dict.fromkeys(key for _, params in configs for key in params))
+    columns = ['strategy'] + param_columns + ['num_trades', 'observed_total_profit', 'total_profit_p5',
+                                              'total_profit_p50', 'total_profit_p95', 'max_drawdown_p50',
+                                              'max_drawdown_p95', 'win_rate_p50', 'prob_loss']
+    print(table[columns].head(args.top).to_string())
+
+    with open(args.output, 'w') as f:
+        json.dump(rows, f, indent=2)
+    print(f"\nSaved: {args.output}")
+
+if __name__ == '__main__':
+    main()
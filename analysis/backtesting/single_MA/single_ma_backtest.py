@@ -1,130 +1,38 @@
-import json
 import os
+import sys
 
-# Path to enriched data (update as needed)
-# From analysis/backtesting/single_MA to project root is ../../../
-ENRICHED_DATA_PATH = os.path.join(os.path.dirname(__file__), '../../../historical_data_327_enriched.json')
 BACKTEST_DIR = os.path.dirname(__file__)
+PROJECT_ROOT = os.path.abspath(os.path.join(BACKTEST_DIR, '../../..'))
+ITEM_ID = 327
 
-MA_PERIODS = [5, 7, 14, 20, 90, 180, 365]
+sys.path.insert(0, PROJECT_ROOT)
+from utils.backtest_kernel import equity_records
+from utils.results_store import ResultsStore, run_record
+from utils.strategies import MA_PERIODS, SingleMA, StrategyEngine, print_backtest_summary, save_json, summarize
 
-def load_enriched_data(path=ENRICHED_DATA_PATH):
-    """Load enriched historical data from JSON file."""
-    with open(path, 'r') as f:
-        return json.load(f)
-
-def get_ma(row, period):
-    """Get moving average for a given period from a row. Returns None if not present."""
-    return row['indicators']['ma'].get(str(period))
-
-def get_rsi(row, period):
-    """Get RSI for a given period from a row. Returns None if not present."""
-    return row['indicators']['rsi'].get(str(period))
-
-def get_macd(row):
-    """Get MACD value from a row. Returns None if not present."""
-    return row['indicators']['macd'].get('macd')
-
-def get_bollinger(row, period):
-    """Get Bollinger Bands (upper, lower) for a given period. Returns (None, None) if not present."""
-    b = row['indicators']['bollinger'].get(str(period), {})
-    return b.get('upper'), b.get('lower')
-
-# Example signal function (to be expanded)
-def ma_signal(row, period):
-    ma = get_ma(row, period)
-    price = row['price']
-    if ma is None or price is None:
-        return None  # Not enough data
-    return 1 if price > ma else -1  # Example: 1=buy, -1=sell
+def load_indicator_data(item_id=ITEM_ID, provider=None):
+    """Compute the MA columns this backtest needs from the raw item history."""
+    return StrategyEngine(provider).bars(item_id, [SingleMA(period) for period in MA_PERIODS])
 
 def run_single_ma_backtest(data, period):
-    position = None  # None = out, 'long' = in
-    entry_price = 0
-    trades = []
-    prev_price = None
-    prev_ma = None
-    cumulative = 0
-    equity_curve = []
-    for row in data:
-        price = row['price']
-        ma = get_ma(row, period)
-        date = row['date']
-        if price is None or ma is None:
-            equity_curve.append({'date': date, 'equity': cumulative if position is None else cumulative + (price - entry_price)})
-            prev_price, prev_ma = price, ma
-            continue
-        # Detect crossover
-        if prev_price is not None and prev_ma is not None:
-            # Price crosses above MA (buy signal)
-            if position is None and prev_price < prev_ma and price > ma:
-                position = 'long'
-                entry_price = price
-                entry_date = date
-            # Price crosses below MA (sell signal)
-            elif position == 'long' and prev_price > prev_ma and price < ma:
-                exit_price = price
-                exit_date = date
-                profit = exit_price - entry_price
-                trades.append({
-                    'entry_date': entry_date,
-                    'entry_price': entry_price,
-                    'exit_date': exit_date,
-                    'exit_price': exit_price,
-                    'profit': profit
-                })
-                cumulative += profit
-                position = None
-        equity_curve.append({'date': date, 'equity': cumulative if position is None else cumulative + (price - entry_price)})
-        prev_price, prev_ma = price, ma
-    # Close any open position at the end
-    if position == 'long':
-        exit_price = data[-1]['price']
-        exit_date = data[-1]['date']
-        profit = exit_price - entry_price
-        trades.append({
-            'entry_date': entry_date,
-            'entry_price': entry_price,
-            'exit_date': exit_date,
-            'exit_price': exit_price,
-            'profit': profit
-        })
-        cumulative += profit
-        # Record final day equity already covered in loop for last row; leave as is
-    # Add cumulative profit to each trade
-    running = 0
-    for trade in trades:
-        running += trade['profit']
-        trade['cumulative_profit'] = running
-    total_profit = running
-    return trades, total_profit, equity_curve
-
-def print_backtest_summary(period, trades, total_profit):
-    print(f"\nMA Period: {period}")
-    print(f"Number of trades: {len(trades)}")
-    print(f"Total profit: {total_profit:.2f}")
-    if trades:
-        print(f"First trade: {trades[0]}")
-        print(f"Last trade: {trades[-1]}")
+    """Returns (trades, total_profit, equity array) for BarArrays or enriched-style rows."""
+    return SingleMA(period).backtest(data)
 
 def save_trades_json(trades, period):
-    filename = os.path.join(BACKTEST_DIR, f"trades_ma_{period}.json")
-    with open(filename, 'w') as f:
-        json.dump(trades, f, indent=2)
+    save_json(trades, os.path.join(BACKTEST_DIR, f"trades_ma_{period}.json"))
 
 def save_equity_curve_json(equity_curve, period):
-    filename = os.path.join(BACKTEST_DIR, f"equity_curve_ma_{period}.json")
-    with open(filename, 'w') as f:
-        json.dump(equity_curve, f, indent=2)
+    save_json(equity_curve, os.path.join(BACKTEST_DIR, f"equity_curve_ma_{period}.json"))
 
 def main():
-    data = load_enriched_data()
+    data = load_indicator_data()
     summary = []
+    records = []
     for period in MA_PERIODS:
         trades, total_profit, equity_curve = run_single_ma_backtest(data, period)
-        print_backtest_summary(period, trades, total_profit)
+        print_backtest_summary(f"MA Period: {period}", trades, total_profit)
         save_trades_json(trades, period)
-        save_equity_curve_json(equity_curve, period)
+        save_equity_curve_json(equity_records(data.dates, equity_curve, trades), period)
         summary.append({
             'ma_period': period,
             'num_trades': len(trades),
@@ -132,10 +40,11 @@ def main():
             'first_trade': trades[0] if trades else None,
             'last_trade': trades[-1] if trades else None
         })
-    # Save summary JSON
-    summary_path = os.path.join(BACKTEST_DIR, 'ma_summary.json')
-    with open(summary_path, 'w') as f:
-        json.dump(summary, f, indent=2)
+        records.append(run_record('single_ma_backtest', SingleMA.name, ITEM_ID, SingleMA(period).params,
+                                  summarize(trades, total_profit, equity_curve, data.dates), trades))
+    save_json(summary, os.path.join(BACKTEST_DIR, 'ma_summary.json'))
+    with ResultsStore() as store:
+        store.add_runs(records)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,114 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+BACKTEST_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(BACKTEST_DIR, '../..'))
+OUTPUT_PATH = os.path.join(BACKTEST_DIR, 'sweep_results.json')
+ITEM_ID = 327
+
+sys.path.insert(0, PROJECT_ROOT)
+from utils.backtest_kernel import as_bars
+from utils.indicator_cache import DEFAULT_CACHE_DIR, IndicatorCache
+from utils.indicator_provider import IndicatorProvider
+from utils.metrics import rank
+from utils.price_db import PriceDatabase
+from utils.results_store import DEFAULT_RESULTS_PATH, ResultsStore, run_record
+from utils.strategies import STRATEGIES, expand_grid, make_strategy, summarize
+from utils.strategies import required_indicators as strategy_indicators
+
+# Read-only price arrays for the current worker, its results shard and the item the
+# runs are recorded under, set once by _init_worker
+_DATA = None
+_STORE = None
+_ITEM_ID = None
+
+def _init_worker(data, results_path=None, owner=None, item_id=None):
+    global _DATA, _STORE, _ITEM_ID
+    _DATA = as_bars(data)
+    _STORE = ResultsStore.shard(results_path, owner) if results_path else None
+    _ITEM_ID = item_id
+
+def required_indicators(configs):
+    """Collect the (indicator, period) columns a set of (strategy, params) configs reads."""
+    return strategy_indicators(make_strategy(strategy, **params) for strategy, params in configs)
+
+def run_config(config):
+    strategy, params = config
+    trades, total_profit, equity_curve = make_strategy(strategy, **params).backtest(_DATA)
+    summary = summarize(trades, total_profit, equity_curve, _DATA.dates)
+    if _STORE is not None:
+        _STORE.add_runs([run_record('sweep', strategy, _ITEM_ID, params, summary, trades)])
+    return {'strategy': strategy, **params, **summary}
+
+def run_sweep(data, configs, workers=None, rank_by='total_profit', chunksize=None, results_path=None,
+              item_id=None):
+    """Run every (strategy, params) config across a process pool and return a ranked DataFrame.
+
+    ``data`` is handed to each worker once through the pool initializer (inherited
+    copy-on-write under fork) rather than pickled with every task. With
+    ``results_path`` every run and its trades are also recorded in that
+    ``ResultsStore``: each worker writes its own shard and the shards are
+    merged once the pool is done.
+    """
+    configs = list(configs)
+    if not configs:
+        return pd.DataFrame()
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(configs) // (workers * 4))
+    initargs = (data, results_path, os.getpid(), item_id)
+    if workers == 1:
+        _init_worker(*initargs)
+        rows = [run_config(config) for config in configs]
+        if _STORE is not None:
+            _STORE.close()
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as executor:
+            rows = list(executor.map(run_config, configs, chunksize=chunksize))
+    if results_path:
+        with ResultsStore(results_path) as store:
+            store.merge_shards()
+    table = pd.DataFrame(rows)
+    metric_columns = list(summarize([], 0, [], []))
+    param_columns = [c for c in table.columns if c != 'strategy' and c not in metric_columns]
+    table = table[['strategy'] + param_columns + metric_columns]
+    return table.iloc[rank(table, rank_by)].reset_index(drop=True)
+
+def main():
+    parser = argparse.ArgumentParser(description='Parallel parameter sweep over the backtest strategies.')
+    parser.add_argument('--strategies', nargs='+', default=list(STRATEGIES), choices=list(STRATEGIES))
+    parser.add_argument('--item', type=int, default=ITEM_ID)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--rank-by', default='total_profit')
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--db', default=None, help='Load history from a price database (SQLite path or postgresql:// DSN)')
+    parser.add_argument('--cache', action='store_true', help=f'Reuse indicator columns saved in {DEFAULT_CACHE_DIR}')
+    parser.add_argument('--results', nargs='?', const=DEFAULT_RESULTS_PATH, default=None,
+                        help=f'Also record every run in a results database (default: {DEFAULT_RESULTS_PATH})')
+    args = parser.parse_args()
+
+    configs = [config for strategy in args.strategies for config in expand_grid(strategy)]
+    database = PriceDatabase(args.db) if args.db else None
+    cache = IndicatorCache(cache_dir=DEFAULT_CACHE_DIR if args.cache else None)
+    data = IndicatorProvider(database=database, cache=cache).bars(args.item, required_indicators(configs))
+    print(f"Running {len(configs)} configs across {args.workers or os.cpu_count()} workers")
+
+    table = run_sweep(data, configs, workers=args.workers, rank_by=args.rank_by, results_path=args.results,
+                      item_id=args.item)
+    print(table.head(args.top).to_string())
+
+    # Drop parameters that do not apply to a row's strategy
+    records = [{k: v for k, v in row.items() if not pd.isna(v)} for row in table.to_dict(orient='records')]
+    with open(OUTPUT_PATH, 'w') as f:
+        json.dump(records, f, indent=2)
+    print(f"\nSaved: {OUTPUT_PATH}")
+    if args.results:
+        print(f"Recorded {len(table)} runs in {args.results}")
+
+if __name__ == '__main__':
+    main()
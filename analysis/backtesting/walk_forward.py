@@ -0,0 +1,167 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import sweep
+from sweep import PROJECT_ROOT
+
+sys.path.insert(0, PROJECT_ROOT)
+from utils.indicator_cache import DEFAULT_CACHE_DIR, IndicatorCache
+from utils.indicator_provider import IndicatorProvider
+from utils.metrics import rank
+from utils.price_db import PriceDatabase
+from utils.strategies import STRATEGIES, expand_grid, make_strategy, summarize
+
+OUTPUT_PATH = os.path.join(sweep.BACKTEST_DIR, 'walk_forward_results.json')
+SUMMARY_PATH = os.path.join(sweep.BACKTEST_DIR, 'walk_forward_summary.json')
+ITEM_IDS = [327, 453]
+# Daily bars: two years to fit, the following half year to score
+TRAIN_BARS = 730
+TEST_BARS = 182
+
+# {item_id: BarArrays} over each item's full history, set once per worker by _init_worker
+_BARS = None
+
+def _init_worker(bars):
+    global _BARS
+    _BARS = bars
+
+def walk_forward_folds(n_bars, train_bars=TRAIN_BARS, test_bars=TEST_BARS, step=None, anchored=False):
+    """(train_start, train_stop, test_start, test_stop) for each fold that fits in ``n_bars``.
+
+    Folds advance by ``step`` (default ``test_bars``) so the test windows tile
+    the history after the first train window. With ``anchored`` every train
+    window starts at bar 0 and grows instead of rolling.
+    """
+    step = step or test_bars
+    folds = []
+    train_start, train_stop = 0, train_bars
+    while train_stop + test_bars <= n_bars:
+        folds.append((train_start, train_stop, train_stop, train_stop + test_bars))
+        train_stop += step
+        if not anchored:
+            train_start += step
+    return folds
+
+def run_fold_config(task):
+    """Score one config on one fold's train window and its following test window."""
+    item_id, fold, (train_start, train_stop, test_start, test_stop), strategy, params = task
+    bars = _BARS[item_id]
+    backtest = make_strategy(strategy, **params).backtest
+    train_bars, test_bars = bars.window(train_start, train_stop), bars.window(test_start, test_stop)
+    train = summarize(*backtest(train_bars), train_bars.dates)
+    test = summarize(*backtest(test_bars), test_bars.dates)
+    return {
+        'item_id': item_id, 'fold': fold,
+        'train_start': bars.dates[train_start], 'test_start': bars.dates[test_start],
+        'test_end': bars.dates[test_stop - 1],
+        'strategy': strategy, **params,
+        **{f'train_{k}': v for k, v in train.items()},
+        **{f'test_{k}': v for k, v in test.items()},
+    }
+
+def run_walk_forward(bars, configs, train_bars=TRAIN_BARS, test_bars=TEST_BARS, step=None, anchored=False,
+                     workers=None, chunksize=None):
+    """Evaluate every config on every fold of every item in a process pool.
+
+    ``bars`` maps item_id to ``BarArrays`` computed once over the full
+    history; folds are windows onto those arrays, so overlapping train
+    windows share their indicator columns instead of recomputing them.
+    Returns one row per (item, fold, config) with ``train_*`` and ``test_*``
+    metrics.
+    """
+    configs = list(configs)
+    tasks = [(item_id, fold, window, strategy, params)
+             for item_id, item_bars in bars.items()
+             for fold, window in enumerate(walk_forward_folds(len(item_bars), train_bars, test_bars, step, anchored))
+             for strategy, params in configs]
+    if not tasks:
+        return pd.DataFrame()
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(tasks) // (workers * 4))
+    if workers == 1:
+        _init_worker(bars)
+        rows = [run_fold_config(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(bars,)) as executor:
+            rows = list(executor.map(run_fold_config, tasks, chunksize=chunksize))
+    return pd.DataFrame(rows)
+
+def select_per_fold(results, rank_by='total_profit', by_strategy=True):
+    """The config with the best train-window ``rank_by`` in each fold, with its out-of-sample metrics.
+
+    Grouped per (item, fold, strategy) when ``by_strategy``, otherwise the
+    best config across all strategies per (item, fold).
+    """
+    keys = ['item_id', 'fold'] + (['strategy'] if by_strategy else [])
+    ranked = results.iloc[rank(results, f'train_{rank_by}')]
+    return ranked.drop_duplicates(keys, keep='first').sort_values(keys, kind='stable').reset_index(drop=True)
+
+def summarize_walk_forward(selected, by_strategy=True):
+    """Out-of-sample totals of the re-optimized configs, per item (and strategy)."""
+    keys = ['item_id'] + (['strategy'] if by_strategy else [])
+    summary = selected.groupby(keys, sort=True).agg(
+        folds=('fold', 'count'),
+        oos_total_profit=('test_total_profit', 'sum'),
+        oos_num_trades=('test_num_trades', 'sum'),
+        oos_profitable_folds=('test_total_profit', lambda p: int((p > 0).sum())),
+        oos_worst_fold=('test_total_profit', 'min'),
+        in_sample_total_profit=('train_total_profit', 'sum'),
+    )
+    return summary.reset_index().sort_values('oos_total_profit', ascending=False, kind='stable').reset_index(drop=True)
+
+def _records(table):
+    # Drop parameters that do not apply to a row's strategy
+    return [{k: v for k, v in row.items() if not pd.isna(v)} for row in table.to_dict(orient='records')]
+
+def main():
+    parser = argparse.ArgumentParser(description='Walk-forward parameter optimization of the backtest strategies.')
+    parser.add_argument('--strategies', nargs='+', default=list(STRATEGIES), choices=list(STRATEGIES))
+    parser.add_argument('--items', nargs='+', type=int, default=ITEM_IDS)
+    parser.add_argument('--train-bars', type=int, default=TRAIN_BARS)
+    parser.add_argument('--test-bars', type=int, default=TEST_BARS)
+    parser.add_argument('--step', type=int, default=None, help='Bars between folds (default: --test-bars)')
+    parser.add_argument('--anchored', action='store_true', help='Grow the train window from the first bar instead of rolling it')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--rank-by', default='total_profit')
+    parser.add_argument('--db', default=None, help='Load history from a price database (SQLite path or postgresql:// DSN)')
+    parser.add_argument('--cache', action='store_true', help=f'Reuse indicator columns saved in {DEFAULT_CACHE_DIR}')
+    args = parser.parse_args()
+
+    configs = [config for strategy in args.strategies for config in expand_grid(strategy)]
+    database = PriceDatabase(args.db) if args.db else None
+    cache = IndicatorCache(cache_dir=DEFAULT_CACHE_DIR if args.cache else None)
+    provider = IndicatorProvider(database=database, cache=cache)
+    indicators = sweep.required_indicators(configs)
+    bars = {item_id: provider.bars(item_id, indicators) for item_id in args.items if provider.has_history(item_id)}
+    print(f"Running {len(configs)} configs over {len(bars)} items, "
+          f"{args.train_bars}-bar train / {args.test_bars}-bar test folds")
+
+    results = run_walk_forward(bars, configs, args.train_bars, args.test_bars, args.step, args.anchored,
+                               workers=args.workers)
+    if results.empty:
+        print("No item has enough history for one fold.")
+        return
+    selected = select_per_fold(results, args.rank_by)
+    overall = select_per_fold(results, args.rank_by, by_strategy=False)
+    per_strategy = summarize_walk_forward(selected)
+    per_item = summarize_walk_forward(overall, by_strategy=False)
+
+    print("\nOut-of-sample, re-optimizing each strategy's parameters per fold:")
+    print(per_strategy.to_string())
+    print("\nOut-of-sample, re-optimizing across all strategies per fold:")
+    print(per_item.to_string())
+
+    with open(OUTPUT_PATH, 'w') as f:
+        json.dump({'per_strategy': _records(selected), 'overall': _records(overall)}, f, indent=2)
+    with open(SUMMARY_PATH, 'w') as f:
+        json.dump({'per_strategy': _records(per_strategy), 'overall': _records(per_item)}, f, indent=2)
+    print(f"\nSaved: {OUTPUT_PATH}\nSaved: {SUMMARY_PATH}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,316 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+# Run from the project root: python benchmarks/run_benchmarks.py [--full] [--save-baseline]
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCH_DIR)
+BACKTEST_DIR = os.path.join(PROJECT_ROOT, 'analysis', 'backtesting')
+for strategy_dir in ['single_MA', 'dual_MA_crossover', 'RSI', 'bollinger-bands']:
+    sys.path.insert(0, os.path.join(BACKTEST_DIR, strategy_dir))
+sys.path.insert(0, PROJECT_ROOT)
+
+import single_ma_backtest
+import dual_ma_crossover_backtest
+import RSI_backtesting
+import bollinger_bands_bt
+from utils.backtest_profiles import run_all_profiles
+from utils.bulk_snapshot import BulkSnapshot
+from utils.calculate_indicators import calculate_bollinger_bands, calculate_rsi, stack_prices
+from utils.enrichment import enriched_matrix, nested_json
+from utils.indicator_provider import IndicatorProvider
+from utils.metrics import compute_metrics, rank
+from utils.price_store import PriceStore
+
+DEFAULT_BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+DEFAULT_THRESHOLD = 0.25
+DAY_MS = 86400 * 1000
+START_MS = 1427500800000  # 2015-03-28, where the real histories begin
+
+# Sizes per benchmark unit: the default run takes about a minute, --full covers 1M bars / 5k items
+SIZES = {
+    'bars': [1_000, 10_000],
+    'items': [100, 1_000],
+}
+FULL_SIZES = {
+    'bars': [1_000, 100_000, 1_000_000],
+    'items': [1_000, 5_000],
+}
+
+def synthetic_prices(n_bars, seed=0, start_price=150):
+    """GE-like integer prices: a multiplicative random walk that often sits still, with rare jumps."""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0, 0.02, n_bars)
+    returns[rng.random(n_bars) < 0.3] = 0.0
+    jumps = rng.random(n_bars) < 0.002
+    returns[jumps] += rng.normal(0, 0.2, jumps.sum())
+    prices = start_price * np.exp(np.cumsum(returns))
+    return np.maximum(1, np.round(prices)).astype(np.int64)
+
+def synthetic_history(n_bars, seed=0):
+    prices = synthetic_prices(n_bars, seed)
+    volumes = np.random.default_rng(seed + 1).integers(0, 50_000, n_bars)
+    return [{'timestamp': START_MS + i * DAY_MS, 'price': int(price), 'volume': int(volume)}
+            for i, (price, volume) in enumerate(zip(prices.tolist(), volumes.tolist()))]
+
+class Workspace:
+    """Temporary directory of synthetic history files, written once per size and shared by benchmarks."""
+
+    def __init__(self):
+        self._tmp = tempfile.TemporaryDirectory(prefix='ge-bench-')
+        self.root = self._tmp.name
+        self._written = set()
+
+    def history_file(self, item_id, n_bars):
+        path = os.path.join(self.root, f'historical_data_{item_id}.json')
+        if (item_id, n_bars) not in self._written:
+            with open(path, 'w') as f:
+                json.dump({str(item_id): synthetic_history(n_bars, seed=item_id)}, f)
+            self._written.add((item_id, n_bars))
+        return path
+
+    def bars_item(self, n_bars):
+        """Item id whose history file holds ``n_bars`` bars."""
+        item_id = n_bars
+        self.history_file(item_id, n_bars)
+        return item_id
+
+    def provider(self):
+        return IndicatorProvider(data_dir=self.root, store=PriceStore(os.path.join(self.root, 'store')))
+
+    def bulk_dump(self, n_items):
+        path = os.path.join(self.root, f'bulk_{n_items}.json')
+        if not os.path.exists(path):
+            prices = synthetic_prices(n_items, seed=n_items)
+            dump = {str(i): {'id': i, 'name': f'Item {i}', 'examine': 'A synthetic item.', 'members': bool(i % 2),
+                             'lowalch': 1, 'limit': 100, 'value': 2, 'highalch': 1, 'icon': f'Item {i}.png',
+                             'price': int(price), 'last': int(price), 'volume': i * 7}
+                    for i, price in enumerate(prices.tolist())}
+            dump['%JAGEX_TIMESTAMP%'] = 1733421513
+            dump['%UPDATE_DETECTED%'] = 1733422117.0
+            with open(path, 'w') as f:
+                json.dump(dump, f)
+        return path
+
+    def close(self):
+        self._tmp.cleanup()
+
+# name -> (unit, setup); setup(workspace, size) returns a zero-argument callable to time
+BENCHMARKS = {}
+
+def benchmark(name, unit='bars', sizes=None):
+    def register(setup):
+        BENCHMARKS[name] = (unit, sizes, setup)
+        return setup
+    return register
+
+@benchmark('calculate_bollinger_bands')
+def bench_bollinger(workspace, size):
+    prices = pd.Series(synthetic_prices(size), dtype=float)
+    return lambda: calculate_bollinger_bands(prices, 20)
+
+@benchmark('calculate_rsi')
+def bench_rsi(workspace, size):
+    prices = pd.Series(synthetic_prices(size), dtype=float)
+    return lambda: calculate_rsi(prices, 14)
+
+def backtest_bench(run, indicators, *args):
+    def setup(workspace, size):
+        bars = workspace.provider().bars(workspace.bars_item(size), indicators)
+        return lambda: run(bars, *args)
+    return setup
+
+benchmark('run_single_ma_backtest')(
+    backtest_bench(single_ma_backtest.run_single_ma_backtest, [('ma', 20)], 20))
+benchmark('run_dual_ma_backtest')(
+    backtest_bench(dual_ma_crossover_backtest.run_dual_ma_backtest, [('ma', 14), ('ma', 90)], 14, 90))
+benchmark('run_rsi_backtest')(
+    backtest_bench(RSI_backtesting.run_rsi_backtest, [('rsi', 14)], 14))
+benchmark('run_bollinger_backtest')(
+    backtest_bench(bollinger_bands_bt.run_bollinger_backtest, [('bollinger', 20)], 20))
+
+@benchmark('run_all_profiles', sizes=[1_000, 10_000, 100_000])
+def bench_all_profiles(workspace, size):
+    item_id = workspace.bars_item(size)
+    path = workspace.history_file(item_id, size)
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            run_all_profiles(path, item_id)
+    return run
+
+@benchmark('enrichment_export', sizes=[1_000, 10_000, 100_000])
+def bench_enrichment(workspace, size):
+    """historical_data_<id>_enriched.json in the nested layout: every column computed and written."""
+    provider = workspace.provider()
+    item_id = workspace.bars_item(size)
+    prices, dates = provider.prices(item_id), provider.dates(item_id)
+
+    def run():
+        columns, matrix = enriched_matrix(prices)
+        nested_json(dates, columns, matrix)
+    return run
+
+@benchmark('json_load_history')
+def bench_json_load(workspace, size):
+    path = workspace.history_file(workspace.bars_item(size), size)
+
+    def run():
+        with open(path, 'r') as f:
+            json.load(f)
+    return run
+
+@benchmark('price_store_load')
+def bench_store_load(workspace, size):
+    store = PriceStore(os.path.join(workspace.root, 'store'))
+    item_id = workspace.bars_item(size)
+    if not store.has(item_id):
+        store.import_json(workspace.history_file(item_id, size))
+    return lambda: store.load(item_id).prices.sum()
+
+@benchmark('bulk_snapshot_parse', unit='items')
+def bench_bulk_parse(workspace, size):
+    path = workspace.bulk_dump(size)
+    return lambda: BulkSnapshot.from_file(path)
+
+@benchmark('indicators_per_item', unit='items')
+def bench_indicators_per_item(workspace, size):
+    """Bollinger + RSI for the 14/30/90 windows over many 1k-bar items."""
+    series = [pd.Series(synthetic_prices(1_000, seed=i), dtype=float) for i in range(size)]
+
+    def run():
+        for prices in series:
+            for window in [14, 30, 90]:
+                calculate_bollinger_bands(prices, window)
+                calculate_rsi(prices, window)
+    return run
+
+@benchmark('indicators_batch', unit='items')
+def bench_indicators_batch(workspace, size):
+    """Same work as indicators_per_item as one items x bars call per window."""
+    matrix = stack_prices([synthetic_prices(1_000, seed=i) for i in range(size)])
+
+    def run():
+        for window in [14, 30, 90]:
+            calculate_bollinger_bands(matrix, window)
+            calculate_rsi(matrix, window)
+    return run
+
+@benchmark('metrics_rank', unit='items')
+def bench_metrics_rank(workspace, size):
+    """Risk metrics for many configs' 3,650-bar equity curves, then ranked by Sharpe."""
+    rng = np.random.default_rng(0)
+    equity = np.cumsum(rng.normal(size=(size, 3_650)), axis=1)
+    profits = rng.normal(size=(size, 150))
+    return lambda: rank(compute_metrics(equity, profits), 'sharpe')
+
+def measure(fn, repeat, min_time=0.2):
+    """Best-of-``repeat`` wall time, then one extra run under tracemalloc for peak memory.
+
+    The first call is a warm-up (imports, page cache) and also the only timed
+    run for cases slower than ``min_time``, so the large sizes stay bounded.
+    """
+    start = time.perf_counter()
+    fn()
+    times = [time.perf_counter() - start]
+    if times[0] >= min_time:
+        repeat = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(times[1:] or times), peak
+
+def run_benchmarks(names=None, full=False, repeat=3, min_time=0.2):
+    """Run the registered benchmarks; returns {'name[size]': result dict}."""
+    sizes = FULL_SIZES if full else SIZES
+    workspace = Workspace()
+    results = {}
+    try:
+        for name, (unit, bench_sizes, setup) in BENCHMARKS.items():
+            if names and not any(part in name for part in names):
+                continue
+            for size in sizes[unit]:
+                if bench_sizes is not None and size not in bench_sizes:
+                    continue
+                seconds, peak = measure(setup(workspace, size), repeat, min_time)
+                key = f"{name}[{size}]"
+                results[key] = {
+                    'seconds': seconds,
+                    'throughput': size / seconds if seconds else float('inf'),
+                    'unit': unit,
+                    'peak_mb': peak / 1e6,
+                }
+                print(f"{key:40s} {seconds * 1e3:10.2f} ms {results[key]['throughput']:14,.0f} {unit}/s "
+                      f"{results[key]['peak_mb']:9.1f} MB peak")
+    finally:
+        workspace.close()
+    return results
+
+def compare(results, baseline, threshold):
+    """Return the benchmarks whose time grew by more than ``threshold`` (0.25 = 25%) over the baseline."""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None or not base['seconds']:
+            continue
+        ratio = result['seconds'] / base['seconds']
+        if ratio > 1 + threshold:
+            regressions.append((key, base['seconds'], result['seconds'], ratio))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Time indicators, backtests and ingestion on synthetic GE data.')
+    parser.add_argument('names', nargs='*', help='Only run benchmarks whose name contains one of these')
+    parser.add_argument('--full', action='store_true', help='Include 1M-bar and 5k-item sizes')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Allowed slowdown before failing, as a fraction (default 0.25)')
+    parser.add_argument('--output', help='Also write the results to this JSON file')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.names, full=args.full, repeat=args.repeat)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r') as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\nSaved baseline: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one.")
+        return
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than baseline by more than {args.threshold:.0%}:")
+        for key, base, now, ratio in regressions:
+            print(f"  {key}: {base * 1e3:.2f} ms -> {now * 1e3:.2f} ms ({ratio:.2f}x)")
+        sys.exit(1)
+    print(f"\nNo benchmark slower than baseline by more than {args.threshold:.0%}.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+-- Backtest results store (utils/results_store.py). One row per run in runs,
+-- keyed by a hash of (source, strategy, item_id, params), so recording the same
+-- run again replaces it. Metrics are columns with their own indexes, so
+-- "top N by X where Y < limit" is an index scan rather than a file scan.
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    item_id INTEGER,
+    params TEXT NOT NULL,
+    created_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_runs_strategy_item ON runs (strategy, item_id);
+CREATE INDEX IF NOT EXISTS idx_runs_item ON runs (item_id);
+CREATE INDEX IF NOT EXISTS idx_runs_source ON runs (source);
+
+CREATE TABLE IF NOT EXISTS run_params (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    name TEXT NOT NULL,
+    value NUMERIC,
+    PRIMARY KEY (run_id, name)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_run_params_name_value ON run_params (name, value);
+
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER PRIMARY KEY REFERENCES runs(run_id),
+    num_trades INTEGER NOT NULL,
+    win_rate REAL,
+    profit_factor REAL,
+    avg_profit_per_trade REAL,
+    max_drawdown REAL,
+    total_profit REAL,
+    max_drawdown_duration INTEGER,
+    sharpe REAL,
+    sortino REAL,
+    calmar REAL,
+    exposure REAL
+);
+
+CREATE INDEX IF NOT EXISTS idx_metrics_total_profit ON metrics (total_profit);
+CREATE INDEX IF NOT EXISTS idx_metrics_profit_factor ON metrics (profit_factor);
+CREATE INDEX IF NOT EXISTS idx_metrics_max_drawdown ON metrics (max_drawdown);
+CREATE INDEX IF NOT EXISTS idx_metrics_sharpe ON metrics (sharpe);
+CREATE INDEX IF NOT EXISTS idx_metrics_calmar ON metrics (calmar);
+
+CREATE TABLE IF NOT EXISTS trades (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    trade_no INTEGER NOT NULL,
+    entry_date TEXT NOT NULL,
+    entry_price REAL NOT NULL,
+    exit_date TEXT NOT NULL,
+    exit_price REAL NOT NULL,
+    profit REAL NOT NULL,
+    cumulative_profit REAL NOT NULL,
+    PRIMARY KEY (run_id, trade_no)
+) WITHOUT ROWID;
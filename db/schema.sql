@@ -1,14 +1,20 @@
-CREATE TABLE Items (
-    item_id SERIAL PRIMARY KEY,
+-- PostgreSQL schema. utils/price_db.py applies it (and db/schema_sqlite.sql locally).
+-- Items.item_id is the GE item id, so history and bulk dumps load without a lookup.
+CREATE TABLE IF NOT EXISTS Items (
+    item_id INT PRIMARY KEY,
     name VARCHAR(255) NOT NULL,
     description TEXT,
     icon_url VARCHAR(255)
 );
 
-CREATE TABLE HourlyPrices (
-    id SERIAL PRIMARY KEY,
-    item_id INT REFERENCES Items(item_id),
+-- Range-partitioned by time; yearly partitions (HourlyPrices_YYYY) are created on load.
+-- The (item_id, timestamp) key doubles as the composite index for per-item range scans
+-- and makes reloading the same points a no-op.
+CREATE TABLE IF NOT EXISTS HourlyPrices (
+    id BIGSERIAL,
+    item_id INT NOT NULL REFERENCES Items(item_id),
     timestamp TIMESTAMP NOT NULL,
     price INT NOT NULL,
-    volume INT
-);
+    volume INT,
+    PRIMARY KEY (item_id, timestamp)
+) PARTITION BY RANGE (timestamp);
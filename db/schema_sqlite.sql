@@ -0,0 +1,19 @@
+-- SQLite version of db/schema.sql. SQLite has no declarative partitioning, so
+-- HourlyPrices is a WITHOUT ROWID table clustered on (item_id, timestamp):
+-- each item's history is stored contiguously in time order.
+CREATE TABLE IF NOT EXISTS Items (
+    item_id INTEGER PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    description TEXT,
+    icon_url VARCHAR(255)
+);
+
+CREATE TABLE IF NOT EXISTS HourlyPrices (
+    item_id INTEGER NOT NULL REFERENCES Items(item_id),
+    timestamp TIMESTAMP NOT NULL,
+    price INTEGER NOT NULL,
+    volume INTEGER,
+    PRIMARY KEY (item_id, timestamp)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_hourlyprices_timestamp ON HourlyPrices (timestamp);
@@ -0,0 +1,49 @@
+import json
+import os
+import sys
+import tempfile
+import numpy as np
+
+# Run from the project root: python test/backtest_cache_parity.py
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+from utils.backtest_cache import BacktestCache
+from utils.indicator_provider import IndicatorProvider
+from utils.price_store import PriceStore
+from utils.strategies import STRATEGIES, expand_grid, make_strategy
+
+CUTS = [1, 30, 365]
+
+def provider_for(data_dir, item_id, history):
+    """A provider that reads only ``history``, written as data_dir/historical_data_<id>.json."""
+    with open(os.path.join(data_dir, f'historical_data_{item_id}.json'), 'w') as f:
+        json.dump({str(item_id): history}, f)
+    return IndicatorProvider(data_dir=data_dir, store=PriceStore(os.path.join(data_dir, 'store')))
+
+def check_item(item_id, strategies):
+    """Cached, resumed and fresh backtests must agree exactly after bars are appended."""
+    with open(os.path.join(PROJECT_ROOT, f'historical_data_{item_id}.json')) as f:
+        history = json.load(f)[str(item_id)]
+    for cut in CUTS:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = BacktestCache(os.path.join(tmp, 'cache'))
+            short = provider_for(tmp, item_id, history[:-cut])
+            for strategy in strategies:
+                assert cache.run(short, item_id, strategy)[1] == 'run'
+            full = provider_for(tmp, item_id, history)
+            for strategy in strategies:
+                expected = strategy.backtest(full.bars(item_id, strategy.indicators()))
+                for status in ['resumed', 'hit']:
+                    result, actual_status = cache.run(full, item_id, strategy)
+                    assert actual_status == status, f"{strategy}: {actual_status}, expected {status}"
+                    assert result[0] == expected[0] and result[1] == expected[1], f"{strategy} ({status}): trades differ"
+                    assert np.array_equal(result[2], expected[2]), f"{strategy} ({status}): equity differs"
+    print(f"Item {item_id}: {len(strategies)} configs resume and hit identically after {CUTS} appended bars")
+
+def main():
+    strategies = [make_strategy(strategy, **params) for name in STRATEGIES for strategy, params in expand_grid(name)]
+    for item_id in [327, 453]:
+        check_item(item_id, strategies)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import json
+import os
+import sys
+import numpy as np
+
+# Run from the project root: python test/backtest_kernel_parity.py
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKTEST_DIR = os.path.join(PROJECT_ROOT, 'analysis', 'backtesting')
+for strategy_dir in ['single_MA', 'dual_MA_crossover', 'bollinger-bands']:
+    sys.path.insert(0, os.path.join(BACKTEST_DIR, strategy_dir))
+sys.path.insert(0, BACKTEST_DIR)
+import single_ma_backtest
+import dual_ma_crossover_backtest
+import bollinger_bands_bt
+from sweep import STRATEGIES, expand_grid, required_indicators
+from utils.backtest_kernel import BarArrays, equity_records, run_long_only
+from utils.indicator_provider import IndicatorProvider
+
+def load_json(*parts):
+    with open(os.path.join(BACKTEST_DIR, *parts), 'r') as f:
+        return json.load(f)
+
+def check_saved_outputs(bars):
+    """The array kernel must reproduce the trade and equity exports committed for item 327."""
+    checks = [(single_ma_backtest.run_single_ma_backtest, (period,), 'single_MA', f'ma_{period}', False)
+              for period in single_ma_backtest.MA_PERIODS]
+    checks += [(dual_ma_crossover_backtest.run_dual_ma_backtest, pair, 'dual_MA_crossover',
+                f'ma_{pair[0]}_{pair[1]}', True) for pair in dual_ma_crossover_backtest.MA_PAIRS]
+    checks += [(bollinger_bands_bt.run_bollinger_backtest, (period,), 'bollinger-bands',
+                f'bollinger_{period}', True) for period in bollinger_bands_bt.BB_PERIODS]
+    for backtest, args, directory, suffix, has_equity in checks:
+        trades, _, equity = backtest(bars, *args)
+        assert trades == load_json(directory, f'trades_{suffix}.json'), f"{suffix}: trades differ"
+        if has_equity:
+            saved = load_json(directory, f'equity_curve_{suffix}.json')
+            assert equity_records(bars.dates, equity, trades) == saved, f"{suffix}: equity curve differs"
+    print(f"{len(checks)} saved backtests reproduced")
+
+def check_rows_match_arrays(provider, item_id):
+    """Enriched-style rows and provider arrays must give identical results for every sweep config."""
+    configs = [config for strategy in STRATEGIES for config in expand_grid(strategy)]
+    indicators = required_indicators(configs)
+    rows = provider.rows(item_id, indicators)
+    bars = provider.bars(item_id, indicators)
+    for strategy, params in configs:
+        backtest = STRATEGIES[strategy](**params).backtest
+        from_rows = backtest(rows)
+        from_bars = backtest(bars)
+        assert from_rows[0] == from_bars[0] and from_rows[1] == from_bars[1], f"{strategy} {params}: results differ"
+        assert (from_rows[2] == from_bars[2]).all(), f"{strategy} {params}: equity differs"
+    print(f"Item {item_id}: {len(configs)} configs match between rows and arrays")
+
+def reference_fill(bars, entries, exits):
+    """The per-row loop the kernel replaces: enter only while flat, exit only while long."""
+    position = None
+    running = 0
+    trades = []
+    equity = []
+    for i, price in enumerate(bars.price_values):
+        if position is None and entries[i]:
+            position, entry_price, entry_date = 'long', price, bars.dates[i]
+        elif position == 'long' and exits[i]:
+            running += price - entry_price
+            trades.append({'entry_date': entry_date, 'entry_price': entry_price, 'exit_date': bars.dates[i],
+                           'exit_price': price, 'profit': price - entry_price, 'cumulative_profit': running})
+            position = None
+        equity.append(running if position is None else running + (price - entry_price))
+    if position == 'long':
+        profit = bars.price_values[-1] - entry_price
+        running += profit
+        trades.append({'entry_date': entry_date, 'entry_price': entry_price, 'exit_date': bars.dates[-1],
+                       'exit_price': bars.price_values[-1], 'profit': profit, 'cumulative_profit': running})
+    return trades, running, np.array(equity, dtype=float)
+
+def check_same_bar_signals():
+    """Entry and exit on the same bar: the kernel must not exit and re-enter there, as the loops can't."""
+    bars = BarArrays([f'd{i}' for i in range(5)], [10, 12, 11, 15, 14])
+    entries = np.array([1, 0, 1, 0, 0], dtype=bool)
+    exits = np.array([0, 0, 1, 0, 0], dtype=bool)
+    trades = run_long_only(bars, entries, exits)[0]
+    assert [(t['entry_date'], t['exit_date']) for t in trades] == [('d0', 'd2')], trades
+    cases = [(bars, entries, exits)]
+    # Dense random signals, so entries and exits often fall on the same bar
+    rng = np.random.default_rng(0)
+    for _ in range(500):
+        n = int(rng.integers(1, 60))
+        prices = np.round(rng.uniform(1, 100, n), 2).tolist()
+        cases.append((BarArrays([f'd{i}' for i in range(n)], prices),
+                      rng.random(n) < rng.uniform(0.05, 0.6), rng.random(n) < rng.uniform(0.05, 0.6)))
+    for bars, entries, exits in cases:
+        trades, total, equity = run_long_only(bars, entries, exits)
+        ref_trades, ref_total, ref_equity = reference_fill(bars, entries, exits)
+        assert trades == ref_trades and total == ref_total, f"trades differ for entries {entries} exits {exits}"
+        assert np.allclose(equity, ref_equity, rtol=0, atol=1e-9), f"equity differs for {entries} {exits}"
+    print(f"{len(cases)} signal patterns with same-bar entries and exits match the row loop")
+
+def main():
+    check_same_bar_signals()
+    provider = IndicatorProvider()
+    indicators = [('ma', period) for period in single_ma_backtest.MA_PERIODS]
+    indicators += [('bollinger', period) for period in bollinger_bands_bt.BB_PERIODS]
+    check_saved_outputs(provider.bars(327, indicators))
+    for item_id in [327, 453]:
+        check_rows_match_arrays(provider, item_id)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import json
+import math
+import sys
+import time
+import os
+import pandas as pd
+
+# Run from the project root: python test/backtest_profiles_parity.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.backtest_profiles import BacktestEngine, IndicatorMatrix, TRADING_PROFILES
+
+def load_prices(file_path, item_id):
+    with open(file_path, 'r') as file:
+        data = json.load(file)
+    return pd.Series([float(entry['price']) for entry in data[str(item_id)]])
+
+def trade_keys(result):
+    return [(t['type'], t['price'], t['quantity'], t['timestamp']) for t in result['trades']]
+
+def check_parity(prices, profile, precomputed_signals):
+    engine = BacktestEngine(prices, profile)
+
+    start = time.perf_counter()
+    reference = engine.run_backtest(incremental=False)
+    prefix_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    streaming = engine.run_backtest(incremental=True)
+    streaming_time = time.perf_counter() - start
+
+    matrix = engine.simulate(engine.iter_precomputed_signals(precomputed_signals))
+
+    ref_trades = trade_keys(reference)
+    new_trades = trade_keys(streaming)
+    assert ref_trades == new_trades, f"{profile.name}: trades differ"
+    for ref, new in zip(reference['trades'], streaming['trades']):
+        assert math.isclose(ref['signal'], new['signal'], rel_tol=1e-9, abs_tol=1e-9), \
+            f"{profile.name}: signal differs at bar {ref['timestamp']}"
+    assert reference['final_capital'] == streaming['final_capital'], f"{profile.name}: final capital differs"
+    assert reference['roi'] == streaming['roi'], f"{profile.name}: ROI differs"
+    assert trade_keys(matrix) == ref_trades, f"{profile.name}: indicator matrix trades differ"
+    assert matrix['roi'] == reference['roi'], f"{profile.name}: indicator matrix ROI differs"
+
+    print(f"{profile.name}: {len(new_trades)} trades, ROI {streaming['roi']:.2f}% "
+          f"(prefix {prefix_time:.2f}s, streaming {streaming_time:.3f}s)")
+
+def main():
+    for file_path, item_id in [('historical_data_327.json', 327), ('historical_data_453.json', 453)]:
+        prices = load_prices(file_path, item_id)
+        print(f"\nItem {item_id} ({len(prices)} bars)")
+        profiles = list(TRADING_PROFILES.values())
+        signals = IndicatorMatrix(prices).signals(profiles)
+        for column, profile in enumerate(profiles):
+            check_parity(prices, profile, signals[:, column])
+    print("\nStreaming, indicator matrix and prefix backtests match.")
+
+if __name__ == "__main__":
+    main()
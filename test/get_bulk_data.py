@@ -1,35 +1,25 @@
-import json
+import shutil
 import urllib.request
 
-def fetch_bulk_data(url):
+def fetch_bulk_data(url, filename):
     try:
         # Create a request object with a User-Agent header
         request = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-        with urllib.request.urlopen(request) as response:
-            data = json.loads(response.read().decode())
-            return data
-    except Exception as e:
-        print(f"An error occurred: {e}")
-        return None
-
-def write_data_to_file(data, filename):
-    try:
-        with open(filename, 'w') as file:
-            json.dump(data, file, indent=4)
+        # Stream the dump straight to disk instead of parsing and re-serialising it
+        with urllib.request.urlopen(request) as response, open(filename, 'wb') as file:
+            shutil.copyfileobj(response, file, length=1 << 16)
         print(f"Data successfully written to {filename}")
+        return True
     except Exception as e:
-        print(f"An error occurred while writing to file: {e}")
+        print(f"An error occurred: {e}")
+        return False
 
 def main():
     # URL for the OSRS bulk data JSON dump
     osrs_bulk_data_url = "https://chisel.weirdgloop.org/gazproj/gazbot/os_dump.json"
     
-    # Fetch the data
-    data = fetch_bulk_data(osrs_bulk_data_url)
-    
-    if data:
-        # Write the data to a file
-        write_data_to_file(data, 'osrs_bulk_data.json')
+    # Fetch the data and write it to a file
+    fetch_bulk_data(osrs_bulk_data_url, 'osrs_bulk_data.json')
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
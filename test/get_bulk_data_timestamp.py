@@ -1,14 +1,13 @@
-import json
+import os
+import sys
 from datetime import datetime, timezone
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.bulk_snapshot import BulkSnapshot
+
 def get_bulk_data_and_timestamp(json_path='osrs_bulk_data.json'):
-    with open(json_path, 'r') as f:
-        data = json.load(f)
-    # extract timestamp keys
-    jagex_timestamp = data.get('%JAGEX_TIMESTAMP%')
-    update_detected = data.get('%UPDATE_DETECTED%')
-    
-    item_data = {k: v for k, v in data.items() if not k.startswith('%')}
+    # Streams the dump into a typed table; %...% metadata keys are kept apart
+    snapshot = BulkSnapshot.from_file(json_path)
 
     # convert timestamps
     def to_readable(ts):
@@ -18,10 +17,10 @@ def get_bulk_data_and_timestamp(json_path='osrs_bulk_data.json'):
         ts = int(float(ts))
         return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
 
-    jagex_timestamp_readable = to_readable(jagex_timestamp)
-    update_detected_readable = to_readable(update_detected)
+    jagex_timestamp_readable = to_readable(snapshot.jagex_timestamp)
+    update_detected_readable = to_readable(snapshot.update_detected)
 
-    return item_data, jagex_timestamp_readable, update_detected_readable
+    return snapshot, jagex_timestamp_readable, update_detected_readable
 
 items, jagex_ts, update_ts = get_bulk_data_and_timestamp()
 print(f"Jagex Timestamp: {jagex_ts}")
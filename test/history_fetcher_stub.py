@@ -0,0 +1,136 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from aiohttp import web
+
+# Run from the project root: python test/history_fetcher_stub.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.history_fetcher import (
+    HistoryFetcher, FetchProgress, HISTORY_PATH, LAST_90D_PATH, LATEST_PATH, DAY_MS
+)
+from utils.price_store import PriceStore
+
+NOW_MS = int(time.time() * 1000) // DAY_MS * DAY_MS
+
+def history(days):
+    """One point per day up to today, oldest first, as the API returns them."""
+    return [{'id': '0', 'timestamp': NOW_MS - day * DAY_MS, 'price': 100 + day, 'volume': 1000 + day}
+            for day in range(days - 1, -1, -1)]
+
+class StubServer:
+    """Local stand-in for api.weirdgloop.org that answers from ``items`` and logs every request.
+
+    ``script`` maps an item id to the statuses to send (in order) before the
+    real answer; a (status, headers) tuple sets response headers too.
+    """
+
+    def __init__(self, items, script=None):
+        self.items = items
+        self.script = {item_id: list(statuses) for item_id, statuses in (script or {}).items()}
+        self.requests = defaultdict(list)
+
+    async def handle(self, request):
+        item_id = int(request.query['id'])
+        self.requests[item_id].append((request.path, time.monotonic()))
+        if self.script.get(item_id):
+            status = self.script[item_id].pop(0)
+            status, headers = status if isinstance(status, tuple) else (status, {})
+            return web.Response(status=status, headers=headers)
+        if item_id not in self.items:
+            return web.Response(status=404)
+        points = self.items[item_id]
+        if request.path == LATEST_PATH:
+            points = dict(points[-1], timestamp=time.strftime('%Y-%m-%dT%H:%M:%S.000Z',
+                                                              time.gmtime(points[-1]['timestamp'] / 1000)))
+        elif request.path == LAST_90D_PATH:
+            points = [p for p in points if p['timestamp'] > NOW_MS - 90 * DAY_MS]
+        return web.json_response({str(item_id): points})
+
+    async def __aenter__(self):
+        app = web.Application()
+        for path in [HISTORY_PATH, LAST_90D_PATH, LATEST_PATH]:
+            app.router.add_get(path, self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        host, port = self.runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.runner.cleanup()
+
+def fetcher(tmp, server, progress=None):
+    return HistoryFetcher(store=PriceStore(os.path.join(tmp, 'store')), base_url=server.url, rate_limit=0,
+                          backoff_base=0.01, progress=progress or FetchProgress(None))
+
+async def check_retries(tmp):
+    """429/5xx are retried (waiting out Retry-After), 404 fails at once, and both end up in progress."""
+    items = {1: history(30), 2: history(30), 3: history(30)}
+    script = {1: [503, 502, 500], 2: [(429, {'Retry-After': '1'})]}
+    async with StubServer(items, script) as server:
+        client = fetcher(tmp, server)
+        fetched, failed = await client.fetch_all([1, 2, 3, 404])
+    assert (fetched, failed) == (3, 1), (fetched, failed)
+    assert len(server.requests[1]) == 4, server.requests[1]
+    (_, first), (_, second) = server.requests[2]
+    assert second - first >= 0.95, f"Retry-After ignored: retried after {second - first:.2f}s"
+    assert len(server.requests[404]) == 1, "404 must not be retried"
+    assert '404' in client.progress.failed[404]
+    assert client.store.load(1).prices.tolist() == [p['price'] for p in items[1]]
+    print("Retries on 429/5xx, honours Retry-After, fails 404 without retrying")
+
+async def check_resume(tmp):
+    """A run with a saved fetch_progress.json only requests the items not done yet."""
+    path = os.path.join(tmp, 'fetch_progress.json')
+    with open(path, 'w') as f:
+        json.dump({'done': [1, 2], 'failed': {'3': 'Server disconnected'}}, f)
+    async with StubServer({item_id: history(10) for item_id in [1, 2, 3, 4]}) as server:
+        client = fetcher(tmp, server, FetchProgress(path))
+        fetched, failed = await client.fetch_all([1, 2, 3, 4])
+    assert (fetched, failed) == (2, 0), (fetched, failed)
+    assert sorted(server.requests) == [3, 4], sorted(server.requests)
+    with open(path) as f:
+        saved = json.load(f)
+    assert saved == {'done': [1, 2, 3, 4], 'failed': {}}, saved
+    print("Resumes from fetch_progress.json")
+
+async def check_sync(tmp):
+    """sync_all picks /latest, /last90d or /all by how stale each item is and appends only new points."""
+    full = history(400)
+    # Item id -> days of history already stored (0: not stored at all)
+    stale_days = {10: 1, 11: 30, 12: 200, 13: 0}
+    store = PriceStore(os.path.join(tmp, 'store'))
+    for item_id, days in stale_days.items():
+        if days:
+            kept = full[:-days]
+            store.write(item_id, [p['timestamp'] for p in kept], [p['price'] for p in kept])
+    progress = FetchProgress(None)
+    progress.mark_failed(11, 'Server disconnected')
+    appended_calls = []
+    async with StubServer({item_id: full for item_id in stale_days}) as server:
+        client = fetcher(tmp, server, progress)
+        client.on_append = lambda item_id, count: appended_calls.append((item_id, count))
+        appended = await client.sync_all(list(stale_days))
+    paths = {item_id: requests[0][0] for item_id, requests in server.requests.items()}
+    assert paths == {10: LATEST_PATH, 11: LAST_90D_PATH, 12: HISTORY_PATH, 13: HISTORY_PATH}, paths
+    assert appended == {10: 1, 11: 30, 12: 200, 13: 400}, appended
+    assert sorted(appended_calls) == sorted(appended.items()), appended_calls
+    for item_id in stale_days:
+        assert store.load(item_id).timestamps.tolist() == [p['timestamp'] for p in full], item_id
+    assert not progress.failed, f"Recovered items still listed as failed: {progress.failed}"
+    print("sync_all picks /latest, /last90d or /all and clears recovered failures")
+
+async def main():
+    for check in [check_retries, check_resume, check_sync]:
+        with tempfile.TemporaryDirectory() as tmp:
+            await check(tmp)
+    print("\nHistory fetcher behaves as expected against the stub server.")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,54 @@
+import os
+import sys
+import numpy as np
+
+# Run from the project root: python test/monte_carlo_parity.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.indicator_provider import IndicatorProvider
+from utils.monte_carlo import CHUNK_PATHS, METHODS, METRICS, run_monte_carlo, simulate
+from utils.strategies import make_strategy
+
+# More paths than one chunk, so configs are split across several tasks
+N_PATHS = 2 * CHUNK_PATHS + 500
+
+def trade_profits():
+    """Per-trade profits of a few real configs on 327, plus a synthetic one with many small trades."""
+    provider = IndicatorProvider()
+    configs = [('bollinger', {'period': 20, 'std_dev': 2}), ('dual_ma', {'short_period': 14, 'long_period': 90}),
+               ('rsi', {'period': 14, 'buy_level': 30, 'sell_level': 70})]
+    profits = {}
+    for name, params in configs:
+        strategy = make_strategy(name, **params)
+        trades = strategy.backtest(provider.bars(327, strategy.indicators()))[0]
+        profits[f"{name} {params}"] = [t['profit'] for t in trades]
+    profits['synthetic'] = np.random.default_rng(7).normal(0.5, 10.0, 250).round(2).tolist()
+    return profits
+
+def check_shuffle(profits):
+    """Shuffling only reorders trades: every path's total profit is the observed total."""
+    for key, values in profits.items():
+        totals = simulate(values, N_PATHS, 'shuffle', seed=1)['total_profit']
+        np.testing.assert_allclose(totals, np.sum(values), rtol=1e-12, atol=1e-9,
+                                   err_msg=f"{key}: shuffled total profit varies")
+    print(f"shuffle keeps total_profit constant across {N_PATHS} paths for {len(profits)} configs")
+
+def check_workers(profits):
+    """The same seed gives identical arrays in-process and across a pool."""
+    for method in METHODS:
+        serial = run_monte_carlo(profits, N_PATHS, method, seed=3, workers=1)
+        pooled = run_monte_carlo(profits, N_PATHS, method, seed=3, workers=2)
+        for key in profits:
+            for metric in METRICS:
+                assert len(serial[key][metric]) == N_PATHS, f"{method} {key}: wrong path count"
+                np.testing.assert_array_equal(serial[key][metric], pooled[key][metric],
+                                              err_msg=f"{method} {key} {metric}: workers=1 and 2 differ")
+        print(f"{method}: workers=1 and workers=2 give identical arrays")
+
+def main():
+    profits = trade_profits()
+    check_shuffle(profits)
+    check_workers(profits)
+    print("\nShuffled paths keep the total profit and results do not depend on the worker count.")
+
+if __name__ == "__main__":
+    main()
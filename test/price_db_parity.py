@@ -0,0 +1,62 @@
+import json
+import os
+import sys
+import tempfile
+import numpy as np
+
+# Run from the project root: python test/price_db_parity.py
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+from utils.indicator_cache import IndicatorCache
+from utils.indicator_provider import IndicatorProvider
+from utils.price_db import PriceDatabase
+from utils.price_store import PriceStore
+
+ITEMS = [327, 453]
+COLUMNS = [('price', None), ('ma', 20), ('rsi', 14), ('bollinger_upper', 20), ('macd', None)]
+
+def check_item(tmp, item_id):
+    """An item loaded from PriceDatabase must be the same series, version and columns as from the store."""
+    json_path = os.path.join(PROJECT_ROOT, f'historical_data_{item_id}.json')
+    with open(json_path) as f:
+        history = json.load(f)[str(item_id)]
+    store = PriceStore(os.path.join(tmp, 'store'))
+    store.import_json(json_path)
+    database = PriceDatabase(os.path.join(tmp, 'prices.db'))
+    database.load_history_json(json_path)
+    # Neither source may fall through to the other or to the JSON file
+    empty_dir = os.path.join(tmp, 'empty')
+    os.makedirs(empty_dir, exist_ok=True)
+    cache = IndicatorCache()
+    from_store = IndicatorProvider(data_dir=empty_dir, store=store, cache=cache)
+    from_db = IndicatorProvider(data_dir=empty_dir, store=PriceStore(os.path.join(tmp, 'no_store')),
+                                database=database, cache=cache)
+    from_json = IndicatorProvider(store=PriceStore(os.path.join(tmp, 'no_store')))
+
+    expected_last = history[-1]['timestamp']
+    for provider, name in [(from_store, 'store'), (from_db, 'database'), (from_json, 'JSON')]:
+        version = provider.version(item_id)
+        assert version.last_timestamp == expected_last, \
+            f"{item_id} {name}: last timestamp {version.last_timestamp}, expected {expected_last}"
+        assert version == from_store.version(item_id), f"{item_id} {name}: version differs from the store's"
+        assert provider.dates(item_id) == from_store.dates(item_id), f"{item_id} {name}: dates differ"
+    for indicator, period in COLUMNS:
+        expected = from_store.get(item_id, indicator, period)
+        hits = len(cache)
+        values = from_db.get(item_id, indicator, period)
+        assert len(cache) == hits, f"{item_id}: {indicator} from the database missed the store's cached column"
+        np.testing.assert_array_equal(values, expected, err_msg=f"{item_id}: {indicator} differs")
+        np.testing.assert_array_equal(from_json.get(item_id, indicator, period), expected,
+                                      err_msg=f"{item_id}: {indicator} from JSON differs")
+    database.close()
+    print(f"Item {item_id}: {len(history)} bars, database, store and JSON sources agree "
+          f"(last timestamp {expected_last}, first date {from_db.dates(item_id)[0]})")
+
+def main():
+    for item_id in ITEMS:
+        with tempfile.TemporaryDirectory() as tmp:
+            check_item(tmp, item_id)
+    print("\nPriceDatabase histories match the price store and JSON histories.")
+
+if __name__ == "__main__":
+    main()
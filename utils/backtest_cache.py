@@ -0,0 +1,98 @@
+import hashlib
+import inspect
+import json
+import os
+import numpy as np
+from . import backtest_kernel, calculate_indicators, indicator_provider
+from .backtest_kernel import FillState
+from .indicator_cache import SeriesVersion
+from .indicator_provider import PROJECT_ROOT
+
+DEFAULT_BACKTEST_CACHE_DIR = os.path.join(PROJECT_ROOT, 'backtest_cache')
+# Code every strategy's trades depend on besides its own class: the fill, the indicator math
+# and the provider's rounding
+SHARED_MODULES = [backtest_kernel, calculate_indicators, indicator_provider]
+_CODE_VERSIONS = {}
+
+def code_version(strategy):
+    """Digest of the source behind a strategy's results: its class and bases plus ``SHARED_MODULES``."""
+    cls = type(strategy)
+    if cls not in _CODE_VERSIONS:
+        sources = [inspect.getsource(base) for base in cls.__mro__ if base is not object]
+        sources += [inspect.getsource(module) for module in SHARED_MODULES]
+        _CODE_VERSIONS[cls] = hashlib.blake2b('\0'.join(sources).encode(), digest_size=16).hexdigest()
+    return _CODE_VERSIONS[cls]
+
+def params_digest(params):
+    return hashlib.blake2b(json.dumps(params, sort_keys=True).encode(), digest_size=8).hexdigest()
+
+class BacktestCache:
+    """Saved backtest results, reused while strategy code, params and input history are unchanged.
+
+    One entry per (item, strategy, params) in ``cache_dir``: the code version
+    and ``SeriesVersion`` of the history it ran on, as JSON next to the trades,
+    total profit and end ``FillState``, plus the equity curve as ``.npy``.
+    ``run`` returns the saved result when all of them match, resumes from
+    the saved end state when the history only gained bars at the end, and
+    backtests from scratch otherwise; ``hits``, ``resumed`` and ``misses``
+    count each outcome.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_BACKTEST_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.resumed = 0
+        self.misses = 0
+
+    def _path(self, item_id, strategy):
+        return os.path.join(self.cache_dir, str(item_id), f"{strategy.name}_{params_digest(strategy.params)}")
+
+    def get(self, item_id, strategy):
+        """The saved entry dict (with its 'equity' array), or None."""
+        path = self._path(item_id, strategy)
+        try:
+            with open(f"{path}.json", 'r') as f:
+                entry = json.load(f)
+            entry['equity'] = np.load(f"{path}.npy")
+        except (OSError, ValueError):
+            return None
+        entry['data'] = SeriesVersion(**entry['data'])
+        entry['state'] = FillState(**entry['state'])
+        if entry['params'] != strategy.params or len(entry['equity']) != entry['data'].length:
+            return None
+        return entry
+
+    def put(self, item_id, strategy, version, trades, total_profit, equity, state):
+        path = self._path(item_id, strategy)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Array first, then its sidecar, each via rename, so readers never see a torn pair
+        np.save(f"{path}.tmp.npy", equity)
+        os.replace(f"{path}.tmp.npy", f"{path}.npy")
+        entry = {'code': code_version(strategy), 'params': strategy.params, 'data': version._asdict(),
+                 'trades': trades, 'total_profit': total_profit, 'state': state._asdict()}
+        with open(f"{path}.json.tmp", 'w') as f:
+            json.dump(entry, f)
+        os.replace(f"{path}.json.tmp", f"{path}.json")
+
+    def run(self, provider, item_id, strategy):
+        """((trades, total_profit, equity), status) with status 'hit', 'resumed' or 'run'.
+
+        Indicator columns are only requested from ``provider`` when the
+        strategy actually has bars to fill.
+        """
+        version = provider.version(item_id)
+        entry = self.get(item_id, strategy)
+        resume = None
+        if entry is not None and entry['code'] == code_version(strategy):
+            if entry['data'] == version:
+                self.hits += 1
+                return (entry['trades'], entry['total_profit'], entry['equity']), 'hit'
+            if provider.continues(item_id, entry['data']):
+                resume = (entry['trades'], entry['equity'], entry['state'])
+        trades, total_profit, equity, state = strategy.fill(provider.bars(item_id, strategy.indicators()), resume)
+        self.put(item_id, strategy, version, trades, total_profit, equity, state)
+        if resume is not None:
+            self.resumed += 1
+            return (trades, total_profit, equity), 'resumed'
+        self.misses += 1
+        return (trades, total_profit, equity), 'run'
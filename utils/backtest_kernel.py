@@ -0,0 +1,160 @@
+from collections import namedtuple
+import numpy as np
+
+class BarArrays:
+    """Contiguous price and indicator columns for one item's bars.
+
+    Columns are keyed like the nested rows of the enriched export:
+    ``column('ma', 14)``, ``column('bollinger', 14, 'upper')``. Missing values
+    are NaN. Built either straight from ``IndicatorProvider.bars`` or once
+    from a list of enriched-style rows (``from_rows``), in which case each
+    column is pulled out of the rows on first use and then kept.
+    """
+
+    def __init__(self, dates, prices, columns=None, price_values=None, rows=None):
+        self.dates = dates
+        self.prices = np.asarray(prices, dtype=float)
+        # Original price objects, so trade records keep the input's int/float type
+        self.price_values = price_values if price_values is not None else self.prices.tolist()
+        self._columns = dict(columns or {})
+        self._rows = rows
+
+    @classmethod
+    def from_rows(cls, rows):
+        price_values = [row['price'] for row in rows]
+        prices = [np.nan if price is None else price for price in price_values]
+        return cls([row['date'] for row in rows], prices, price_values=price_values, rows=rows)
+
+    def __len__(self):
+        return len(self.prices)
+
+    def column(self, group, key, field=None):
+        key = (group, str(key), field)
+        if key not in self._columns:
+            if self._rows is None:
+                raise KeyError(f"Column not loaded: {key}")
+            values = []
+            for row in self._rows:
+                value = row['indicators'].get(group, {}).get(key[1])
+                if field is not None and value is not None:
+                    value = value.get(field)
+                values.append(np.nan if value is None else value)
+            self._columns[key] = np.array(values, dtype=float)
+        return self._columns[key]
+
+    def window(self, start, stop):
+        """Bars ``start:stop``; the columns are views, not recomputed.
+
+        Indicator values keep the lookback they had over the full history
+        instead of restarting their warm-up. All indicators here are causal,
+        so nothing from after ``stop`` leaks in.
+        """
+        if self._rows is not None:
+            raise ValueError("window() needs array-backed bars; build them with IndicatorProvider.bars")
+        columns = {key: values[start:stop] for key, values in self._columns.items()}
+        return BarArrays(self.dates[start:stop], self.prices[start:stop], columns,
+                         price_values=self.price_values[start:stop])
+
+def as_bars(data):
+    """Accept either BarArrays or enriched-style rows."""
+    return data if isinstance(data, BarArrays) else BarArrays.from_rows(data)
+
+def crossed_above(a, b):
+    """True on bars where ``a`` moves from below ``b`` to above it (NaN never crosses)."""
+    crossed = np.zeros(len(a), dtype=bool)
+    crossed[1:] = (a[:-1] < b[:-1]) & (a[1:] > b[1:])
+    return crossed
+
+def crossed_below(a, b):
+    return crossed_above(b, a)
+
+# Where a fill stopped: bars covered, profit of the closed trades and the entry bar of a
+# position still open at the end (None when flat)
+FillState = namedtuple('FillState', ['length', 'closed_profit', 'open_entry'])
+
+def run_long_only(bars, entries, exits):
+    """Fill a long-only strategy from boolean entry/exit arrays.
+
+    Enters on the first entry bar while flat and exits on the first later
+    exit bar; the next entry comes after that exit bar, never on it, as the
+    loops only look for an entry while flat. A position still open at the
+    end is closed at the last price.
+    Only the trades are visited in Python (each next signal is a binary
+    search), the equity curve is filled by slices. Returns
+    (trades, total_profit, equity) with ``equity`` a float array aligned
+    with the bars, matching the per-row loops this replaces.
+    """
+    return fill_long_only(bars, entries, exits)[:3]
+
+def fill_long_only(bars, entries, exits, resume=None):
+    """``run_long_only`` plus the end ``FillState``: (trades, total_profit, equity, state).
+
+    ``resume`` is the (trades, equity, state) of an earlier fill over the
+    first ``state.length`` of these bars. The signals there are unchanged
+    (every indicator is causal), so the closed trades and equity are kept,
+    the end-of-data close-out of an open position is dropped, and only the
+    appended bars are filled.
+    """
+    prices = bars.prices
+    valid = ~np.isnan(prices)
+    buys = np.flatnonzero(entries & valid)
+    sells = np.flatnonzero(exits & valid)
+    n = len(prices)
+    equity = np.empty(n)
+    trades = []
+    running = 0
+    position = 0
+    open_entry = None
+    # Only the bar a trade closed on is excluded; the first search (and a resume) starts at ``position`` itself
+    side = 'left'
+    if resume is not None:
+        old_trades, old_equity, state = resume
+        trades = list(old_trades[:-1] if state.open_entry is not None else old_trades)
+        running = state.closed_profit
+        position = state.length
+        open_entry = state.open_entry
+        equity[:position] = old_equity
+    while True:
+        if open_entry is not None:
+            entry, open_entry = open_entry, None
+        else:
+            k = np.searchsorted(buys, position, side=side)
+            if k == len(buys):
+                break
+            entry = int(buys[k])
+        m = np.searchsorted(sells, entry, side='right')
+        exit_ = int(sells[m]) if m < len(sells) else None
+        held_until = n if exit_ is None else exit_
+        entry_price = bars.price_values[entry]
+        exit_price = bars.price_values[-1 if exit_ is None else exit_]
+        equity[position:entry] = running
+        # A resumed open position already has its equity up to ``position``
+        held_from = max(entry, position)
+        equity[held_from:held_until] = running + (prices[held_from:held_until] - entry_price)
+        profit = exit_price - entry_price
+        closed_profit = running
+        running += profit
+        trades.append({
+            'entry_date': bars.dates[entry],
+            'entry_price': entry_price,
+            'exit_date': bars.dates[-1 if exit_ is None else exit_],
+            'exit_price': exit_price,
+            'profit': profit,
+            'cumulative_profit': running,
+        })
+        position = held_until
+        side = 'right'
+        if exit_ is None:
+            return trades, running, equity, FillState(n, closed_profit, entry)
+    equity[position:] = running
+    return trades, running, equity, FillState(n, running, None)
+
+def equity_records(dates, equity, trades):
+    """[{'date', 'equity'}] for the JSON exports.
+
+    Bars before the first entry are written as integer 0, as the row loops did.
+    """
+    first_entry = dates.index(trades[0]['entry_date']) if trades else len(dates)
+    values = equity.tolist()
+    return [{'date': date, 'equity': 0 if i < first_entry else value}
+            for i, (date, value) in enumerate(zip(dates, values))]
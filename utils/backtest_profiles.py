@@ -1,6 +1,14 @@
+import math
+import numpy as np
 import pandas as pd
 import json
-from .calculate_indicators import calculate_bollinger_bands, calculate_rsi, calculate_signal_strength
+from collections import deque
+from .calculate_indicators import (
+    calculate_bollinger_bands, calculate_rsi, calculate_signal_strength, calculate_signal_components
+)
+
+INDICATOR_WINDOWS = [14, 30, 90]
+SIGNAL_COMPONENTS = ['bollinger', 'rsi', 'ma']
 
 class TradingProfile:
     def __init__(self, name, timeframe_weights, indicator_weights):
@@ -39,22 +47,183 @@ TRADING_PROFILES = {
     )
 }
 
+class StreamingIndicatorState:
+    """Rolling Bollinger/RSI state for a single window, advanced one bar at a time.
+
+    Keeps a Welford-style running mean and sum of squared deviations of the
+    last ``window`` prices and running gain/loss sums of the last ``window``
+    price changes, so each ``update`` is O(1). Every ``REANCHOR_EVERY``
+    updates they are recomputed from the window, so a long-running stream
+    doesn't accumulate rounding drift. Values match the pandas rolling
+    versions in ``calculate_indicators``: sample std (ddof=1) and SMA-smoothed RSI.
+    """
+
+    REANCHOR_EVERY = 1000
+
+    def __init__(self, window, num_std=2):
+        self.window = window
+        self.num_std = num_std
+        self.prices = deque()
+        self.price_mean = 0.0
+        self.price_m2 = 0.0
+        self.changes = deque()
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+        self.last_price = None
+        self.updates = 0
+
+    def update(self, price):
+        """Push the next price and return (ma, upper, lower, rsi); NaN while warming up."""
+        self.prices.append(price)
+        if len(self.prices) > self.window:
+            old = self.prices.popleft()
+            # Replace ``old`` with ``price`` in a window of fixed size
+            mean = self.price_mean + (price - old) / self.window
+            self.price_m2 += (price - old) * (price - mean + old - self.price_mean)
+            self.price_mean = mean
+        else:
+            delta = price - self.price_mean
+            self.price_mean += delta / len(self.prices)
+            self.price_m2 += delta * (price - self.price_mean)
+
+        if self.last_price is not None:
+            delta = price - self.last_price
+            self.changes.append(delta)
+            if delta > 0:
+                self.gain_sum += delta
+            else:
+                self.loss_sum -= delta
+            if len(self.changes) > self.window:
+                old = self.changes.popleft()
+                if old > 0:
+                    self.gain_sum -= old
+                else:
+                    self.loss_sum += old
+        self.last_price = price
+
+        self.updates += 1
+        if self.updates % self.REANCHOR_EVERY == 0:
+            self.reanchor()
+        return self.bands() + (self.rsi(),)
+
+    def reanchor(self):
+        """Recompute the running sums exactly from the current window."""
+        self.price_mean = math.fsum(self.prices) / len(self.prices)
+        self.price_m2 = math.fsum((p - self.price_mean) ** 2 for p in self.prices)
+        self.gain_sum = math.fsum(d for d in self.changes if d > 0)
+        self.loss_sum = -math.fsum(d for d in self.changes if d <= 0)
+
+    def bands(self):
+        n = self.window
+        if len(self.prices) < n:
+            return math.nan, math.nan, math.nan
+        ma = self.price_mean
+        if n < 2:
+            return ma, math.nan, math.nan
+        var = self.price_m2 / (n - 1)
+        std = math.sqrt(var) if var > 0 else 0.0
+        return ma, ma + self.num_std * std, ma - self.num_std * std
+
+    def rsi(self):
+        if len(self.changes) < self.window:
+            return math.nan
+        if self.loss_sum <= 0:
+            return 100.0 if self.gain_sum > 0 else math.nan
+        rs = self.gain_sum / self.loss_sum
+        return 100 - (100 / (1 + rs))
+
+class IndicatorMatrix:
+    """Indicator component scores for a price series, computed once for all profiles.
+
+    Bollinger bands and RSI are evaluated for every window over the whole
+    series, and their per-bar component scores are stacked into a
+    ``(bars, windows * components)`` array. Profiles only differ in weights,
+    so each profile's aggregate signal is a single matrix product.
+    """
+
+    def __init__(self, prices, windows=INDICATOR_WINDOWS):
+        self.prices = prices
+        self.windows = list(windows)
+        columns = []
+        for window in self.windows:
+            ma, upper, lower = calculate_bollinger_bands(prices, window)
+            rsi = calculate_rsi(prices, window)
+            scores = calculate_signal_components(prices, ma, upper, lower, rsi)
+            columns.extend(scores[name] for name in SIGNAL_COMPONENTS)
+        self.components = np.column_stack(columns)
+
+    def profile_weights(self, profile):
+        """Flatten a profile's timeframe x indicator weights to match ``components``."""
+        return np.array([
+            profile.timeframe_weights[window] * profile.indicator_weights[window][name]
+            for window in self.windows
+            for name in SIGNAL_COMPONENTS
+        ])
+
+    def signals(self, profiles):
+        """Return a ``(bars, len(profiles))`` array of aggregate signals."""
+        weights = np.column_stack([self.profile_weights(profile) for profile in profiles])
+        return self.components @ weights
+
 class BacktestEngine:
+    WINDOWS = INDICATOR_WINDOWS
+
     def __init__(self, prices, profile):
         self.prices = prices
         self.profile = profile
         self.results = []
 
-    def run_backtest(self, initial_capital=1000000):
+    def run_backtest(self, initial_capital=1000000, incremental=True):
+        """Simulate the profile over ``self.prices``.
+
+        ``incremental=True`` (default) advances a ``StreamingIndicatorState``
+        per window, so a full run is a single linear pass. ``incremental=False``
+        keeps the original prefix-recompute path (O(n^2)) for parity checks.
+        """
+        if incremental:
+            signals = self.iter_signals()
+        else:
+            signals = self.iter_prefix_signals()
+        return self.simulate(signals, initial_capital)
+
+    def iter_signals(self):
+        """Yield (bar index, aggregate signal) for every tradeable bar in one pass."""
+        states = {window: StreamingIndicatorState(window) for window in self.WINDOWS}
+        # We need enough data for our longest timeframe (90 days)
+        start = max(self.WINDOWS)
+        for i, price in enumerate(self.prices):
+            readings = {window: state.update(price) for window, state in states.items()}
+            if i >= start:
+                yield i, self.aggregate_readings(price, readings)
+
+    def iter_precomputed_signals(self, signals):
+        """Yield (bar index, signal) from a precomputed per-bar signal array."""
+        start = max(self.WINDOWS)
+        for i in range(start, len(self.prices)):
+            yield i, float(signals[i])
+
+    def iter_prefix_signals(self):
+        """Yield (bar index, aggregate signal) by recomputing each prefix from scratch."""
+        for i in range(max(self.WINDOWS), len(self.prices)):
+            slice_prices = self.prices[:i+1]
+            yield i, self.calculate_aggregate_signal(slice_prices)
+
+    def aggregate_readings(self, price, readings):
+        final_signals = []
+        for window, (ma, upper, lower, rsi) in readings.items():
+            signal_strength = calculate_signal_strength(
+                price, ma, upper, lower, rsi,
+                self.profile.indicator_weights[window]
+            )
+            final_signals.append(signal_strength * self.profile.timeframe_weights[window])
+        return sum(final_signals)
+
+    def simulate(self, signals, initial_capital=1000000):
         capital = initial_capital
         position = 0
         trades = []
         
-        # We need enough data for our longest timeframe (90 days)
-        for i in range(90, len(self.prices)):
-            slice_prices = self.prices[:i+1]
-            signal = self.calculate_aggregate_signal(slice_prices)
-            
+        for i, signal in signals:
             current_price = self.prices[i]
             
             # Trading logic
@@ -80,7 +249,7 @@ class BacktestEngine:
                 position = 0
 
         # Calculate final position value
-        final_capital = capital + (position * self.prices[-1])
+        final_capital = capital + (position * self.prices.iloc[-1])
         roi = ((final_capital - initial_capital) / initial_capital) * 100
         
         return {
@@ -94,7 +263,7 @@ class BacktestEngine:
     def calculate_aggregate_signal(self, prices):
         final_signals = []
         
-        for window in [14, 30, 90]:
+        for window in self.WINDOWS:
             if len(prices) >= window:
                 ma, upper, lower = calculate_bollinger_bands(prices, window)
                 rsi = calculate_rsi(prices, window)
@@ -119,11 +288,15 @@ def run_all_profiles(file_path, item_id):
     prices = pd.Series([float(entry['price']) for entry in data[str(item_id)]])
     
     results = []
-    
+    profiles = list(TRADING_PROFILES.values())
+
+    # Indicators are shared by every profile; each profile is one dot product
+    signals = IndicatorMatrix(prices).signals(profiles)
+
     # Run backtest for each profile
-    for profile in TRADING_PROFILES.values():
+    for column, profile in enumerate(profiles):
         engine = BacktestEngine(prices, profile)
-        result = engine.run_backtest()
+        result = engine.simulate(engine.iter_precomputed_signals(signals[:, column]))
         results.append(result)
         
         print(f"\nResults for {profile.name}:")
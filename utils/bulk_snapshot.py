@@ -0,0 +1,184 @@
+import codecs
+import json
+import urllib.request
+import numpy as np
+import pandas as pd
+
+OS_DUMP_URL = "https://chisel.weirdgloop.org/gazproj/gazbot/os_dump.json"
+
+# Typed columns kept from each item; everything else (examine text, icon, ...) is dropped
+COLUMNS = {
+    'id': np.int32,
+    'price': np.int64,
+    'last': np.int64,
+    'volume': np.int64,
+    'limit': np.int32,
+    'highalch': np.int32,
+    'members': np.bool_,
+}
+MISSING = -1  # stored for absent price/last/volume/limit/highalch fields
+
+_WHITESPACE = ' \t\n\r'
+_NUMBER_TERMINATORS = _WHITESPACE + ',}]'
+
+def iter_dump_members(stream, chunk_size=1 << 16):
+    """Incrementally yield (key, value) pairs from a top-level JSON object.
+
+    ``stream`` is a text or binary file-like object (an open file or an HTTP
+    response). Only the current member plus one chunk is ever buffered, so the
+    full dict-of-dicts is never materialised.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    eof = False
+    pos = 0
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+            chunk = utf8.decode(b'', final=True) if isinstance(chunk, bytes) else ''
+        elif isinstance(chunk, bytes):
+            chunk = utf8.decode(chunk)
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    def next_char():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if eof:
+                raise ValueError("Unexpected end of bulk dump")
+            fill()
+
+    def decode_value():
+        nonlocal pos
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                value, end = None, None
+            # A number cut by the chunk edge ("12." or "1e") still parses as a shorter
+            # number, so only accept it once a terminator follows it
+            if end is not None and not eof and isinstance(value, (int, float)) and not isinstance(value, bool):
+                if end == len(buffer) or buffer[end] not in _NUMBER_TERMINATORS:
+                    end = None
+            if end is not None and (end < len(buffer) or eof):
+                pos = end
+                return value
+            if eof:
+                raise ValueError("Malformed value in bulk dump")
+            fill()
+
+    if next_char() != '{':
+        raise ValueError("Bulk dump is not a JSON object")
+    pos += 1
+    if next_char() == '}':
+        return
+    while True:
+        next_char()
+        key = decode_value()
+        if next_char() != ':':
+            raise ValueError(f"Expected ':' after key {key!r}")
+        pos += 1
+        next_char()
+        yield key, decode_value()
+        separator = next_char()
+        pos += 1
+        if separator == '}':
+            return
+        if separator != ',':
+            raise ValueError(f"Expected ',' or '}}' after key {key!r}")
+
+class BulkSnapshot:
+    """Compact typed table of one os_dump snapshot.
+
+    Holds one NumPy array per field in ``COLUMNS`` (absent numbers are
+    ``MISSING``), a parallel ``names`` list, the ``%...%`` metadata keys in
+    ``metadata``, and dict indexes for O(1) lookup by item id or name.
+    """
+
+    def __init__(self, columns, names, metadata):
+        self.columns = columns
+        self.names = names
+        self.metadata = metadata
+        self.id_index = {int(item_id): row for row, item_id in enumerate(columns['id'])}
+        self.name_index = {name: int(item_id) for name, item_id in zip(names, columns['id'])}
+
+    @classmethod
+    def from_members(cls, members):
+        values = {name: [] for name in COLUMNS}
+        names = []
+        metadata = {}
+        for key, item in members:
+            if key.startswith('%'):
+                metadata[key] = item
+                continue
+            for name in COLUMNS:
+                value = item.get(name)
+                values[name].append((False if name == 'members' else MISSING) if value is None else value)
+            names.append(item.get('name'))
+        columns = {name: np.array(values[name], dtype=dtype) for name, dtype in COLUMNS.items()}
+        return cls(columns, names, metadata)
+
+    @classmethod
+    def from_file(cls, path='osrs_bulk_data.json'):
+        with open(path, 'rb') as f:
+            return cls.from_members(iter_dump_members(f))
+
+    @classmethod
+    def from_url(cls, url=OS_DUMP_URL):
+        request = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
+        with urllib.request.urlopen(request) as response:
+            return cls.from_members(iter_dump_members(response))
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def jagex_timestamp(self):
+        value = self.metadata.get('%JAGEX_TIMESTAMP%')
+        return None if value is None else int(float(value))
+
+    @property
+    def update_detected(self):
+        value = self.metadata.get('%UPDATE_DETECTED%')
+        return None if value is None else float(value)
+
+    def row(self, item_id):
+        """Return an item's fields as a dict, or None if it is not in the snapshot."""
+        index = self.id_index.get(int(item_id))
+        if index is None:
+            return None
+        row = {name: self.columns[name][index].item() for name in COLUMNS}
+        row['name'] = self.names[index]
+        return row
+
+    def id_for_name(self, name):
+        return self.name_index.get(name)
+
+    def by_name(self, name):
+        item_id = self.id_for_name(name)
+        return None if item_id is None else self.row(item_id)
+
+    def price(self, item_id):
+        index = self.id_index.get(int(item_id))
+        if index is None:
+            return None
+        price = int(self.columns['price'][index])
+        return None if price == MISSING else price
+
+    def prices(self):
+        """{item_id: price} for every item that has a price."""
+        has_price = self.columns['price'] != MISSING
+        return dict(zip(self.columns['id'][has_price].tolist(), self.columns['price'][has_price].tolist()))
+
+    def to_frame(self):
+        frame = pd.DataFrame(self.columns)
+        frame.insert(1, 'name', self.names)
+        return frame.set_index('id')
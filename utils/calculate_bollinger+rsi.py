@@ -1,21 +1,12 @@
 import pandas as pd
 import json
-from prediction_tracker import PredictionTracker
+import os
+import sys
 
-def calculate_bollinger_bands(prices, window):
-    moving_avg = prices.rolling(window=window).mean()
-    std_dev = prices.rolling(window=window).std()
-    upper_band = moving_avg + (2 * std_dev)
-    lower_band = moving_avg - (2 * std_dev)
-    return moving_avg, upper_band, lower_band
-
-def calculate_rsi(prices, window):
-    delta = prices.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+# prediction_tracker uses package-relative imports, so load the utils modules as a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.calculate_indicators import calculate_bollinger_bands, calculate_rsi
+from utils.prediction_tracker import PredictionTracker
 
 def load_price_data_from_json(file_path, item_id):
     with open(file_path, 'r') as file:
@@ -72,6 +63,7 @@ def main():
     # Initialize tracker and record prediction
     tracker = PredictionTracker()
     prediction_id = tracker.record_prediction(item_id, analysis_data)
+    tracker.close()
     
     # Print analysis
     print(f"\nPrediction ID: {prediction_id}")
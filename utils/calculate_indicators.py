@@ -0,0 +1,151 @@
+import math
+import numpy as np
+import pandas as pd
+
+# Every function takes one price series (pd.Series or 1-D array) or an items x bars
+# 2-D array, and returns the same shape: a Series keeps its index, arrays stay arrays.
+# Rolling windows use pandas over a bars x items DataFrame, so one call covers all items
+# and values match a per-item pandas computation exactly. NaN marks missing prices;
+# pad shorter histories with leading NaN (see ``stack_prices``) and every indicator
+# warms up from each item's first real price.
+
+RSI_METHODS = ['sma', 'wilder']
+
+def stack_prices(series, length=None):
+    """items x bars float array of several histories, aligned on their last bar.
+
+    Shorter histories are padded with NaN at the start; ``length`` (default:
+    the longest history) keeps only the most recent bars.
+    """
+    series = [np.asarray(values, dtype=float) for values in series]
+    length = length if length is not None else max((len(values) for values in series), default=0)
+    matrix = np.full((len(series), length), np.nan)
+    for row, values in zip(matrix, series):
+        values = values[-length:] if length else values[:0]
+        row[length - len(values):] = values
+    return matrix
+
+def _frame(prices):
+    """A Series for one price series, a bars x items DataFrame for an items x bars array."""
+    values = np.asarray(prices, dtype=float)
+    return pd.Series(values) if values.ndim == 1 else pd.DataFrame(values.T)
+
+def _like(prices, result):
+    """Give a result the input's type and shape."""
+    values = result.to_numpy()
+    if isinstance(prices, pd.Series):
+        return pd.Series(values, index=prices.index, name=prices.name)
+    return values if values.ndim == 1 else values.T
+
+def calculate_moving_average(prices, window):
+    return _like(prices, _frame(prices).rolling(window=window).mean())
+
+def calculate_moving_std(prices, window, ddof=1):
+    return _like(prices, _frame(prices).rolling(window=window).std(ddof=ddof))
+
+def calculate_bollinger_bands(prices, window, num_std=2):
+    rolling = _frame(prices).rolling(window=window)
+    moving_avg = rolling.mean()
+    std_dev = rolling.std()
+    upper_band = moving_avg + (num_std * std_dev)
+    lower_band = moving_avg - (num_std * std_dev)
+    return _like(prices, moving_avg), _like(prices, upper_band), _like(prices, lower_band)
+
+def _wilder_average(values, window):
+    """Wilder smoothing: an SMA of the first ``window`` values, then avg += (x - avg) / window."""
+    seed = values.rolling(window=window).mean()
+    started = seed.notna().cummax()
+    first = started & ~started.shift(1, fill_value=False)
+    return values.where(started).mask(first, seed).ewm(alpha=1 / window, adjust=False).mean()
+
+def calculate_rsi(prices, window, method='sma'):
+    """RSI with SMA-smoothed gains and losses (``method='sma'``, the enriched exports) or Wilder's.
+
+    The SMA version counts the first bar's undefined change as no change, as
+    it always has; Wilder's seeds from the first ``window`` real changes.
+    """
+    frame = _frame(prices)
+    delta = frame.diff()
+    gain = delta.where(delta > 0, 0)
+    loss = -delta.where(delta < 0, 0)
+    if method == 'sma':
+        # Padding before an item's history stays missing
+        missing = np.isnan(frame.to_numpy())
+        if missing.any():
+            gain = gain.mask(missing)
+            loss = loss.mask(missing)
+        gain = gain.rolling(window=window).mean()
+        loss = loss.rolling(window=window).mean()
+    elif method == 'wilder':
+        missing = delta.isna()
+        gain = _wilder_average(gain.mask(missing), window)
+        loss = _wilder_average(loss.mask(missing), window)
+    else:
+        raise ValueError(f"Unknown RSI method: {method}")
+    rs = gain / loss
+    rsi = 100 - (100 / (1 + rs))
+    return _like(prices, rsi)
+
+def calculate_ema(prices, span):
+    return _like(prices, _frame(prices).ewm(span=span, adjust=False).mean())
+
+def calculate_macd(prices, fast=12, slow=26, signal=9):
+    frame = _frame(prices)
+    ema_fast = frame.ewm(span=fast, adjust=False).mean()
+    ema_slow = frame.ewm(span=slow, adjust=False).mean()
+    macd = ema_fast - ema_slow
+    macd_signal = macd.ewm(span=signal, adjust=False).mean()
+    return _like(prices, macd), _like(prices, macd_signal), _like(prices, macd - macd_signal)
+
+def calculate_signal_strength(price, ma, upper, lower, rsi, weights):
+    """Combine Bollinger, RSI and MA readings into a score in [-100, 100].
+
+    Positive scores are buy pressure, negative scores are sell pressure.
+    Any component whose inputs are missing (NaN) contributes 0. Scalars take
+    a plain-float path; arrays (one bar per element, any shape) are scored
+    in one vectorized call.
+    """
+    if np.ndim(price) > 0:
+        scores = calculate_signal_components(price, ma, upper, lower, rsi)
+        return sum(weights[name] * scores[name] for name in ['bollinger', 'rsi', 'ma'])
+
+    bollinger_score = 0.0
+    if not (math.isnan(upper) or math.isnan(lower)) and upper > lower:
+        # -1 at the upper band, +1 at the lower band
+        half_width = (upper - lower) / 2
+        bollinger_score = max(-1.0, min(1.0, (ma - price) / half_width)) * 100
+
+    rsi_score = 0.0
+    if not math.isnan(rsi):
+        # RSI 30 -> +40, RSI 70 -> -40, extremes saturate at +/-100
+        rsi_score = (50 - rsi) * 2
+
+    ma_score = 0.0
+    if not math.isnan(ma) and ma > 0:
+        # 10% below the MA saturates at +100, 10% above at -100
+        ma_score = max(-1.0, min(1.0, (ma - price) / ma * 10)) * 100
+
+    return (weights['bollinger'] * bollinger_score +
+            weights['rsi'] * rsi_score +
+            weights['ma'] * ma_score)
+
+def calculate_signal_components(prices, ma, upper, lower, rsi):
+    """Vectorized per-bar component scores behind ``calculate_signal_strength``.
+
+    Takes equal-shape arrays and returns a dict of 'bollinger', 'rsi' and 'ma'
+    score arrays, each in [-100, 100] with NaN inputs scored as 0. The weighted
+    sum of the three equals ``calculate_signal_strength`` bar by bar.
+    """
+    prices, ma, upper, lower, rsi = (np.asarray(a, dtype=float) for a in (prices, ma, upper, lower, rsi))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        band_ok = upper > lower
+        half_width = np.where(band_ok, (upper - lower) / 2, 1.0)
+        bollinger = np.where(band_ok, np.clip((ma - prices) / half_width, -1.0, 1.0) * 100, 0.0)
+
+        rsi_score = np.where(np.isnan(rsi), 0.0, (50 - rsi) * 2)
+
+        ma_ok = ma > 0
+        safe_ma = np.where(ma_ok, ma, 1.0)
+        ma_score = np.where(ma_ok, np.clip((ma - prices) / safe_ma * 10, -1.0, 1.0) * 100, 0.0)
+
+    return {'bollinger': bollinger, 'rsi': rsi_score, 'ma': ma_score}
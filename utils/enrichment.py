@@ -0,0 +1,171 @@
+import argparse
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .calculate_indicators import calculate_macd, calculate_moving_average, calculate_moving_std, calculate_rsi
+from .indicator_provider import DECIMALS, IndicatorProvider, PROJECT_ROOT
+from .price_db import PriceDatabase
+from .price_store import PriceStore
+
+PERIODS = [5, 7, 14, 20, 90, 180, 365]
+RSI_PERIODS = [7, 14]
+LAYOUTS = ['nested', 'columnar']
+# Provider workers for export_items, set once per process by _init_worker
+_PROVIDER = None
+
+def _init_worker(data_dir=PROJECT_ROOT, db_path=None, store_dir=None):
+    global _PROVIDER
+    database = PriceDatabase(db_path) if db_path else None
+    store = PriceStore(store_dir) if store_dir else None
+    _PROVIDER = IndicatorProvider(data_dir=data_dir, store=store, database=database)
+
+def enriched_matrix(prices, periods=PERIODS, rsi_periods=RSI_PERIODS, decimals=DECIMALS):
+    """(columns, matrix): the (group, key, field) of each row of a (columns x bars) float array.
+
+    Row 0 is the price, then ma, std, bollinger upper/lower, rsi and macd in
+    the order of the enriched export. Each rolling mean and std is computed
+    once per period; the bands come from the stacked (periods x bars) arrays
+    in one operation and the whole matrix is rounded at once. NaN marks a
+    missing value.
+    """
+    prices = np.asarray(prices, dtype=float)
+    keys = [str(period) for period in periods]
+    ma = np.vstack([calculate_moving_average(prices, period) for period in periods])
+    std = np.vstack([calculate_moving_std(prices, period) for period in periods])
+    bands = np.empty((2 * len(periods), len(prices)))
+    bands[0::2] = ma + 2 * std
+    bands[1::2] = ma - 2 * std
+    rsi = [calculate_rsi(prices, period) for period in rsi_periods]
+    macd = calculate_macd(prices)
+
+    columns = ([('price', None, None)] + [('ma', key, None) for key in keys] + [('std', key, None) for key in keys]
+               + [('bollinger', key, field) for key in keys for field in ['upper', 'lower']]
+               + [('rsi', str(period), None) for period in rsi_periods]
+               + [('macd', field, None) for field in ['macd', 'signal', 'hist']])
+    matrix = np.vstack([prices, ma, std, bands, *rsi, *macd])
+    return columns, np.round(matrix, decimals)
+
+def _json_texts(matrix):
+    """JSON text of every value in the matrix ('null' for NaN), as json.dumps would write it.
+
+    Rounded prices and indicators repeat a lot, so only the distinct values are
+    formatted. Values are told apart by their bits so -0.0 keeps its sign.
+    """
+    unique, inverse = np.unique(np.ascontiguousarray(matrix, dtype=np.float64).view(np.int64), return_inverse=True)
+    values = unique.view(np.float64).tolist()
+    texts = np.array(['null' if value != value else repr(value) for value in values], dtype=object)
+    return texts[inverse.reshape(matrix.shape)]
+
+def _placeholders(columns, record):
+    """Fill ``record['indicators']`` with an "@@<row>@@" placeholder per column, nested like the export."""
+    for i, (group, key, field) in enumerate(columns[1:], 1):
+        slot = record['indicators'].setdefault(group, {})
+        if field is None:
+            slot[key] = f'@@{i}@@'
+        else:
+            slot.setdefault(key, {})[field] = f'@@{i}@@'
+    return record
+
+PLACEHOLDER = re.compile(r'"@@(\w+)@@"')
+
+def nested_json(dates, columns, matrix):
+    """Text of the nested enriched export, identical to ``json.dump(records, f, indent=2)``.
+
+    One indent=2 record is rendered with placeholders and turned into a
+    %-template; every bar is then a single string format of pre-rendered
+    values instead of a json.dump of a nested dict.
+    """
+    if not dates:
+        return '[]'
+    record = _placeholders(columns, {'date': '@@date@@', 'price': '@@0@@', 'indicators': {}})
+    # Indent as an element of the top-level list, then cut the list brackets off again
+    text = json.dumps([record], indent=2)[2:-2].replace('%', '%%')
+    order = PLACEHOLDER.findall(text)
+    template = PLACEHOLDER.sub('%s', text)
+    texts = _json_texts(matrix)
+    slots = {'date': [json.dumps(date) for date in dates]}
+    slots.update((str(i), row.tolist()) for i, row in enumerate(texts))
+    rows = zip(*(slots[slot] for slot in order))
+    return '[\n' + ',\n'.join(template % values for values in rows) + '\n]'
+
+def columnar_json(item_id, dates, columns, matrix):
+    """Compact column-per-indicator layout: one array per column instead of one object per bar.
+
+    ``{"item_id", "dates": [...], "price": [...], "indicators": {group: {key: [...] or {field: [...]}}}}``
+    """
+    record = _placeholders(columns, {'item_id': str(item_id), 'dates': '@@date@@', 'price': '@@0@@',
+                                     'indicators': {}})
+    text = json.dumps(record, separators=(',', ':'))
+    arrays = {'date': json.dumps(dates, separators=(',', ':'))}
+    arrays.update((str(i), '[' + ','.join(row) + ']') for i, row in enumerate(_json_texts(matrix)))
+    return PLACEHOLDER.sub(lambda match: arrays[match.group(1)], text)
+
+def enriched_path(output_dir, item_id, layout='nested'):
+    suffix = 'enriched' if layout == 'nested' else 'enriched_columnar'
+    return os.path.join(output_dir, f'historical_data_{item_id}_{suffix}.json')
+
+def export_item(provider, item_id, output_dir=PROJECT_ROOT, layout='nested'):
+    """Write one item's enriched export; returns its path (None when the item has no history)."""
+    if not provider.has_history(item_id):
+        return None
+    columns, matrix = enriched_matrix(provider.prices(item_id))
+    dates = provider.dates(item_id)
+    if layout == 'nested':
+        text = nested_json(dates, columns, matrix)
+    else:
+        text = columnar_json(item_id, dates, columns, matrix)
+    path = enriched_path(output_dir, item_id, layout)
+    with open(path, 'w') as f:
+        f.write(text)
+    return path
+
+def _export_task(task):
+    item_id, output_dir, layout = task
+    return export_item(_PROVIDER, item_id, output_dir, layout)
+
+def export_items(item_ids, output_dir=PROJECT_ROOT, layout='nested', workers=None, data_dir=PROJECT_ROOT,
+                 db_path=None, store_dir=None, chunksize=None):
+    """Export many items across a process pool; returns the paths written.
+
+    Each worker builds its own provider (and database connection) once, so
+    only item ids and output paths cross process boundaries.
+    """
+    item_ids = list(item_ids)
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = [(item_id, output_dir, layout) for item_id in item_ids]
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(tasks) // (workers * 8))
+    if workers == 1:
+        _init_worker(data_dir, db_path, store_dir)
+        paths = [_export_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data_dir, db_path, store_dir)) as executor:
+            paths = list(executor.map(_export_task, tasks, chunksize=chunksize))
+    return [path for path in paths if path is not None]
+
+def main():
+    # Usage: python -m utils.enrichment 327 453 [--layout columnar] [--all] [--output-dir DIR]
+    parser = argparse.ArgumentParser(description='Write historical_data_<id>_enriched.json exports.')
+    parser.add_argument('items', nargs='*', type=int, help='Item ids (default: 327)')
+    parser.add_argument('--all', action='store_true', help='Every item in the price store (in the database with --db)')
+    parser.add_argument('--layout', choices=LAYOUTS, default='nested')
+    parser.add_argument('--output-dir', default=PROJECT_ROOT)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--db', default=None, help='Load histories from a price database (SQLite path or postgresql:// DSN)')
+    args = parser.parse_args()
+
+    if args.all and args.db:
+        with PriceDatabase(args.db) as database:
+            item_ids = database.items()
+    elif args.all:
+        item_ids = IndicatorProvider().store.items()
+    else:
+        item_ids = args.items or [327]
+    paths = export_items(item_ids, args.output_dir, args.layout, workers=args.workers, db_path=args.db)
+    print(f"Saved {len(paths)} enriched exports ({args.layout}) to {args.output_dir}")
+
+if __name__ == "__main__":
+    main()
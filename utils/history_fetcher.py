@@ -0,0 +1,269 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from .bulk_snapshot import BulkSnapshot
+from .price_store import PriceStore, PROJECT_ROOT, MISSING_VOLUME
+
+WEIRDGLOOP_URL = 'https://api.weirdgloop.org'
+HISTORY_PATH = '/exchange/history/osrs/all'
+LAST_90D_PATH = '/exchange/history/osrs/last90d'
+LATEST_PATH = '/exchange/history/osrs/latest'
+DAY_MS = 86400 * 1000
+DEFAULT_PROGRESS_PATH = os.path.join(PROJECT_ROOT, 'fetch_progress.json')
+
+# Responses worth retrying; anything else (e.g. 404) is a permanent failure
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+def timestamp_ms(value):
+    """History points carry epoch ms; /latest reports an ISO-8601 string instead."""
+    if isinstance(value, str):
+        return int(datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp() * 1000)
+    return int(value)
+
+class HostRateLimiter:
+    """Spaces out request starts so each host sees at most ``rate`` requests per second."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, host):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+class FetchProgress:
+    """Item ids already stored, persisted to JSON so an interrupted run can resume."""
+
+    def __init__(self, path=DEFAULT_PROGRESS_PATH):
+        self.path = path
+        self.done = set()
+        self.failed = {}
+        if path and os.path.exists(path):
+            with open(path, 'r') as f:
+                saved = json.load(f)
+            self.done = set(saved.get('done', []))
+            self.failed = {int(k): v for k, v in saved.get('failed', {}).items()}
+
+    def mark_done(self, item_id):
+        self.done.add(item_id)
+        self.failed.pop(item_id, None)
+
+    def mark_failed(self, item_id, reason):
+        self.failed[item_id] = reason
+
+    def clear_failed(self, item_id):
+        self.failed.pop(item_id, None)
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'done': sorted(self.done), 'failed': self.failed}, f)
+        os.replace(tmp_path, self.path)
+
+class HistoryFetcher:
+    """Concurrent asyncio client for the weirdgloop price history endpoint.
+
+    One ``aiohttp.ClientSession`` is shared for the whole run so connections are
+    kept alive; ``max_concurrency`` bounds requests in flight, ``rate_limit``
+    caps requests per second per host, and failed requests are retried with
+    exponential backoff (honouring ``Retry-After``). Every fetched history is
+    written straight into a ``PriceStore`` and recorded in ``FetchProgress``.
+    ``sync_all`` is the incremental mode: it only requests points newer than
+    what the store already holds, using ``/latest`` or ``/last90d`` when they
+    cover the gap. ``base_url`` can point at a local stub server.
+    """
+
+    def __init__(self, store=None, base_url=WEIRDGLOOP_URL, path=HISTORY_PATH, max_concurrency=16,
+                 rate_limit=10.0, max_retries=5, backoff_base=0.5, backoff_max=30.0, timeout=30.0,
+                 progress=None, save_every=50, on_append=None):
+        self.store = store or PriceStore()
+        self.base_url = base_url.rstrip('/')
+        self.path = path
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = HostRateLimiter(rate_limit)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.progress = progress if progress is not None else FetchProgress()
+        self.save_every = save_every
+        # Called as on_append(item_id, count) after new points land, e.g. IndicatorProvider.extend
+        self.on_append = on_append
+
+    def url(self, item_id, path=None):
+        return f"{self.base_url}{path or self.path}?id={item_id}"
+
+    @staticmethod
+    def sync_path(last_timestamp, now_ms):
+        """Pick the smallest endpoint that still covers everything after ``last_timestamp``."""
+        if last_timestamp is None:
+            return HISTORY_PATH
+        age = now_ms - last_timestamp
+        # Daily history: within two days at most one point is missing
+        if age < 2 * DAY_MS:
+            return LATEST_PATH
+        if age < 89 * DAY_MS:
+            return LAST_90D_PATH
+        return HISTORY_PATH
+
+    def backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return retry_after
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * (0.5 + random.random() / 2)
+
+    async def fetch_json(self, session, url):
+        """GET a JSON document, retrying transient failures; raises on permanent ones."""
+        host = urlsplit(url).netloc
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.wait(host)
+            retry_after = None
+            try:
+                async with session.get(url) as response:
+                    if response.status not in RETRY_STATUSES:
+                        response.raise_for_status()
+                        return await response.json(content_type=None)
+                    error = aiohttp.ClientResponseError(
+                        response.request_info, response.history, status=response.status, message=response.reason
+                    )
+                    if response.headers.get('Retry-After', '').isdigit():
+                        retry_after = float(response.headers['Retry-After'])
+            except aiohttp.ClientResponseError:
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+            if attempt == self.max_retries:
+                raise error
+            await asyncio.sleep(self.backoff(attempt, retry_after))
+
+    async def fetch_item(self, session, semaphore, item_id):
+        async with semaphore:
+            try:
+                data = await self.fetch_json(session, self.url(item_id))
+                history = data.get(str(item_id)) if isinstance(data, dict) else None
+                if not history:
+                    raise ValueError("empty history")
+                # Disk writes are small and sequential; keep them off the event loop anyway
+                await asyncio.to_thread(self.store.import_history, item_id, history)
+            except Exception as e:
+                self.progress.mark_failed(item_id, str(e) or type(e).__name__)
+                return False
+            self.progress.mark_done(item_id)
+            return True
+
+    async def sync_item(self, session, semaphore, item_id, now_ms):
+        """Append only the points newer than the item's last stored timestamp; returns how many."""
+        async with semaphore:
+            last_timestamp = await asyncio.to_thread(self.store.last_timestamp, item_id)
+            path = self.sync_path(last_timestamp, now_ms)
+            data = await self.fetch_json(session, self.url(item_id, path))
+            points = data.get(str(item_id)) if isinstance(data, dict) else None
+            if isinstance(points, dict):
+                # /latest returns a single point rather than a list
+                points = [points]
+            points = [dict(p, timestamp=timestamp_ms(p['timestamp'])) for p in points or []]
+            points = [p for p in points if last_timestamp is None or p['timestamp'] > last_timestamp]
+            if not points:
+                return 0
+            points.sort(key=lambda p: p['timestamp'])
+            await asyncio.to_thread(self.append_points, item_id, points)
+            if self.on_append is not None:
+                self.on_append(item_id, len(points))
+            return len(points)
+
+    def append_points(self, item_id, points):
+        volumes = None
+        if any(p.get('volume') is not None for p in points):
+            volumes = [MISSING_VOLUME if p.get('volume') is None else p['volume'] for p in points]
+        self.store.append(item_id, [p['timestamp'] for p in points], [p['price'] for p in points], volumes)
+
+    async def sync_all(self, item_ids):
+        """Delta-sync every item; returns {item_id: points appended} (failed items are skipped)."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+        now_ms = int(time.time() * 1000)
+        appended = {}
+        async with aiohttp.ClientSession(connector=connector, timeout=self.timeout,
+                                         headers={'User-Agent': 'OSRS-GE-Trading-App-BE'}) as session:
+            results = await asyncio.gather(
+                *(self.sync_item(session, semaphore, item_id, now_ms) for item_id in item_ids),
+                return_exceptions=True
+            )
+        for item_id, result in zip(item_ids, results):
+            if isinstance(result, Exception):
+                self.progress.mark_failed(item_id, str(result) or type(result).__name__)
+            else:
+                self.progress.clear_failed(item_id)
+                appended[item_id] = result
+        return appended
+
+    async def fetch_all(self, item_ids):
+        """Fetch and store every item not already recorded as done; returns (fetched, failed) counts."""
+        pending = [item_id for item_id in item_ids if item_id not in self.progress.done]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+        fetched = failed = 0
+        async with aiohttp.ClientSession(connector=connector, timeout=self.timeout,
+                                         headers={'User-Agent': 'OSRS-GE-Trading-App-BE'}) as session:
+            tasks = [asyncio.create_task(self.fetch_item(session, semaphore, item_id)) for item_id in pending]
+            try:
+                for completed, task in enumerate(asyncio.as_completed(tasks), 1):
+                    if await task:
+                        fetched += 1
+                    else:
+                        failed += 1
+                    if completed % self.save_every == 0:
+                        self.progress.save()
+            finally:
+                for task in tasks:
+                    task.cancel()
+                self.progress.save()
+        return fetched, failed
+
+def catalogue_item_ids(bulk_path=os.path.join(PROJECT_ROOT, 'osrs_bulk_data.json')):
+    return sorted(BulkSnapshot.from_file(bulk_path).columns['id'].tolist())
+
+def main():
+    parser = argparse.ArgumentParser(description='Fetch item price history into the price store.')
+    parser.add_argument('items', nargs='*', type=int, help='Item ids (default: every item in osrs_bulk_data.json)')
+    parser.add_argument('--base-url', default=WEIRDGLOOP_URL)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--rate', type=float, default=10.0, help='Max requests per second per host')
+    parser.add_argument('--progress', default=DEFAULT_PROGRESS_PATH)
+    parser.add_argument('--sync', action='store_true', help='Only fetch points newer than the stored history')
+    args = parser.parse_args()
+
+    item_ids = args.items or catalogue_item_ids()
+    fetcher = HistoryFetcher(base_url=args.base_url, max_concurrency=args.concurrency, rate_limit=args.rate,
+                             progress=FetchProgress(args.progress))
+    start = time.perf_counter()
+    if args.sync:
+        appended = asyncio.run(fetcher.sync_all(item_ids))
+        fetcher.progress.save()
+        print(f"Appended {sum(appended.values())} points across {sum(1 for n in appended.values() if n)} items "
+              f"in {time.perf_counter() - start:.1f}s")
+    else:
+        fetched, failed = asyncio.run(fetcher.fetch_all(item_ids))
+        print(f"Fetched {fetched} items, {failed} failed, in {time.perf_counter() - start:.1f}s")
+    if fetcher.progress.failed:
+        print(f"Failed items are listed in {args.progress}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict, namedtuple
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.path.join(PROJECT_ROOT, 'indicator_cache')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Identifies the exact source series a column was computed from
+SeriesVersion = namedtuple('SeriesVersion', ['length', 'last_timestamp', 'digest'])
+
+def series_version(prices, timestamps, length=None):
+    """Version of the first ``length`` bars (default: all) of a price/timestamp series."""
+    length = len(prices) if length is None else length
+    prices = np.ascontiguousarray(prices[:length], dtype=np.float64)
+    timestamps = np.ascontiguousarray(timestamps[:length], dtype=np.int64)
+    digest = hashlib.blake2b(prices.tobytes() + timestamps.tobytes(), digest_size=16).hexdigest()
+    last_timestamp = int(timestamps[-1]) if length else None
+    return SeriesVersion(length, last_timestamp, digest)
+
+class IndicatorCache:
+    """LRU cache of computed indicator columns, optionally backed by a directory.
+
+    Entries are keyed by (item_id, indicator, period, decimals) and carry the
+    ``SeriesVersion`` of the series they were computed from, so a caller can
+    tell an exact hit from an entry that only covers a prefix of the current
+    data (extend it) or a stale one (recompute). Memory use is bounded by
+    ``max_bytes``; least recently used entries are dropped first. With
+    ``cache_dir`` every stored column is also written as ``.npy`` plus a JSON
+    version sidecar and read back on a memory miss, so later processes and
+    runs start warm.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, cache_dir=None):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def keys(self):
+        return list(self._entries)
+
+    def _path(self, key):
+        item_id, indicator, period, decimals = key
+        return os.path.join(self.cache_dir, str(item_id), f"{indicator}_{period}_{decimals}")
+
+    def get(self, key):
+        """Return (version, values) or None."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        entry = self._read(key) if self.cache_dir else None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._remember(key, entry)
+        return entry
+
+    def put(self, key, version, values):
+        entry = (version, values)
+        self._remember(key, entry)
+        if self.cache_dir:
+            self._write(key, entry)
+
+    def _remember(self, key, entry):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1].nbytes
+        self._entries[key] = entry
+        self._bytes += entry[1].nbytes
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, values) = self._entries.popitem(last=False)
+            self._bytes -= values.nbytes
+
+    def _read(self, key):
+        path = self._path(key)
+        try:
+            with open(f"{path}.json", 'r') as f:
+                version = SeriesVersion(**json.load(f))
+            values = np.load(f"{path}.npy")
+        except (OSError, ValueError, TypeError):
+            return None
+        if len(values) != version.length:
+            return None
+        return version, values
+
+    def _write(self, key, entry):
+        version, values = entry
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write the array before its sidecar, each via rename, so readers never see a torn pair
+        np.save(f"{path}.tmp.npy", values)
+        os.replace(f"{path}.tmp.npy", f"{path}.npy")
+        with open(f"{path}.json.tmp", 'w') as f:
+            json.dump(version._asdict(), f)
+        os.replace(f"{path}.json.tmp", f"{path}.json")
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
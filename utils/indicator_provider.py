@@ -0,0 +1,259 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from .backtest_kernel import BarArrays
+from .indicator_cache import IndicatorCache, series_version
+from .calculate_indicators import (
+    calculate_bollinger_bands, calculate_ema, calculate_macd, calculate_moving_average, calculate_moving_std,
+    calculate_rsi
+)
+from .price_store import PriceStore
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Indicators that take a period; MACD uses fixed (12, 26, 9) spans
+PERIOD_INDICATORS = ['ma', 'std', 'bollinger_upper', 'bollinger_lower', 'rsi', 'rsi_wilder', 'ema']
+MACD_INDICATORS = ['macd', 'macd_signal', 'macd_hist']
+
+# Enriched exports round every value to 2 decimals; backtests rely on that precision
+DECIMALS = 2
+
+class IndicatorProvider:
+    """Lazily computed, memoized indicator columns for raw item histories.
+
+    Reads the item's history on first use (from ``database`` when one is given
+    and has the item, then the columnar ``PriceStore``, else
+    ``historical_data_<item_id>.json``) and computes each
+    requested (indicator, period) column with vectorized pandas rolling
+    operations, rounded like the enriched export. Backtests can ask for just
+    the columns they need instead of loading ``historical_data_<id>_enriched.json``.
+
+    Columns live in an ``IndicatorCache`` (pass one with a ``cache_dir`` to
+    share results between runs). A cached column computed from an earlier,
+    shorter version of the same history is extended over the new bars only.
+    """
+
+    def __init__(self, data_dir=PROJECT_ROOT, decimals=DECIMALS, store=None, database=None, cache=None):
+        self.data_dir = data_dir
+        self.store = store if store is not None else PriceStore()
+        self.database = database
+        self.decimals = decimals
+        self.cache = cache if cache is not None else IndicatorCache()
+        self._prices = {}
+        self._timestamps = {}
+        self._versions = {}
+        self._dates = {}
+        self._sources = {}
+
+    def history_path(self, item_id):
+        return os.path.join(self.data_dir, f'historical_data_{item_id}.json')
+
+    def _load(self, item_id):
+        item_id = str(item_id)
+        if item_id not in self._prices:
+            if self.database is not None and self.database.has(item_id):
+                series = self.database.load_series(item_id)
+                self._prices[item_id] = series.reset_index(drop=True)
+                timestamps = pd.Series(series.index.as_unit('ms').asi8)
+                self._sources[item_id] = 'database'
+            elif self.store.has(item_id):
+                history = self.store.load(item_id)
+                self._prices[item_id] = pd.Series(history.prices, dtype=float)
+                timestamps = pd.Series(history.timestamps)
+                self._sources[item_id] = 'store'
+            else:
+                with open(self.history_path(item_id), 'r') as f:
+                    history = json.load(f)[item_id]
+                self._prices[item_id] = pd.Series([float(entry['price']) for entry in history])
+                timestamps = pd.Series([entry['timestamp'] for entry in history])
+                self._sources[item_id] = 'json'
+            self._set_timestamps(item_id, timestamps.to_numpy(dtype=np.int64))
+            self._dates[item_id] = pd.to_datetime(timestamps, unit='ms').dt.strftime('%Y-%m-%d').tolist()
+        return self._prices[item_id]
+
+    def _set_timestamps(self, item_id, timestamps):
+        self._timestamps[item_id] = timestamps
+        self._versions[item_id] = series_version(self._prices[item_id].to_numpy(), timestamps)
+
+    def version(self, item_id):
+        """SeriesVersion of the item's loaded history."""
+        self._load(item_id)
+        return self._versions[str(item_id)]
+
+    def prices(self, item_id):
+        """Raw price series for an item."""
+        return self._load(item_id)
+
+    def dates(self, item_id):
+        """'YYYY-MM-DD' strings aligned with ``prices``."""
+        self._load(item_id)
+        return self._dates[str(item_id)]
+
+    def get(self, item_id, indicator, period=None):
+        """Return an indicator column as a float ndarray (NaN during warm-up)."""
+        item_id = str(item_id)
+        self._load(item_id)
+        key = (item_id, indicator, period, self.decimals)
+        version = self._versions[item_id]
+        cached = self.cache.get(key)
+        if cached is not None:
+            cached_version, values = cached
+            if cached_version == version:
+                return values
+            if self.continues(item_id, cached_version):
+                values = self._extend_column(item_id, indicator, period, values)
+                self.cache.put(key, version, values)
+                return values
+        values = np.round(self._compute(item_id, indicator, period).to_numpy(dtype=float), self.decimals)
+        self.cache.put(key, version, values)
+        return values
+
+    def continues(self, item_id, version):
+        """True when the loaded history is ``version``'s series plus appended bars."""
+        item_id = str(item_id)
+        self._load(item_id)
+        length = version.length
+        if length > len(self._prices[item_id]):
+            return False
+        return series_version(self._prices[item_id].to_numpy(), self._timestamps[item_id], length) == version
+
+    def _extend_column(self, item_id, indicator, period, values):
+        """Compute only the bars after ``values`` (plus their lookback window) and append them."""
+        old_len = len(values)
+        new_count = len(self._prices[item_id]) - old_len
+        if not new_count:
+            return values
+        lookback = self.lookback(indicator, period)
+        if lookback is None:
+            return np.round(self._compute(item_id, indicator, period).to_numpy(dtype=float), self.decimals)
+        start = max(0, old_len - lookback)
+        tail = self._compute_series(self._prices[item_id].iloc[start:].reset_index(drop=True), indicator, period)
+        tail = np.round(tail.to_numpy(dtype=float)[-new_count:], self.decimals)
+        return np.concatenate([values, tail])
+
+    def _compute(self, item_id, indicator, period):
+        return self._compute_series(self._load(item_id), indicator, period)
+
+    def _compute_series(self, prices, indicator, period):
+        if indicator == 'price':
+            return prices
+        if indicator in MACD_INDICATORS:
+            macd, macd_signal, macd_hist = calculate_macd(prices)
+            return {'macd': macd, 'macd_signal': macd_signal, 'macd_hist': macd_hist}[indicator]
+        if indicator not in PERIOD_INDICATORS:
+            raise ValueError(f"Unknown indicator: {indicator}")
+        if period is None:
+            raise ValueError(f"Indicator '{indicator}' needs a period")
+        if indicator == 'ma':
+            return calculate_moving_average(prices, period)
+        if indicator == 'std':
+            return calculate_moving_std(prices, period)
+        if indicator == 'rsi':
+            return calculate_rsi(prices, period)
+        if indicator == 'rsi_wilder':
+            return calculate_rsi(prices, period, method='wilder')
+        if indicator == 'ema':
+            return calculate_ema(prices, period)
+        _, upper, lower = calculate_bollinger_bands(prices, period)
+        return upper if indicator == 'bollinger_upper' else lower
+
+    def lookback(self, indicator, period):
+        """Bars before a point that its value depends on (None: whole history, e.g. EMAs)."""
+        if indicator == 'price':
+            return 0
+        if indicator in MACD_INDICATORS or indicator in ('rsi_wilder', 'ema'):
+            return None
+        return period if indicator == 'rsi' else period - 1
+
+    def has_history(self, item_id):
+        return ((self.database is not None and self.database.has(item_id))
+                or self.store.has(item_id) or os.path.exists(self.history_path(item_id)))
+
+    def extend(self, item_id, count=None):
+        """Pick up points appended to the item's source and extend cached columns over just the new bars.
+
+        ``count`` is how many points were appended, as ``HistoryFetcher.on_append``
+        passes it: only that many of the newest store rows are read (None reads
+        everything after the loaded history). Database items are read from the
+        last loaded timestamp on; JSON histories are never appended to.
+        Rolling columns are recomputed over the new bars plus their lookback
+        window only; EMA-based MACD columns are recomputed in full. Returns the
+        number of new bars (0 if the item was never loaded or nothing changed).
+        """
+        item_id = str(item_id)
+        if item_id not in self._prices or count == 0:
+            return 0
+        timestamps, prices = self._new_points(item_id, count)
+        if not len(prices):
+            return 0
+        self._prices[item_id] = pd.concat([self._prices[item_id], pd.Series(prices, dtype=float)], ignore_index=True)
+        self._set_timestamps(item_id, np.concatenate([self._timestamps[item_id], timestamps]))
+        self._dates[item_id].extend(pd.to_datetime(pd.Series(timestamps), unit='ms').dt.strftime('%Y-%m-%d').tolist())
+
+        for key in [key for key in self.cache.keys() if key[0] == item_id and key[3] == self.decimals]:
+            self.get(item_id, key[1], key[2])
+        return len(prices)
+
+    def _new_points(self, item_id, count):
+        """(timestamps, prices) arrays of the source's points after the loaded history."""
+        loaded = self._timestamps[item_id]
+        last = int(loaded[-1]) if len(loaded) else None
+        source = self._sources[item_id]
+        if source == 'database':
+            series = self.database.load_series(item_id, start=None if last is None else last + 1)
+            timestamps, prices = series.index.as_unit('ms').asi8, series.to_numpy(dtype=float)
+        elif source == 'store' and self.store.has(item_id):
+            history = self.store.load(item_id)
+            start = len(loaded) if count is None else max(0, len(history.prices) - count)
+            timestamps = np.asarray(history.timestamps[start:], dtype=np.int64)
+            prices = np.asarray(history.prices[start:], dtype=float)
+        else:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        # Points the provider already loaded (e.g. it read the item after the append) are skipped
+        new = timestamps > last if last is not None else np.ones(len(timestamps), dtype=bool)
+        return timestamps[new], prices[new]
+
+    def _columns_for(self, item_id, indicators):
+        """(group, key, field, values) for each requested (name, period), named like the enriched rows."""
+        columns = []
+        for name, period in indicators:
+            if name == 'bollinger':
+                columns.append(('bollinger', str(period), 'upper', self.get(item_id, 'bollinger_upper', period)))
+                columns.append(('bollinger', str(period), 'lower', self.get(item_id, 'bollinger_lower', period)))
+            elif name == 'macd':
+                for field, indicator in zip(['macd', 'signal', 'hist'], MACD_INDICATORS):
+                    columns.append(('macd', field, None, self.get(item_id, indicator)))
+            else:
+                columns.append((name, str(period), None, self.get(item_id, name, period)))
+        return columns
+
+    def bars(self, item_id, indicators):
+        """Like ``rows`` but keeps the columns as arrays (``BarArrays``) for the backtest kernel."""
+        columns = {(group, key, field): values for group, key, field, values in self._columns_for(item_id, indicators)}
+        return BarArrays(self.dates(item_id), self.get(item_id, 'price'), columns)
+
+    def rows(self, item_id, indicators):
+        """Build enriched-style rows holding only the requested indicators.
+
+        ``indicators`` is an iterable of (name, period) pairs using the nested
+        names of the enriched export: 'ma', 'std', 'rsi', 'bollinger' (upper and
+        lower) and 'macd' (period ignored), plus 'rsi_wilder' and 'ema'. The rows can be passed straight to
+        the ``run_*_backtest`` functions.
+        """
+        prices = self.get(item_id, 'price')
+        dates = self.dates(item_id)
+        # NaN -> None matches the nulls in the enriched JSON
+        columns = [(group, key, field, [None if np.isnan(v) else float(v) for v in values])
+                   for group, key, field, values in self._columns_for(item_id, indicators)]
+
+        rows = []
+        for i, date in enumerate(dates):
+            groups = {}
+            for group, key, field, values in columns:
+                if field is None:
+                    groups.setdefault(group, {})[key] = values[i]
+                else:
+                    groups.setdefault(group, {}).setdefault(key, {})[field] = values[i]
+            rows.append({'date': date, 'price': float(prices[i]), 'indicators': groups})
+        return rows
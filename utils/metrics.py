@@ -0,0 +1,187 @@
+import numpy as np
+from .calculate_indicators import stack_prices
+
+# Every function takes many configs at once: a configs x bars equity array (or
+# configs x trades profit array) and returns one value per row. A 1-D input is
+# one config. Ragged inputs are stacked with NaN padding, which every metric
+# skips, so curves of different lengths can be ranked together.
+# Equity is cumulative profit in coins, as the backtests write it, so the
+# ratios are computed on per-bar profit changes rather than percentage returns.
+
+# Daily bars; the market trades every day
+PERIODS_PER_YEAR = 365
+EQUITY_METRICS = ['max_drawdown', 'max_drawdown_duration', 'sharpe', 'sortino', 'calmar']
+TRADE_METRICS = ['num_trades', 'win_rate', 'profit_factor', 'gross_profit', 'gross_loss']
+# Metrics where smaller is better, for ranking
+LOWER_IS_BETTER = {'max_drawdown', 'max_drawdown_duration', 'prob_loss'}
+
+def as_matrix(values):
+    """configs x columns float array from a 2-D array, one 1-D series, or a list of ragged series."""
+    if isinstance(values, np.ndarray) and values.ndim == 2:
+        return values.astype(float, copy=False)
+    if isinstance(values, np.ndarray) or not len(values) or np.ndim(values[0]) == 0:
+        return np.asarray(values, dtype=float).reshape(1, -1)
+    return stack_prices(values)
+
+def _ratio(numerator, denominator):
+    """numerator / denominator, with x/0 as inf for positive x and 0.0 otherwise (as profit factor always was)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = numerator / denominator
+    return np.where(denominator > 0, ratio, np.where(numerator > 0, np.inf, 0.0))
+
+def running_peak(equity):
+    """Highest equity so far on every bar (NaN padding is skipped)."""
+    return np.fmax.accumulate(as_matrix(equity), axis=1)
+
+def max_drawdown(equity):
+    """Largest peak-to-trough fall of each curve (0.0 when it never falls)."""
+    equity = as_matrix(equity)
+    if equity.shape[1] == 0:
+        return np.zeros(len(equity))
+    drawdown = running_peak(equity) - equity
+    return np.maximum(np.nan_to_num(np.fmax.reduce(drawdown, axis=1)), 0.0)
+
+def max_drawdown_duration(equity):
+    """Longest run of bars spent below an earlier peak, per curve."""
+    equity = as_matrix(equity)
+    if equity.shape[1] == 0:
+        return np.zeros(len(equity), dtype=int)
+    underwater = equity < running_peak(equity)
+    bars = np.arange(equity.shape[1])
+    last_peak = np.maximum.accumulate(np.where(underwater, 0, bars), axis=1)
+    return np.max(bars - last_peak, axis=1)
+
+def bar_changes(equity):
+    """Profit made on each bar; the first bar counts from 0, padding stays NaN."""
+    equity = as_matrix(equity)
+    previous = np.zeros_like(equity)
+    previous[:, 1:] = equity[:, :-1]
+    return equity - np.nan_to_num(previous)
+
+def _change_stats(equity):
+    """Per-curve mean, sample std and downside deviation of the bar changes.
+
+    NaN padding is zero-filled once and left out of the counts, rather than
+    going through the slower nan-aware reductions.
+    """
+    changes = bar_changes(equity)
+    missing = np.isnan(changes)
+    changes[missing] = 0.0
+    count = changes.shape[1] - np.count_nonzero(missing, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(count > 0, changes.sum(axis=1) / count, 0.0)
+        deviations = changes - mean[:, None]
+        deviations[missing] = 0.0
+        std = np.where(count > 1, np.sqrt(np.einsum('ij,ij->i', deviations, deviations) / (count - 1)), 0.0)
+        losses = np.minimum(changes, 0.0)
+        downside = np.where(count > 0, np.sqrt(np.einsum('ij,ij->i', losses, losses) / count), 0.0)
+    return mean, std, downside
+
+def _sharpe(mean, std, periods_per_year):
+    return np.where(std > 0, mean / np.where(std > 0, std, 1.0), 0.0) * np.sqrt(periods_per_year)
+
+def _sortino(mean, downside, periods_per_year):
+    return _ratio(mean, downside) * np.sqrt(periods_per_year)
+
+def _calmar(mean, drawdown, periods_per_year):
+    return _ratio(mean * periods_per_year, drawdown)
+
+def sharpe_ratio(equity, periods_per_year=PERIODS_PER_YEAR):
+    """Annualized mean over sample std of the per-bar profit (0.0 for flat curves)."""
+    mean, std, _ = _change_stats(equity)
+    return _sharpe(mean, std, periods_per_year)
+
+def sortino_ratio(equity, periods_per_year=PERIODS_PER_YEAR):
+    """Like the Sharpe ratio, but only losing bars count as risk (inf when there are none and it gains)."""
+    mean, _, downside = _change_stats(equity)
+    return _sortino(mean, downside, periods_per_year)
+
+def calmar_ratio(equity, periods_per_year=PERIODS_PER_YEAR):
+    """Annualized profit over max drawdown (inf when it gains without ever falling)."""
+    mean, _, _ = _change_stats(equity)
+    return _calmar(mean, max_drawdown(equity), periods_per_year)
+
+def equity_metrics(equity, periods_per_year=PERIODS_PER_YEAR):
+    """Every EQUITY_METRICS array for a configs x bars equity array, each pass done once."""
+    equity = as_matrix(equity)
+    mean, std, downside = _change_stats(equity)
+    drawdown = max_drawdown(equity)
+    return {
+        'max_drawdown': drawdown,
+        'max_drawdown_duration': max_drawdown_duration(equity),
+        'sharpe': _sharpe(mean, std, periods_per_year),
+        'sortino': _sortino(mean, downside, periods_per_year),
+        'calmar': _calmar(mean, drawdown, periods_per_year),
+    }
+
+def _row_sums(values):
+    """Left-to-right row sums, so totals match Python's sum() over the same trades exactly."""
+    if values.shape[1] == 0:
+        return np.zeros(len(values))
+    return np.cumsum(values, axis=1)[:, -1]
+
+def trade_metrics(profits):
+    """Every TRADE_METRICS array for a configs x trades profit array (NaN pads shorter trade lists)."""
+    profits = as_matrix(profits)
+    num_trades = np.count_nonzero(~np.isnan(profits), axis=1)
+    wins = profits > 0
+    gross_profit = _row_sums(np.where(wins, profits, 0.0))
+    gross_loss = -_row_sums(np.where(profits < 0, profits, 0.0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        win_rate = np.where(num_trades > 0, np.count_nonzero(wins, axis=1) / num_trades, 0.0)
+    return {
+        'num_trades': num_trades,
+        'win_rate': win_rate,
+        'profit_factor': _ratio(gross_profit, gross_loss),
+        'gross_profit': gross_profit,
+        'gross_loss': gross_loss,
+    }
+
+def positions(dates, trades_per_config):
+    """configs x bars bool array of the bars each config held a position.
+
+    A trade holds from its entry bar up to, not including, its exit bar,
+    the bars where the backtest equity moves with the price. Trades are
+    placed by binary search on the sorted bar dates, so a date that repeats
+    resolves to its first bar, as ``equity_records`` does.
+    """
+    dates = np.asarray(dates)
+    changes = np.zeros((len(trades_per_config), len(dates) + 1), dtype=int)
+    for row, trades in enumerate(trades_per_config):
+        entries = np.searchsorted(dates, [t['entry_date'] for t in trades])
+        exits = np.searchsorted(dates, [t['exit_date'] for t in trades])
+        np.add.at(changes[row], entries, 1)
+        np.add.at(changes[row], exits, -1)
+    return np.cumsum(changes[:, :-1], axis=1) > 0
+
+def exposure(held, equity=None):
+    """Share of each config's bars spent in a position; bars where ``equity`` is NaN padding don't count."""
+    held = np.atleast_2d(held)
+    bars = held.shape[1] if equity is None else np.count_nonzero(~np.isnan(as_matrix(equity)), axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        share = np.count_nonzero(held, axis=1) / bars
+    return np.where(np.asarray(bars) > 0, share, 0.0)
+
+def compute_metrics(equity, profits, held=None, periods_per_year=PERIODS_PER_YEAR):
+    """All metrics for many configs at once: a dict of per-config arrays.
+
+    ``equity`` is configs x bars, ``profits`` configs x trades and ``held``
+    the configs x bars output of ``positions`` (exposure is left out without it).
+    """
+    equity = as_matrix(equity)
+    metrics = {**trade_metrics(profits), **equity_metrics(equity, periods_per_year)}
+    metrics['total_profit'] = _row_sums(np.nan_to_num(as_matrix(profits)))
+    if held is not None:
+        metrics['exposure'] = exposure(held, equity)
+    return metrics
+
+def lower_is_better(metric):
+    """Whether smaller values rank first; columns like 'train_max_drawdown' or 'max_drawdown_p95' follow their metric."""
+    return any(name == metric or f"_{name}" in f"_{metric}_" for name in LOWER_IS_BETTER)
+
+def rank(metrics, by, ascending=None):
+    """Row order that ranks configs by one metric, best first (stable on ties)."""
+    if ascending is None:
+        ascending = lower_is_better(by)
+    values = np.asarray(metrics[by], dtype=float)
+    return np.argsort(values if ascending else -values, kind='stable')
@@ -0,0 +1,109 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+METHODS = ['shuffle', 'bootstrap', 'block']
+METRICS = ['total_profit', 'max_drawdown', 'win_rate']
+PERCENTILES = [5, 25, 50, 75, 95]
+DEFAULT_PATHS = 10_000
+DEFAULT_BLOCK_SIZE = 5
+# Rows resampled at once; bounds the (paths x trades) working arrays
+CHUNK_PATHS = 2_000
+
+def resample_indices(rng, n_trades, n_paths, method='bootstrap', block_size=DEFAULT_BLOCK_SIZE):
+    """(n_paths, n_trades) trade indices, one resampled trade sequence per row.
+
+    'shuffle' permutes the trades (same total, different order and drawdown),
+    'bootstrap' draws trades with replacement, and 'block' draws circular
+    runs of ``block_size`` consecutive trades so streaks survive resampling.
+    """
+    if method == 'shuffle':
+        return rng.permuted(np.broadcast_to(np.arange(n_trades), (n_paths, n_trades)), axis=1)
+    if method == 'bootstrap':
+        return rng.integers(0, n_trades, size=(n_paths, n_trades))
+    if method == 'block':
+        block_size = max(1, min(block_size, n_trades))
+        n_blocks = -(-n_trades // block_size)
+        starts = rng.integers(0, n_trades, size=(n_paths, n_blocks, 1))
+        indices = (starts + np.arange(block_size)) % n_trades
+        return indices.reshape(n_paths, -1)[:, :n_trades]
+    raise ValueError(f"Unknown method: {method}")
+
+def path_metrics(paths):
+    """Total profit, max drawdown and win rate of every row of a (paths, trades) profit array.
+
+    Drawdown is measured on the closed-trade equity curve starting from 0.
+    """
+    n_paths, n_trades = paths.shape
+    if n_trades == 0:
+        zeros = np.zeros(n_paths)
+        return {'total_profit': zeros, 'max_drawdown': zeros, 'win_rate': zeros}
+    equity = np.cumsum(paths, axis=1)
+    peaks = np.maximum(np.maximum.accumulate(equity, axis=1), 0)
+    return {
+        'total_profit': equity[:, -1],
+        'max_drawdown': np.max(peaks - equity, axis=1),
+        'win_rate': np.count_nonzero(paths > 0, axis=1) / n_trades,
+    }
+
+def simulate(profits, n_paths=DEFAULT_PATHS, method='bootstrap', block_size=DEFAULT_BLOCK_SIZE, seed=None):
+    """Metric arrays (length ``n_paths``) over resampled replays of one config's trade profits."""
+    profits = np.asarray(profits, dtype=float)
+    if len(profits) == 0:
+        return {metric: np.zeros(n_paths) for metric in METRICS}
+    rng = np.random.default_rng(seed)
+    chunks = {metric: [] for metric in METRICS}
+    for start in range(0, n_paths, CHUNK_PATHS):
+        rows = min(CHUNK_PATHS, n_paths - start)
+        indices = resample_indices(rng, len(profits), rows, method, block_size)
+        for metric, values in path_metrics(profits[indices]).items():
+            chunks[metric].append(values)
+    return {metric: np.concatenate(values) for metric, values in chunks.items()}
+
+def distribution(values, percentiles=PERCENTILES):
+    """Mean, std and percentiles of a metric's resampled values."""
+    values = np.asarray(values, dtype=float)
+    stats = {'mean': float(values.mean()), 'std': float(values.std())}
+    for q, value in zip(percentiles, np.percentile(values, percentiles)):
+        stats[f'p{q}'] = float(value)
+    return stats
+
+def _simulate_task(task):
+    key, profits, n_paths, method, block_size, seed = task
+    return key, simulate(profits, n_paths, method, block_size, seed)
+
+def run_monte_carlo(trade_profits, n_paths=DEFAULT_PATHS, method='bootstrap', block_size=DEFAULT_BLOCK_SIZE,
+                    seed=0, workers=None):
+    """Resample many configs' trades across a process pool.
+
+    ``trade_profits`` maps a config key to its list of per-trade profits.
+    Each config's paths are split into ``CHUNK_PATHS``-row tasks seeded
+    from (``seed``, config index, chunk index), so results do not depend on
+    the number of workers. Returns {key: {metric: values array}}.
+    """
+    tasks = []
+    for index, (key, profits) in enumerate(trade_profits.items()):
+        for chunk, start in enumerate(range(0, n_paths, CHUNK_PATHS)):
+            chunk_seed = np.random.SeedSequence([seed, index, chunk])
+            tasks.append((key, profits, min(CHUNK_PATHS, n_paths - start), method, block_size, chunk_seed))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        outputs = [_simulate_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            outputs = list(executor.map(_simulate_task, tasks))
+
+    merged = {key: {metric: [] for metric in METRICS} for key in trade_profits}
+    for key, metrics in outputs:
+        for metric, values in metrics.items():
+            merged[key][metric].append(values)
+    return {key: {metric: np.concatenate(values) for metric, values in metrics.items()}
+            for key, metrics in merged.items()}
+
+def robustness_summary(trades, metrics):
+    """Observed metrics plus resampled distributions for one config."""
+    summary = {'num_trades': len(trades), 'observed_total_profit': sum(t['profit'] for t in trades)}
+    for metric, values in metrics.items():
+        summary[metric] = distribution(values)
+    summary['prob_loss'] = float(np.mean(metrics['total_profit'] < 0))
+    return summary
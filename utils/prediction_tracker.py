@@ -1,74 +1,120 @@
+import atexit
 import json
+import queue
 import sqlite3
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 import pandas as pd
+from .bulk_snapshot import BulkSnapshot
+
+PREDICTION_COLUMNS = [
+    'timestamp', 'item_id', 'current_price',
+    'ma_14', 'ma_30', 'ma_90',
+    'rsi_14', 'rsi_30', 'rsi_90',
+    'upper_band_14', 'lower_band_14',
+    'upper_band_30', 'lower_band_30',
+    'upper_band_90', 'lower_band_90',
+    'signal_14', 'signal_30', 'signal_90'
+]
+
+INSERT_PREDICTION = f'''
+INSERT INTO predictions ({', '.join(PREDICTION_COLUMNS)})
+VALUES ({', '.join('?' for _ in PREDICTION_COLUMNS)})
+'''
+
+WINDOWS = [14, 30, 90]
+
+INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_predictions_item_timestamp ON predictions (item_id, timestamp)',
+    'CREATE INDEX IF NOT EXISTS idx_predictions_timestamp ON predictions (timestamp)',
+    'CREATE INDEX IF NOT EXISTS idx_outcomes_prediction_id ON outcomes (prediction_id)',
+]
+
+def success_case(signal_column, change_expr):
+    """SQL mirror of record_outcome's rule: a Sell signal needs a fall, a Buy signal a rise."""
+    return f'''CASE
+        WHEN instr({signal_column}, 'Sell') > 0 AND {change_expr} < 0 THEN 1
+        WHEN instr({signal_column}, 'Buy') > 0 AND {change_expr} > 0 THEN 1
+        ELSE 0 END'''
+
+def load_bulk_snapshot(json_path='osrs_bulk_data.json'):
+    """Read {item_id: price} and the snapshot time (local, like prediction timestamps) from a bulk dump."""
+    snapshot = BulkSnapshot.from_file(json_path)
+    return snapshot.prices(), datetime.fromtimestamp(snapshot.jagex_timestamp)
 
 class PredictionTracker:
-    def __init__(self, db_path='predictions.db'):
+    """SQLite log of predictions and their outcomes.
+
+    Holds one connection for its lifetime (WAL journal, so readers never block
+    the writer) and writes predictions in batches: ``record_predictions`` inserts
+    many rows in one transaction, and ``queue_prediction(s)`` hands rows to a
+    background thread that drains the queue in transactions of up to
+    ``batch_size`` rows. Call ``flush()`` to wait for queued rows and
+    ``close()`` when done.
+    """
+
+    def __init__(self, db_path='predictions.db', batch_size=5000):
         self.db_path = db_path
+        self.batch_size = batch_size
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._writer = None
+        self._writer_error = None
+        self._closed = False
         self.setup_database()
 
     def setup_database(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create predictions table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS predictions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp DATETIME,
-            item_id INTEGER,
-            current_price FLOAT,
-            ma_14 FLOAT,
-            ma_30 FLOAT,
-            ma_90 FLOAT,
-            rsi_14 FLOAT,
-            rsi_30 FLOAT,
-            rsi_90 FLOAT,
-            upper_band_14 FLOAT,
-            lower_band_14 FLOAT,
-            upper_band_30 FLOAT,
-            lower_band_30 FLOAT,
-            upper_band_90 FLOAT,
-            lower_band_90 FLOAT,
-            signal_14 TEXT,
-            signal_30 TEXT,
-            signal_90 TEXT
-        )''')
-        
-        # Create outcomes table for tracking actual results
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS outcomes (
-            prediction_id INTEGER,
-            actual_price FLOAT,
-            outcome_timestamp DATETIME,
-            success BOOLEAN,
-            profit_loss FLOAT,
-            FOREIGN KEY(prediction_id) REFERENCES predictions(id)
-        )''')
-        
-        conn.commit()
-        conn.close()
+        with self._lock:
+            cursor = self.conn.cursor()
 
-    def record_prediction(self, item_id, analysis_data):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        current_time = datetime.now().isoformat()
-        
-        # Extract values from analysis data
-        cursor.execute('''
-        INSERT INTO predictions (
-            timestamp, item_id, current_price,
-            ma_14, ma_30, ma_90,
-            rsi_14, rsi_30, rsi_90,
-            upper_band_14, lower_band_14,
-            upper_band_30, lower_band_30,
-            upper_band_90, lower_band_90,
-            signal_14, signal_30, signal_90
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            current_time, item_id,
+            # Create predictions table
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS predictions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp DATETIME,
+                item_id INTEGER,
+                current_price FLOAT,
+                ma_14 FLOAT,
+                ma_30 FLOAT,
+                ma_90 FLOAT,
+                rsi_14 FLOAT,
+                rsi_30 FLOAT,
+                rsi_90 FLOAT,
+                upper_band_14 FLOAT,
+                lower_band_14 FLOAT,
+                upper_band_30 FLOAT,
+                lower_band_30 FLOAT,
+                upper_band_90 FLOAT,
+                lower_band_90 FLOAT,
+                signal_14 TEXT,
+                signal_30 TEXT,
+                signal_90 TEXT
+            )''')
+
+            # Create outcomes table for tracking actual results
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS outcomes (
+                prediction_id INTEGER,
+                actual_price FLOAT,
+                outcome_timestamp DATETIME,
+                success BOOLEAN,
+                profit_loss FLOAT,
+                FOREIGN KEY(prediction_id) REFERENCES predictions(id)
+            )''')
+
+            for index in INDEXES:
+                cursor.execute(index)
+
+            self.conn.commit()
+
+    @staticmethod
+    def prediction_row(item_id, analysis_data, timestamp=None):
+        """Flatten analysis data into an INSERT_PREDICTION parameter tuple."""
+        return (
+            timestamp or datetime.now().isoformat(), item_id,
             analysis_data['current_price'],
             analysis_data['ma_14'], analysis_data['ma_30'], analysis_data['ma_90'],
             analysis_data['rsi_14'], analysis_data['rsi_30'], analysis_data['rsi_90'],
@@ -76,54 +122,211 @@ class PredictionTracker:
             analysis_data['upper_30'], analysis_data['lower_30'],
             analysis_data['upper_90'], analysis_data['lower_90'],
             analysis_data['signal_14'], analysis_data['signal_30'], analysis_data['signal_90']
-        ))
-        
-        prediction_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        )
+
+    def record_prediction(self, item_id, analysis_data):
+        with self._lock:
+            cursor = self.conn.execute(INSERT_PREDICTION, self.prediction_row(item_id, analysis_data))
+            prediction_id = cursor.lastrowid
+            self.conn.commit()
         return prediction_id
 
-    def record_outcome(self, prediction_id, actual_price):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Get original prediction
-        cursor.execute('SELECT current_price, signal_14, signal_30, signal_90 FROM predictions WHERE id = ?', 
-                      (prediction_id,))
-        pred_data = cursor.fetchone()
-        if not pred_data:
+    def record_predictions(self, items):
+        """Insert many (item_id, analysis_data) pairs in a single transaction; returns the row count."""
+        current_time = datetime.now().isoformat()
+        rows = [self.prediction_row(item_id, analysis_data, current_time) for item_id, analysis_data in items]
+        self._write_rows(rows)
+        return len(rows)
+
+    def _write_rows(self, rows):
+        if not rows:
             return
-        
-        original_price, signal_14, signal_30, signal_90 = pred_data
-        
-        # Calculate success based on signals
-        price_change = actual_price - original_price
-        success = False
-        
-        # Simple success criteria (can be made more sophisticated)
-        if "Sell" in signal_30 and price_change < 0:
-            success = True
-        elif "Buy" in signal_30 and price_change > 0:
-            success = True
-        
-        cursor.execute('''
-        INSERT INTO outcomes (prediction_id, actual_price, outcome_timestamp, success, profit_loss)
-        VALUES (?, ?, ?, ?, ?)
-        ''', (prediction_id, actual_price, datetime.now().isoformat(), success, price_change))
-        
-        conn.commit()
-        conn.close()
-
-    def get_accuracy_stats(self):
-        conn = sqlite3.connect(self.db_path)
-        query = '''
-        SELECT 
-            COUNT(*) as total_predictions,
-            SUM(CASE WHEN success = 1 THEN 1 ELSE 0 END) as successful_predictions,
-            AVG(CASE WHEN success = 1 THEN 1 ELSE 0 END) * 100 as success_rate,
-            AVG(profit_loss) as avg_profit_loss
-        FROM outcomes
-        '''
-        stats = pd.read_sql_query(query, conn)
-        conn.close()
-        return stats 
\ No newline at end of file
+        with self._lock:
+            with self.conn:
+                self.conn.executemany(INSERT_PREDICTION, rows)
+
+    def queue_prediction(self, item_id, analysis_data, timestamp=None):
+        """Queue a prediction for the background writer; returns immediately."""
+        self._ensure_writer()
+        self._queue.put(self.prediction_row(item_id, analysis_data, timestamp))
+
+    def queue_predictions(self, items):
+        current_time = datetime.now().isoformat()
+        self._ensure_writer()
+        for item_id, analysis_data in items:
+            self._queue.put(self.prediction_row(item_id, analysis_data, current_time))
+
+    def _ensure_writer(self):
+        if self._closed:
+            raise RuntimeError("PredictionTracker is closed")
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._drain_queue, name='prediction-writer', daemon=True)
+            self._writer.start()
+            # Queued rows must not be lost if the caller forgets close()
+            atexit.register(self.close)
+
+    def _drain_queue(self):
+        while True:
+            row = self._queue.get()
+            if row is None:
+                self._queue.task_done()
+                return
+            batch = [row]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    row = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if row is None:
+                    stop = True
+                    break
+                batch.append(row)
+            try:
+                self._write_rows(batch)
+            except sqlite3.Error as e:
+                # Surface the failure from flush() instead of killing the writer
+                self._writer_error = e
+            finally:
+                for _ in range(len(batch) + stop):
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def flush(self):
+        """Block until every queued prediction has been written."""
+        if self._writer is not None:
+            self._queue.join()
+        if self._writer_error is not None:
+            error, self._writer_error = self._writer_error, None
+            raise error
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            atexit.unregister(self.close)
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def record_outcome(self, prediction_id, actual_price):
+        with self._lock:
+            cursor = self.conn.cursor()
+
+            # Get original prediction
+            cursor.execute('SELECT current_price, signal_14, signal_30, signal_90 FROM predictions WHERE id = ?',
+                          (prediction_id,))
+            pred_data = cursor.fetchone()
+            if not pred_data:
+                return
+
+            original_price, signal_14, signal_30, signal_90 = pred_data
+
+            # Calculate success based on signals
+            price_change = actual_price - original_price
+            success = False
+
+            # Simple success criteria (can be made more sophisticated)
+            if "Sell" in signal_30 and price_change < 0:
+                success = True
+            elif "Buy" in signal_30 and price_change > 0:
+                success = True
+
+            cursor.execute('''
+            INSERT INTO outcomes (prediction_id, actual_price, outcome_timestamp, success, profit_loss)
+            VALUES (?, ?, ?, ?, ?)
+            ''', (prediction_id, actual_price, datetime.now().isoformat(), success, price_change))
+
+            self.conn.commit()
+
+    def resolve_outcomes(self, prices, as_of=None, horizon=timedelta(days=1)):
+        """Score every matured, unscored prediction against a price snapshot in one SQL pass.
+
+        ``prices`` maps item_id -> price (e.g. from ``load_bulk_snapshot``). A
+        prediction is matured when it is at least ``horizon`` older than
+        ``as_of`` (default: now). Returns the number of outcomes written.
+        """
+        self.flush()
+        as_of = as_of or datetime.now()
+        cutoff = (as_of - horizon).isoformat()
+        with self._lock:
+            with self.conn:
+                self.conn.execute('CREATE TEMP TABLE IF NOT EXISTS snapshot (item_id INTEGER PRIMARY KEY, price FLOAT)')
+                self.conn.execute('DELETE FROM snapshot')
+                self.conn.executemany('INSERT INTO snapshot (item_id, price) VALUES (?, ?)', prices.items())
+                cursor = self.conn.execute(f'''
+                INSERT INTO outcomes (prediction_id, actual_price, outcome_timestamp, success, profit_loss)
+                SELECT p.id, s.price, ?, {success_case('p.signal_30', 's.price - p.current_price')},
+                       s.price - p.current_price
+                FROM predictions p
+                JOIN snapshot s ON s.item_id = p.item_id
+                WHERE p.timestamp <= ?
+                  AND NOT EXISTS (SELECT 1 FROM outcomes o WHERE o.prediction_id = p.id)
+                ''', (as_of.isoformat(), cutoff))
+                resolved = cursor.rowcount
+                self.conn.execute('DELETE FROM snapshot')
+        return resolved
+
+    def get_accuracy_stats(self, by=None):
+        """Outcome accuracy overall, or broken down ``by`` 'item', 'window' or 'signal'.
+
+        'window' scores each of signal_14/30/90 against the recorded price change;
+        'signal' groups the 30-day outcome by the signal text that was predicted.
+        """
+        self.flush()
+        if by is None:
+            query = '''
+            SELECT
+                COUNT(*) as total_predictions,
+                SUM(CASE WHEN success = 1 THEN 1 ELSE 0 END) as successful_predictions,
+                AVG(CASE WHEN success = 1 THEN 1 ELSE 0 END) * 100 as success_rate,
+                AVG(profit_loss) as avg_profit_loss
+            FROM outcomes
+            '''
+        elif by in ('item', 'signal'):
+            group = 'p.item_id' if by == 'item' else 'p.signal_30'
+            label = 'item_id' if by == 'item' else 'signal'
+            query = f'''
+            SELECT
+                {group} as {label},
+                COUNT(*) as total_predictions,
+                SUM(CASE WHEN o.success = 1 THEN 1 ELSE 0 END) as successful_predictions,
+                AVG(CASE WHEN o.success = 1 THEN 1 ELSE 0 END) * 100 as success_rate,
+                AVG(o.profit_loss) as avg_profit_loss
+            FROM outcomes o
+            JOIN predictions p ON p.id = o.prediction_id
+            GROUP BY {group}
+            ORDER BY {label}
+            '''
+        elif by == 'window':
+            per_window = ' UNION ALL '.join(f'''
+                SELECT {window} as window, p.signal_{window} as signal,
+                       {success_case(f'p.signal_{window}', 'o.profit_loss')} as success, o.profit_loss
+                FROM outcomes o
+                JOIN predictions p ON p.id = o.prediction_id
+                WHERE p.signal_{window} != ''
+            ''' for window in WINDOWS)
+            query = f'''
+            SELECT
+                window,
+                COUNT(*) as total_predictions,
+                SUM(success) as successful_predictions,
+                AVG(success) * 100 as success_rate,
+                AVG(profit_loss) as avg_profit_loss
+            FROM ({per_window})
+            GROUP BY window
+            ORDER BY window
+            '''
+        else:
+            raise ValueError(f"Unknown breakdown: {by}")
+        with self._lock:
+            stats = pd.read_sql_query(query, self.conn)
+        return stats
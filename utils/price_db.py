@@ -0,0 +1,243 @@
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime, timezone
+import pandas as pd
+from .bulk_snapshot import BulkSnapshot, iter_dump_members, MISSING
+from .price_store import PROJECT_ROOT
+
+SCHEMA_DIR = os.path.join(PROJECT_ROOT, 'db')
+DEFAULT_DB_PATH = os.path.join(PROJECT_ROOT, 'ge_prices.db')
+BATCH_SIZE = 50000
+
+def to_db_timestamp(timestamp_ms):
+    """Epoch ms -> 'YYYY-MM-DD HH:MM:SS' (UTC), which sorts correctly and both engines accept."""
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+class PriceDatabase:
+    """Storage layer for the Items / HourlyPrices schema in ``db/``.
+
+    ``PriceDatabase('ge_prices.db')`` uses SQLite (``db/schema_sqlite.sql``);
+    ``PriceDatabase('postgresql://...')`` uses PostgreSQL through psycopg
+    (``db/schema.sql``, partitioned by year). Loaders insert in large batches
+    inside one transaction per call, using COPY into a staging table on
+    Postgres, and skip points that are already stored.
+    """
+
+    def __init__(self, dsn=DEFAULT_DB_PATH, batch_size=BATCH_SIZE):
+        self.dsn = dsn
+        self.batch_size = batch_size
+        self.postgres = dsn.startswith(('postgres://', 'postgresql://'))
+        if self.postgres:
+            import psycopg
+            self.conn = psycopg.connect(dsn)
+            self.param = '%s'
+        else:
+            self.conn = sqlite3.connect(dsn)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            self.param = '?'
+        self._partitions = set()
+        self.create_schema()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def sql(self, statement):
+        return statement.replace('?', self.param)
+
+    def create_schema(self):
+        schema_file = 'schema.sql' if self.postgres else 'schema_sqlite.sql'
+        with open(os.path.join(SCHEMA_DIR, schema_file), 'r') as f:
+            script = f.read()
+        if self.postgres:
+            with self.conn.cursor() as cursor:
+                cursor.execute(script)
+            self.conn.commit()
+        else:
+            self.conn.executescript(script)
+
+    def ensure_partitions(self, timestamps):
+        """Create the yearly HourlyPrices partitions covering 'YYYY-...' timestamps (Postgres only)."""
+        if not self.postgres:
+            return
+        years = {int(ts[:4]) for ts in timestamps} - self._partitions
+        with self.conn.cursor() as cursor:
+            for year in sorted(years):
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS HourlyPrices_{year} PARTITION OF HourlyPrices "
+                    f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+                )
+        self._partitions |= years
+
+    def _batches(self, rows):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _insert(self, table, columns, rows, conflict_columns):
+        """Batched insert that ignores rows whose key already exists; returns rows offered."""
+        count = 0
+        column_list = ', '.join(columns)
+        if self.postgres:
+            with self.conn.cursor() as cursor:
+                for batch in self._batches(rows):
+                    if table == 'HourlyPrices':
+                        self.ensure_partitions(row[1] for row in batch)
+                    cursor.execute(f"CREATE TEMP TABLE IF NOT EXISTS staging_{table} (LIKE {table} INCLUDING DEFAULTS)"
+                                   " ON COMMIT DELETE ROWS")
+                    with cursor.copy(f"COPY staging_{table} ({column_list}) FROM STDIN") as copy:
+                        for row in batch:
+                            copy.write_row(row)
+                    cursor.execute(f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM staging_{table} "
+                                   f"ON CONFLICT ({', '.join(conflict_columns)}) DO NOTHING")
+                    cursor.execute(f"TRUNCATE staging_{table}")
+                    count += len(batch)
+            self.conn.commit()
+        else:
+            statement = (f"INSERT INTO {table} ({column_list}) VALUES ({', '.join('?' for _ in columns)}) "
+                         f"ON CONFLICT ({', '.join(conflict_columns)}) DO NOTHING")
+            with self.conn:
+                for batch in self._batches(rows):
+                    self.conn.executemany(statement, batch)
+                    count += len(batch)
+        return count
+
+    def ensure_items(self, item_ids):
+        """Insert placeholder Items rows so price rows always satisfy the foreign key."""
+        rows = ((int(item_id), f"Item {item_id}", None, None) for item_id in item_ids)
+        return self._insert('Items', ['item_id', 'name', 'description', 'icon_url'], rows, ['item_id'])
+
+    def load_items_from_dump(self, json_path='osrs_bulk_data.json'):
+        """Load Items (name, examine text, icon) from an os_dump file, streaming it member by member."""
+        def rows(stream):
+            for key, item in iter_dump_members(stream):
+                if key.startswith('%'):
+                    continue
+                yield int(item['id']), item['name'], item.get('examine'), item.get('icon')
+
+        with open(json_path, 'rb') as f:
+            count = self._insert('Items', ['item_id', 'name', 'description', 'icon_url'], rows(f), ['item_id'])
+        # Refresh names/descriptions of placeholder rows created before the dump was loaded
+        with open(json_path, 'rb') as f:
+            updates = [(name, description, icon, item_id) for item_id, name, description, icon in rows(f)]
+        if self.postgres:
+            with self.conn.cursor() as cursor:
+                cursor.executemany(self.sql("UPDATE Items SET name = ?, description = ?, icon_url = ? "
+                                            "WHERE item_id = ? AND name LIKE 'Item %'"), updates)
+            self.conn.commit()
+        else:
+            with self.conn:
+                self.conn.executemany("UPDATE Items SET name = ?, description = ?, icon_url = ? "
+                                      "WHERE item_id = ? AND name LIKE 'Item %'", updates)
+        return count
+
+    def load_history(self, item_id, timestamps, prices, volumes=None):
+        """Bulk-load one item's points (epoch ms timestamps); already stored points are skipped."""
+        self.ensure_items([item_id])
+        if volumes is None:
+            volumes = [None] * len(prices)
+        rows = ((int(item_id), to_db_timestamp(int(ts)), int(price),
+                 None if volume is None or volume == MISSING else int(volume))
+                for ts, price, volume in zip(timestamps, prices, volumes))
+        return self._insert('HourlyPrices', ['item_id', 'timestamp', 'price', 'volume'], rows,
+                            ['item_id', 'timestamp'])
+
+    def load_history_json(self, json_path):
+        """Load a historical_data_<id>.json file ({item_id: [points]})."""
+        with open(json_path, 'r') as f:
+            data = json.load(f)
+        return {int(item_id): self.load_history(item_id, [p['timestamp'] for p in history],
+                                                [p['price'] for p in history], [p.get('volume') for p in history])
+                for item_id, history in data.items()}
+
+    def load_price_store(self, store, item_ids=None):
+        """Copy items from a PriceStore into HourlyPrices."""
+        counts = {}
+        for item_id in item_ids or store.items():
+            history = store.load(item_id)
+            volumes = None if history.volumes is None else history.volumes.tolist()
+            counts[item_id] = self.load_history(item_id, history.timestamps.tolist(), history.prices.tolist(), volumes)
+        return counts
+
+    def load_snapshot(self, snapshot):
+        """Store one BulkSnapshot's prices and volumes at its %JAGEX_TIMESTAMP%."""
+        timestamp = to_db_timestamp(snapshot.jagex_timestamp * 1000)
+        columns = snapshot.columns
+        has_price = columns['price'] != MISSING
+        ids = columns['id'][has_price].tolist()
+        self.ensure_items(ids)
+        rows = ((item_id, timestamp, price, None if volume == MISSING else volume)
+                for item_id, price, volume in zip(ids, columns['price'][has_price].tolist(),
+                                                  columns['volume'][has_price].tolist()))
+        return self._insert('HourlyPrices', ['item_id', 'timestamp', 'price', 'volume'], rows,
+                            ['item_id', 'timestamp'])
+
+    def has(self, item_id):
+        query = self.sql("SELECT 1 FROM HourlyPrices WHERE item_id = ? LIMIT 1")
+        return self._fetchall(query, (int(item_id),)) != []
+
+    def items(self):
+        """Item ids with at least one stored price, served by the (item_id, timestamp) key."""
+        return [row[0] for row in self._fetchall("SELECT DISTINCT item_id FROM HourlyPrices ORDER BY item_id")]
+
+    def _fetchall(self, query, params=()):
+        if self.postgres:
+            with self.conn.cursor() as cursor:
+                cursor.execute(query, params)
+                return cursor.fetchall()
+        return self.conn.execute(query, params).fetchall()
+
+    def load_series(self, item_id, start=None, end=None, column='price'):
+        """Return an item's prices (or volumes) as a float Series indexed by UTC datetime.
+
+        ``start``/``end`` are optional epoch ms bounds (inclusive) and are served
+        by the (item_id, timestamp) key.
+        """
+        if column not in ('price', 'volume'):
+            raise ValueError(f"Unknown column: {column}")
+        query = f"SELECT timestamp, {column} FROM HourlyPrices WHERE item_id = ?"
+        params = [int(item_id)]
+        if start is not None:
+            query += " AND timestamp >= ?"
+            params.append(to_db_timestamp(start))
+        if end is not None:
+            query += " AND timestamp <= ?"
+            params.append(to_db_timestamp(end))
+        rows = self._fetchall(self.sql(query + " ORDER BY timestamp"), params)
+        index = pd.to_datetime([row[0] for row in rows], utc=True)
+        return pd.Series([row[1] for row in rows], index=index, dtype=float, name=column)
+
+def main():
+    # Usage: python -m utils.price_db [--db DSN] historical_data_327.json osrs_bulk_data.json ...
+    args = sys.argv[1:]
+    dsn = DEFAULT_DB_PATH
+    if args[:1] == ['--db']:
+        dsn, args = args[1], args[2:]
+    with PriceDatabase(dsn) as database:
+        for path in args:
+            # History files map one item id to a list of points; bulk dumps map ids to item dicts
+            with open(path, 'rb') as f:
+                _, first_value = next(iter_dump_members(f))
+            if isinstance(first_value, dict):
+                items = database.load_items_from_dump(path)
+                rows = database.load_snapshot(BulkSnapshot.from_file(path))
+                print(f"{path}: {items} items, {rows} snapshot prices")
+            else:
+                for item_id, rows in database.load_history_json(path).items():
+                    print(f"{path}: {rows} points for item {item_id}")
+
+if __name__ == "__main__":
+    main()
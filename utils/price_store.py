@@ -0,0 +1,200 @@
+import json
+import os
+import sys
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_STORE_DIR = os.path.join(PROJECT_ROOT, 'price_store')
+
+# One raw little-endian file per column, per item; appends never touch existing bytes
+COLUMNS = {
+    'timestamp': np.dtype('<i8'),  # ms since epoch
+    'price': np.dtype('<i4'),
+    'volume': np.dtype('<i4'),     # optional, MISSING_VOLUME where the API returned null
+}
+MISSING_VOLUME = -1
+# An int32 column is rewritten as int64 (``price.i8``/``volume.i8``) once a value doesn't fit
+WIDE_DTYPE = np.dtype('<i8')
+
+def _fits(values, dtype):
+    """Whether every value can be stored as ``dtype`` without wrapping."""
+    if not len(values) or dtype == WIDE_DTYPE:
+        return True
+    info = np.iinfo(dtype)
+    return info.min <= values.min() and values.max() <= info.max
+
+PriceHistory = namedtuple('PriceHistory', ['item_id', 'timestamps', 'prices', 'volumes'])
+
+class PriceStore:
+    """Columnar on-disk price history, one directory per item.
+
+    Each item directory holds contiguous ``timestamp.i8`` and ``price.i4``
+    files plus an optional ``volume.i4``. Files are raw arrays with no header,
+    so loading is a memory map (no parsing) and new points are appended in place.
+    A price or volume column that gets a value outside int32 is widened to
+    int64 for that item instead of wrapping. Columns are appended one after
+    another, so an item's length is that of its shortest column: reads stop
+    there, and the next append first truncates the rows a crash left behind.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_DIR):
+        self.root = root
+
+    def item_dir(self, item_id):
+        return os.path.join(self.root, str(item_id))
+
+    def column_path(self, item_id, column, dtype=None):
+        dtype = self.column_dtype(item_id, column) if dtype is None else dtype
+        return os.path.join(self.item_dir(item_id), f"{column}.{dtype.str[1:]}")
+
+    def column_dtype(self, item_id, column):
+        """dtype an item's column is stored as: its ``COLUMNS`` dtype unless it was widened."""
+        dtype = COLUMNS[column]
+        if dtype != WIDE_DTYPE and os.path.exists(self.column_path(item_id, column, WIDE_DTYPE)):
+            return WIDE_DTYPE
+        return dtype
+
+    def has(self, item_id):
+        return os.path.exists(self.column_path(item_id, 'timestamp'))
+
+    def has_column(self, item_id, column):
+        return os.path.exists(self.column_path(item_id, column))
+
+    def length(self, item_id):
+        """Points whose every column has been written (0 if the item isn't stored)."""
+        if not self.has(item_id):
+            return 0
+        columns = [column for column in COLUMNS if self.has_column(item_id, column)]
+        return min(os.path.getsize(self.column_path(item_id, column)) // self.column_dtype(item_id, column).itemsize
+                   for column in columns)
+
+    def items(self):
+        """Item ids present in the store."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(int(name) for name in os.listdir(self.root) if name.isdigit() and self.has(name))
+
+    def write(self, item_id, timestamps, prices, volumes=None):
+        """Replace an item's history."""
+        os.makedirs(self.item_dir(item_id), exist_ok=True)
+        if volumes is None and self.has_column(item_id, 'volume'):
+            os.remove(self.column_path(item_id, 'volume'))
+        self._write_columns(item_id, timestamps, prices, volumes, mode='wb')
+
+    def append(self, item_id, timestamps, prices, volumes=None):
+        """Append points to the end of an item's history without rewriting it."""
+        if not self.has(item_id):
+            return self.write(item_id, timestamps, prices, volumes)
+        if volumes is not None and not self.has_column(item_id, 'volume'):
+            # Volume shows up for the first time: backfill the existing rows as missing
+            existing = self.length(item_id)
+            with open(self.column_path(item_id, 'volume'), 'wb') as f:
+                np.full(existing, MISSING_VOLUME, dtype=COLUMNS['volume']).tofile(f)
+        elif volumes is None and self.has_column(item_id, 'volume'):
+            volumes = np.full(len(timestamps), MISSING_VOLUME)
+        self._write_columns(item_id, timestamps, prices, volumes, mode='ab')
+
+    def _write_columns(self, item_id, timestamps, prices, volumes, mode):
+        if len(timestamps) != len(prices) or (volumes is not None and len(volumes) != len(prices)):
+            raise ValueError("timestamps, prices and volumes must have the same length")
+        arrays = {'timestamp': timestamps, 'price': prices}
+        if volumes is not None:
+            arrays['volume'] = volumes
+        committed = self.length(item_id) if mode == 'ab' else 0
+        for column, values in arrays.items():
+            values = np.asarray(values)
+            dtype = COLUMNS[column] if mode == 'wb' else self.column_dtype(item_id, column)
+            if not _fits(values, dtype):
+                if mode == 'ab':
+                    self._widen(item_id, column)
+                dtype = WIDE_DTYPE
+            if mode == 'wb':
+                for stale in {COLUMNS[column], WIDE_DTYPE} - {dtype}:
+                    stale_path = self.column_path(item_id, column, stale)
+                    if os.path.exists(stale_path):
+                        os.remove(stale_path)
+            with open(self.column_path(item_id, column, dtype), mode) as f:
+                if mode == 'ab':
+                    # Drop whatever an interrupted append left past the rows every column has
+                    f.truncate(committed * dtype.itemsize)
+                values.astype(dtype).tofile(f)
+
+    def _widen(self, item_id, column):
+        """Rewrite an int32 column as int64, swapped in by rename."""
+        narrow_path = self.column_path(item_id, column, COLUMNS[column])
+        wide_path = self.column_path(item_id, column, WIDE_DTYPE)
+        np.fromfile(narrow_path, dtype=COLUMNS[column]).astype(WIDE_DTYPE).tofile(f"{wide_path}.tmp")
+        os.replace(f"{wide_path}.tmp", wide_path)
+        os.remove(narrow_path)
+
+    def _read(self, path, dtype, mmap, length):
+        if length == 0:
+            return np.empty(0, dtype=dtype)
+        if mmap:
+            return np.memmap(path, dtype=dtype, mode='r', shape=(length,))
+        return np.fromfile(path, dtype=dtype, count=length)
+
+    def _read_column(self, item_id, column, mmap, length):
+        dtype = self.column_dtype(item_id, column)
+        return self._read(self.column_path(item_id, column, dtype), dtype, mmap, length)
+
+    def load(self, item_id, mmap=True):
+        """Return a PriceHistory of NumPy arrays (memory-mapped by default); volumes may be None."""
+        if not self.has(item_id):
+            raise KeyError(f"Item {item_id} is not in the price store at {self.root}")
+        length = self.length(item_id)
+        timestamps = self._read_column(item_id, 'timestamp', mmap, length)
+        prices = self._read_column(item_id, 'price', mmap, length)
+        volumes = self._read_column(item_id, 'volume', mmap, length) if self.has_column(item_id, 'volume') else None
+        return PriceHistory(int(item_id), timestamps, prices, volumes)
+
+    def last_timestamp(self, item_id):
+        """Timestamp of the newest stored point, or None if the item has none."""
+        if not self.has(item_id):
+            return None
+        timestamps = self.load(item_id).timestamps
+        return int(timestamps[-1]) if len(timestamps) else None
+
+    def series(self, item_id, column='price'):
+        """Return a float pandas Series indexed by UTC datetime."""
+        history = self.load(item_id)
+        values = {'price': history.prices, 'volume': history.volumes}[column]
+        index = pd.to_datetime(np.asarray(history.timestamps), unit='ms', utc=True)
+        if values is None:
+            return pd.Series(np.nan, index=index, name=column)
+        values = np.asarray(values, dtype=float)
+        if column == 'volume':
+            values[values == MISSING_VOLUME] = np.nan
+        return pd.Series(values, index=index, name=column)
+
+    def import_history(self, item_id, history):
+        """Store a weirdgloop history list (dicts with price, volume, timestamp)."""
+        timestamps = np.fromiter((entry['timestamp'] for entry in history), dtype=np.int64, count=len(history))
+        prices = np.fromiter((entry['price'] for entry in history), dtype=np.int64, count=len(history))
+        volumes = None
+        if any(entry.get('volume') is not None for entry in history):
+            volumes = np.fromiter(
+                (MISSING_VOLUME if entry.get('volume') is None else entry['volume'] for entry in history),
+                dtype=np.int64, count=len(history)
+            )
+        self.write(item_id, timestamps, prices, volumes)
+        return len(history)
+
+    def import_json(self, json_path):
+        """Convert a historical_data_<id>.json file ({item_id: [points]}) into the store."""
+        with open(json_path, 'r') as f:
+            data = json.load(f)
+        return {int(item_id): self.import_history(item_id, history) for item_id, history in data.items()}
+
+def main():
+    # Usage: python -m utils.price_store historical_data_327.json [historical_data_453.json ...]
+    store = PriceStore()
+    for json_path in sys.argv[1:]:
+        for item_id, count in store.import_json(json_path).items():
+            print(f"Stored {count} points for item {item_id} from {json_path}")
+    print(f"Price store: {store.root}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+import pandas as pd
+from .price_db import SCHEMA_DIR
+from .price_store import PROJECT_ROOT
+
+DEFAULT_RESULTS_PATH = os.path.join(PROJECT_ROOT, 'backtest_results.db')
+METRIC_COLUMNS = ['num_trades', 'win_rate', 'profit_factor', 'avg_profit_per_trade', 'max_drawdown', 'total_profit',
+                  'max_drawdown_duration', 'sharpe', 'sortino', 'calmar', 'exposure']
+TRADE_COLUMNS = ['entry_date', 'entry_price', 'exit_date', 'exit_price', 'profit', 'cumulative_profit']
+RUN_COLUMNS = ['run_id', 'source', 'strategy', 'item_id', 'params', 'created_at']
+# Child tables of runs, cleared before a run is recorded again
+CHILD_TABLES = ['run_params', 'metrics', 'trades']
+BATCH_SIZE = 5000
+
+INSERT_RUN = f"INSERT OR REPLACE INTO runs VALUES ({', '.join('?' for _ in RUN_COLUMNS)})"
+INSERT_METRICS = f"INSERT OR REPLACE INTO metrics VALUES (?, {', '.join('?' for _ in METRIC_COLUMNS)})"
+INSERT_TRADE = f"INSERT OR REPLACE INTO trades VALUES (?, ?, {', '.join('?' for _ in TRADE_COLUMNS)})"
+
+def _run_id(source, strategy, item_id, params_json):
+    key = f"{source}\0{strategy}\0{item_id}\0{params_json}"
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big') >> 1
+
+def run_id(source, strategy, item_id, params):
+    """Stable 63-bit id of a run, so parallel writers agree on it without a shared counter."""
+    return _run_id(source, strategy, item_id, json.dumps(params, sort_keys=True))
+
+def run_record(source, strategy, item_id, params, summary, trades=()):
+    """One run for ``ResultsStore.add_runs``: ``summary`` is a ``strategies.summarize`` row."""
+    return {'source': source, 'strategy': strategy, 'item_id': None if item_id is None else int(item_id),
+            'params': dict(params), 'metrics': summary, 'trades': list(trades)}
+
+def shard_path(path, owner, pid=None):
+    """Shard file of process ``pid`` (default: this one) writing for the run started by process ``owner``."""
+    return f"{path}.shard-{owner}-{os.getpid() if pid is None else pid}"
+
+class ResultsStore:
+    """SQLite store of backtest runs, their parameters, metrics and trades (``db/results_sqlite.sql``).
+
+    Runs are keyed by ``run_id`` (a hash of source, strategy, item and
+    params) and recording one again replaces it. ``add_runs`` writes many
+    runs in one transaction. Parallel workers never share the database:
+    each writes its own shard (``ResultsStore.shard``, one file per process
+    next to the main database, tagged with the parent's pid) and the parent
+    folds its shards in with ``merge_shards``, one INSERT ... SELECT per table.
+    """
+
+    def __init__(self, path=DEFAULT_RESULTS_PATH, durable=True):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        if durable:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+        else:
+            # Shards are scratch files merged once the pool is done
+            self.conn.execute('PRAGMA journal_mode=MEMORY')
+            self.conn.execute('PRAGMA synchronous=OFF')
+        with open(os.path.join(SCHEMA_DIR, 'results_sqlite.sql'), 'r') as f:
+            self.conn.executescript(f.read())
+
+    @classmethod
+    def shard(cls, path=DEFAULT_RESULTS_PATH, owner=None):
+        """This process's private shard of the store at ``path`` for the run started by ``owner`` (a pid)."""
+        return cls(shard_path(path, os.getpid() if owner is None else owner), durable=False)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def add_runs(self, records):
+        """Insert ``run_record`` dicts in one transaction; returns the number of runs written."""
+        created_at = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        count = 0
+        with self.conn:
+            for start in range(0, len(records), BATCH_SIZE):
+                runs, params, metrics, trades = [], [], [], []
+                for record in records[start:start + BATCH_SIZE]:
+                    params_json = json.dumps(record['params'], sort_keys=True)
+                    rid = _run_id(record['source'], record['strategy'], record['item_id'], params_json)
+                    runs.append((rid, record['source'], record['strategy'], record['item_id'], params_json,
+                                 created_at))
+                    params.extend((rid, name, value) for name, value in record['params'].items())
+                    metrics.append((rid, *(record['metrics'].get(column) for column in METRIC_COLUMNS)))
+                    trades.extend((rid, i, *(trade[column] for column in TRADE_COLUMNS))
+                                  for i, trade in enumerate(record['trades']))
+                for table in CHILD_TABLES:
+                    self.conn.executemany(f"DELETE FROM {table} WHERE run_id = ?", [run[:1] for run in runs])
+                self.conn.executemany(INSERT_RUN, runs)
+                self.conn.executemany("INSERT OR REPLACE INTO run_params VALUES (?, ?, ?)", params)
+                self.conn.executemany(INSERT_METRICS, metrics)
+                self.conn.executemany(INSERT_TRADE, trades)
+                count += len(runs)
+        return count
+
+    def merge_shards(self, owner=None, remove=True):
+        """Fold the shards written for ``owner`` (default: this process) into this store; returns runs merged."""
+        owner = os.getpid() if owner is None else owner
+        count = 0
+        for path in sorted(glob.glob(glob.escape(self.path) + f'.shard-{owner}-*')):
+            self.conn.execute("ATTACH DATABASE ? AS shard", (path,))
+            try:
+                with self.conn:
+                    for table in CHILD_TABLES:
+                        self.conn.execute(f"DELETE FROM {table} WHERE run_id IN (SELECT run_id FROM shard.runs)")
+                    count += self.conn.execute("INSERT OR REPLACE INTO runs SELECT * FROM shard.runs").rowcount
+                    for table in CHILD_TABLES:
+                        self.conn.execute(f"INSERT OR REPLACE INTO {table} SELECT * FROM shard.{table}")
+            finally:
+                self.conn.execute("DETACH DATABASE shard")
+            if remove:
+                os.remove(path)
+        return count
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def top(self, by='total_profit', n=20, strategy=None, item_id=None, source=None, params=None, below=None,
+            above=None, ascending=False):
+        """The ``n`` best runs by one metric as a DataFrame, one column per parameter and metric.
+
+        ``below``/``above`` map metrics to exclusive limits and ``params``
+        to required values, e.g. ``top('profit_factor', below={'max_drawdown': 50})``.
+        """
+        self._check_metrics([by, *(below or {}), *(above or {})])
+        conditions, values = [], []
+        for column, value in [('strategy', strategy), ('item_id', item_id), ('source', source)]:
+            if value is not None:
+                conditions.append(f"r.{column} = ?")
+                values.append(value)
+        for name, value in (params or {}).items():
+            conditions.append("r.run_id IN (SELECT run_id FROM run_params WHERE name = ? AND value = ?)")
+            values.extend([name, value])
+        for metric, limit in (below or {}).items():
+            conditions.append(f"m.{metric} < ?")
+            values.append(limit)
+        for metric, limit in (above or {}).items():
+            conditions.append(f"m.{metric} > ?")
+            values.append(limit)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        query = (f"SELECT r.run_id, r.source, r.strategy, r.item_id, r.params, "
+                 f"{', '.join(f'm.{column}' for column in METRIC_COLUMNS)} "
+                 f"FROM metrics m JOIN runs r ON r.run_id = m.run_id {where} "
+                 f"ORDER BY m.{by} {'ASC' if ascending else 'DESC'}, r.run_id LIMIT ?")
+        return self._frame(self.conn.execute(query, values + [n]).fetchall())
+
+    def best_per_strategy(self, by='total_profit', item_id=None, source=None):
+        """{strategy: (best run as a dict, number of runs)} from one indexed lookup per strategy.
+
+        ``item_id`` and ``source`` restrict both the runs counted and the best
+        picked, e.g. one script's runs on one item.
+        """
+        self._check_metrics([by])
+        conditions, values = [], []
+        for column, value in [('item_id', item_id), ('source', source)]:
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                values.append(value)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+        counts = self.conn.execute(f"SELECT strategy, COUNT(*) FROM runs{where} GROUP BY strategy", values).fetchall()
+        best = {}
+        for strategy, count in counts:
+            row = self.top(by, 1, strategy=strategy, item_id=item_id, source=source).to_dict(orient='records')[0]
+            best[strategy] = ({k: v for k, v in row.items() if not pd.isna(v)}, count)
+        return best
+
+    def trades(self, run_id):
+        rows = self.conn.execute(f"SELECT {', '.join(TRADE_COLUMNS)} FROM trades WHERE run_id = ? ORDER BY trade_no",
+                                 (run_id,)).fetchall()
+        return pd.DataFrame(rows, columns=TRADE_COLUMNS)
+
+    @staticmethod
+    def _check_metrics(metrics):
+        unknown = set(metrics) - set(METRIC_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown metrics: {sorted(unknown)}")
+
+    @staticmethod
+    def _frame(rows):
+        """Rows of (run_id, source, strategy, item_id, params JSON, *metrics) with the params spread into columns."""
+        records = []
+        for run_id_, source, strategy, item_id, params, *metrics in rows:
+            records.append({'run_id': run_id_, 'source': source, 'strategy': strategy, 'item_id': item_id,
+                            **json.loads(params), **dict(zip(METRIC_COLUMNS, metrics))})
+        table = pd.DataFrame(records)
+        if table.empty:
+            return table
+        run_columns = ['run_id', 'source', 'strategy', 'item_id']
+        param_columns = [c for c in table.columns if c not in run_columns and c not in METRIC_COLUMNS]
+        return table[run_columns + param_columns + METRIC_COLUMNS]
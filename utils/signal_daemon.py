@@ -0,0 +1,291 @@
+import argparse
+import json
+import math
+import os
+import time
+from datetime import datetime
+from .backtest_profiles import StreamingIndicatorState
+from .bulk_snapshot import BulkSnapshot
+from .prediction_tracker import PredictionTracker
+from .price_db import PriceDatabase
+from .price_store import PriceStore, PROJECT_ROOT
+
+WINDOWS = [14, 30, 90]
+RSI_SELL = 70
+RSI_BUY = 30
+
+def window_signal(price, upper, lower, rsi):
+    """Same rule as analyze_with_multiple_windows; NaN values never trigger."""
+    if price > upper:
+        return "Sell"
+    if price < lower:
+        return "Buy"
+    if rsi > RSI_SELL:
+        return "Sell (RSI)"
+    if rsi < RSI_BUY:
+        return "Buy (RSI)"
+    return ''
+
+def _value(x):
+    return None if math.isnan(x) else x
+
+class ItemSignalState:
+    """O(1)-per-tick Bollinger/RSI state for one item across several windows."""
+
+    def __init__(self, windows=WINDOWS):
+        self.windows = list(windows)
+        self.states = [StreamingIndicatorState(window) for window in self.windows]
+
+    def seed(self, prices):
+        """Warm up from history; only the last max(window) + 1 prices can affect the state."""
+        for price in prices[-(max(self.windows) + 1):]:
+            for state in self.states:
+                state.update(float(price))
+
+    @property
+    def warm(self):
+        """True once every window has its bands and RSI (max(window) + 1 prices seen)."""
+        return all(len(state.changes) >= state.window for state in self.states)
+
+    def update(self, price):
+        """Push one price and return analysis data shaped like analyze_with_multiple_windows."""
+        analysis_data = {'current_price': price}
+        for window, state in zip(self.windows, self.states):
+            ma, upper, lower, rsi = state.update(price)
+            analysis_data[f'ma_{window}'] = _value(ma)
+            analysis_data[f'rsi_{window}'] = _value(rsi)
+            analysis_data[f'upper_{window}'] = _value(upper)
+            analysis_data[f'lower_{window}'] = _value(lower)
+            analysis_data[f'signal_{window}'] = window_signal(price, upper, lower, rsi)
+        return analysis_data
+
+class SeededFeed:
+    """Seeds items from the history held by a PriceStore or PriceDatabase.
+
+    Items the source doesn't hold (see ``missing``) start unseeded: their
+    state warms up from the feed's own ticks.
+    """
+
+    history_source = None
+
+    def missing(self, item_ids):
+        source = self.history_source
+        return [item_id for item_id in item_ids if source is None or not source.has(item_id)]
+
+    def history(self, item_id):
+        source = self.history_source
+        if source is None or not source.has(item_id):
+            return []
+        if isinstance(source, PriceDatabase):
+            return source.load_series(item_id).to_numpy()
+        return source.load(item_id).prices
+
+class PriceStoreFeed(SeededFeed):
+    """Ticks from points appended to a PriceStore (e.g. by ``history_fetcher --sync``).
+
+    Each poll stats the items' column files and reads only the new tail of
+    the ones that grew. Items not in the store (see ``missing``) have no
+    history and no ticks until points for them are stored.
+    """
+
+    def __init__(self, store=None, item_ids=None):
+        self.store = store or PriceStore()
+        self.history_source = self.store
+        self.item_ids = item_ids
+        self.seen = {}
+
+    def start(self, item_ids):
+        for item_id in item_ids:
+            self.seen[item_id] = self._length(item_id)
+
+    def _length(self, item_id):
+        # A concurrent append writes timestamps first; only count points whose every column has landed
+        return self.store.length(item_id)
+
+    def items(self):
+        return self.item_ids if self.item_ids is not None else self.store.items()
+
+    def poll(self):
+        ticks = []
+        for item_id in self.items():
+            length = self._length(item_id)
+            seen = self.seen.get(item_id, 0)
+            if length <= seen:
+                continue
+            history = self.store.load(item_id)
+            for timestamp, price in zip(history.timestamps[seen:length].tolist(), history.prices[seen:length].tolist()):
+                ticks.append((item_id, float(price), timestamp))
+            self.seen[item_id] = length
+        return ticks
+
+class SnapshotFeed(SeededFeed):
+    """Ticks from an os_dump file: every item's price whenever %JAGEX_TIMESTAMP% moves on.
+
+    ``history_source`` (a PriceStore or PriceDatabase) seeds the items it holds.
+    """
+
+    def __init__(self, path=os.path.join(PROJECT_ROOT, 'osrs_bulk_data.json'), history_source=None):
+        self.path = path
+        self.history_source = history_source
+        self.mtime = None
+        self.jagex_timestamp = None
+
+    def start(self, item_ids):
+        pass
+
+    def poll(self):
+        mtime = os.path.getmtime(self.path)
+        if mtime == self.mtime:
+            return []
+        self.mtime = mtime
+        snapshot = BulkSnapshot.from_file(self.path)
+        if snapshot.jagex_timestamp == self.jagex_timestamp:
+            return []
+        self.jagex_timestamp = snapshot.jagex_timestamp
+        timestamp = snapshot.jagex_timestamp * 1000
+        return [(item_id, float(price), timestamp) for item_id, price in snapshot.prices().items()]
+
+class JsonLinesFeed(SeededFeed):
+    """Local feed stub: tails a file of {"item_id", "price", "timestamp"} JSON lines.
+
+    ``history_source`` (a PriceStore or PriceDatabase) seeds the items it holds.
+    """
+
+    def __init__(self, path, history_source=None):
+        self.path = path
+        self.history_source = history_source
+        self.offset = 0
+
+    def start(self, item_ids):
+        pass
+
+    def poll(self):
+        if not os.path.exists(self.path):
+            return []
+        ticks = []
+        with open(self.path, 'r') as f:
+            f.seek(self.offset)
+            while True:
+                line = f.readline()
+                # Leave a partially written last line for the next poll
+                if not line.endswith('\n'):
+                    break
+                self.offset = f.tell()
+                if line.strip():
+                    tick = json.loads(line)
+                    ticks.append((int(tick['item_id']), float(tick['price']), tick.get('timestamp')))
+        return ticks
+
+class SignalDaemon:
+    """Long-running signal service: feed ticks in, analysis data and predictions out.
+
+    Keeps one ``ItemSignalState`` per item, so a tick costs the same however
+    long the history is. Once an item's state is warm, each tick is queued to
+    the tracker's background writer rather than committed inline; an
+    unseeded item records no predictions while it warms up.
+    ``on_signal(item_id, analysis_data)`` is called for ticks where any
+    window has a signal.
+    """
+
+    def __init__(self, tracker=None, windows=WINDOWS, on_signal=None):
+        self.tracker = tracker
+        self.windows = list(windows)
+        self.on_signal = on_signal
+        self.items = {}
+        self.tick_count = 0
+        self.tick_seconds = 0.0
+
+    def state(self, item_id):
+        state = self.items.get(item_id)
+        if state is None:
+            state = self.items[item_id] = ItemSignalState(self.windows)
+        return state
+
+    def seed(self, item_id, prices):
+        self.state(item_id).seed(prices)
+
+    def on_tick(self, item_id, price, timestamp=None):
+        state = self.state(item_id)
+        analysis_data = state.update(price)
+        if self.tracker is not None and state.warm:
+            when = None if timestamp is None else datetime.fromtimestamp(timestamp / 1000).isoformat()
+            self.tracker.queue_prediction(item_id, analysis_data, when)
+        if self.on_signal is not None and any(analysis_data[f'signal_{w}'] for w in self.windows):
+            self.on_signal(item_id, analysis_data)
+        return analysis_data
+
+    def process(self, ticks):
+        start = time.perf_counter()
+        for item_id, price, timestamp in ticks:
+            self.on_tick(item_id, price, timestamp)
+        self.tick_count += len(ticks)
+        self.tick_seconds += time.perf_counter() - start
+        return len(ticks)
+
+    def run(self, feed, item_ids=(), interval=5.0, max_polls=None):
+        """Seed the given items from the feed's history, then poll until interrupted."""
+        for item_id in item_ids:
+            self.seed(item_id, feed.history(item_id))
+        feed.start(item_ids)
+        polls = 0
+        try:
+            while max_polls is None or polls < max_polls:
+                self.process(feed.poll())
+                polls += 1
+                if max_polls is None or polls < max_polls:
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        if self.tracker is not None:
+            self.tracker.flush()
+
+    @property
+    def mean_tick_latency(self):
+        return self.tick_seconds / self.tick_count if self.tick_count else 0.0
+
+def print_signal(item_id, analysis_data):
+    signals = ', '.join(f"{key[7:]}: {value}" for key, value in analysis_data.items()
+                        if key.startswith('signal_') and value)
+    print(f"{item_id} @ {analysis_data['current_price']:.2f} -> {signals}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Emit Bollinger/RSI signals and predictions for every new price tick.')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--store', action='store_true', help='Watch the price store for appended points (default)')
+    source.add_argument('--snapshot', metavar='PATH', help='Watch an os_dump file for new snapshots')
+    source.add_argument('--ticks', metavar='PATH', help='Tail a JSON-lines tick file')
+    parser.add_argument('items', nargs='*', type=int,
+                        help='Items to seed from stored history (default: all in the price store or --price-db)')
+    parser.add_argument('--price-db', default=None,
+                        help='Seed --snapshot/--ticks items from a price database (SQLite path or postgresql:// DSN) '
+                             'instead of the price store; items without stored history start unseeded and '
+                             'record no predictions until they have max(window) + 1 ticks')
+    parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls')
+    parser.add_argument('--db', default='predictions.db')
+    parser.add_argument('--quiet', action='store_true', help="Don't print signals")
+    args = parser.parse_args()
+
+    if args.price_db and not (args.snapshot or args.ticks):
+        parser.error('--price-db only seeds --snapshot or --ticks; the store feed seeds from the store it watches')
+    history_source = PriceDatabase(args.price_db) if args.price_db else PriceStore()
+    if args.snapshot:
+        feed = SnapshotFeed(args.snapshot, history_source)
+    elif args.ticks:
+        feed = JsonLinesFeed(args.ticks, history_source)
+    else:
+        feed = PriceStoreFeed(history_source, item_ids=args.items or None)
+    item_ids = args.items or history_source.items()
+    missing = feed.missing(item_ids)
+    if missing and isinstance(feed, PriceStoreFeed):
+        print(f"Not in the price store, skipped until stored: {', '.join(map(str, missing))}")
+    elif missing:
+        where = 'the price database' if args.price_db else 'the price store'
+        print(f"Not in {where}, starting unseeded: {', '.join(map(str, missing))}")
+
+    with PredictionTracker(args.db) as tracker:
+        daemon = SignalDaemon(tracker, on_signal=None if args.quiet else print_signal)
+        daemon.run(feed, item_ids, interval=args.interval)
+    print(f"Processed {daemon.tick_count} ticks, {daemon.mean_tick_latency * 1e6:.1f} us per tick")
+
+if __name__ == "__main__":
+    main()
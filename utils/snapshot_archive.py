@@ -0,0 +1,199 @@
+import json
+import os
+import sys
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from .bulk_snapshot import BulkSnapshot, MISSING
+from .price_store import PROJECT_ROOT
+
+DEFAULT_ARCHIVE_DIR = os.path.join(PROJECT_ROOT, 'snapshot_archive')
+
+# Row columns, appended in snapshot order within each monthly partition
+COLUMNS = {
+    'timestamp': np.dtype('<i8'),  # ms since epoch, from %JAGEX_TIMESTAMP%
+    'item_id': np.dtype('<i4'),
+    'price': np.dtype('<i8'),
+    'last': np.dtype('<i8'),
+    'volume': np.dtype('<i8'),
+}
+TRACKED = ['price', 'last', 'volume']
+STATE_FILE = 'latest.json'
+# Per-partition item index: row numbers ordered by item id (then time), and the item ids in that order
+INDEX_COLUMNS = {
+    'index_row': np.dtype('<i8'),
+    'index_item_id': np.dtype('<i4'),
+}
+
+class SnapshotArchive:
+    """Append-only intraday history built from repeated os_dump bulk snapshots.
+
+    Rows are change events: a snapshot only appends the items whose price,
+    last or volume differ from the previous archived value. Rows live in raw
+    column files partitioned by UTC month (``YYYY-MM/``); within a partition
+    timestamps only grow, so time ranges are binary searches on a memory map.
+    Each partition also gets an item index (its rows sorted by item id), so
+    one item's history is a binary search per partition as well. It is
+    rebuilt when the partition has grown since it was written.
+    ``latest.json`` keeps the last archived snapshot time, per-item values
+    and each partition's row count. Columns are only read (and appended to)
+    up to that count, so rows from an append that crashed before the state
+    was saved are dropped.
+    """
+
+    def __init__(self, root=DEFAULT_ARCHIVE_DIR):
+        self.root = root
+
+    def partition_for(self, timestamp_ms):
+        return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).strftime('%Y-%m')
+
+    def partitions(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root)
+                      if os.path.isdir(os.path.join(self.root, name)) and name[:4].isdigit())
+
+    def column_path(self, partition, column):
+        dtype = COLUMNS[column] if column in COLUMNS else INDEX_COLUMNS[column]
+        return os.path.join(self.root, partition, f"{column}.{dtype.str[1:]}")
+
+    def load_state(self):
+        path = os.path.join(self.root, STATE_FILE)
+        if not os.path.exists(path):
+            return {'timestamp': None, 'items': {}, 'rows': {}}
+        with open(path, 'r') as f:
+            state = json.load(f)
+        state.setdefault('rows', {})
+        return state
+
+    def _row_count(self, state, partition):
+        """Committed rows of a partition; archives from before row counts were saved use the shortest column."""
+        if partition in state['rows']:
+            return state['rows'][partition]
+        sizes = [os.path.getsize(path) // dtype.itemsize if os.path.exists(path) else 0
+                 for path, dtype in ((self.column_path(partition, column), dtype) for column, dtype in COLUMNS.items())]
+        return min(sizes)
+
+    def save_state(self, state):
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, STATE_FILE)
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump(state, f)
+        os.replace(f"{path}.tmp", path)
+
+    def append(self, snapshot):
+        """Archive a BulkSnapshot; returns rows written (0 if already archived or unchanged)."""
+        timestamp = snapshot.jagex_timestamp
+        if timestamp is None:
+            raise ValueError("Snapshot has no %JAGEX_TIMESTAMP%")
+        timestamp_ms = timestamp * 1000
+        state = self.load_state()
+        if state['timestamp'] is not None and timestamp_ms <= state['timestamp']:
+            return 0
+
+        columns = snapshot.columns
+        ids = columns['id']
+        previous = state['items']
+        values = np.column_stack([columns[name] for name in TRACKED])
+        known = np.array([str(item_id) in previous for item_id in ids.tolist()], dtype=bool)
+        old = np.array([previous.get(str(item_id), [MISSING] * len(TRACKED)) for item_id in ids.tolist()],
+                       dtype=np.int64).reshape(len(ids), len(TRACKED))
+        changed = ~known | (values != old).any(axis=1)
+
+        rows = {
+            'timestamp': np.full(int(changed.sum()), timestamp_ms),
+            'item_id': ids[changed],
+            **{name: columns[name][changed] for name in TRACKED},
+        }
+        partition = self.partition_for(timestamp_ms)
+        os.makedirs(os.path.join(self.root, partition), exist_ok=True)
+        committed = self._row_count(state, partition)
+        for column, data in rows.items():
+            with open(self.column_path(partition, column), 'ab') as f:
+                # Drop whatever an interrupted append left past the committed rows
+                f.truncate(committed * COLUMNS[column].itemsize)
+                np.asarray(data, dtype=COLUMNS[column]).tofile(f)
+
+        for item_id, row in zip(rows['item_id'].tolist(), values[changed].tolist()):
+            previous[str(item_id)] = row
+        state['timestamp'] = timestamp_ms
+        state['rows'][partition] = committed + len(rows['item_id'])
+        self.save_state(state)
+        return len(rows['item_id'])
+
+    def _read_column(self, partition, column, dtype, rows):
+        path = self.column_path(partition, column)
+        if not rows or not os.path.exists(path) or os.path.getsize(path) < rows * dtype.itemsize:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r', shape=(rows,))
+
+    def _load_partition(self, partition, state=None):
+        rows = self._row_count(state or self.load_state(), partition)
+        return {column: self._read_column(partition, column, dtype, rows) for column, dtype in COLUMNS.items()}
+
+    def _item_index(self, partition, data):
+        """(rows, item_ids): the partition's row numbers ordered by item id, and the ids in that order."""
+        rows = len(data['item_id'])
+        paths = {column: self.column_path(partition, column) for column in INDEX_COLUMNS}
+        if rows and all(os.path.exists(path) and os.path.getsize(path) == rows * INDEX_COLUMNS[column].itemsize
+                        for column, path in paths.items()):
+            return tuple(self._read_column(partition, column, dtype, rows) for column, dtype in INDEX_COLUMNS.items())
+        # Stable, so each item's rows stay in time order
+        order = np.argsort(data['item_id'], kind='stable')
+        for column, values in [('index_row', order), ('index_item_id', data['item_id'][order])]:
+            path = paths[column]
+            np.asarray(values, dtype=INDEX_COLUMNS[column]).tofile(f"{path}.tmp")
+            os.replace(f"{path}.tmp", path)
+        return order, np.asarray(data['item_id'][order])
+
+    def _frame(self, chunks):
+        if not chunks:
+            return pd.DataFrame({column: np.empty(0, dtype=dtype) for column, dtype in COLUMNS.items()})
+        frame = pd.DataFrame({column: np.concatenate([chunk[column] for chunk in chunks]) for column in COLUMNS})
+        for column in TRACKED:
+            frame[column] = frame[column].where(frame[column] != MISSING)
+        return frame
+
+    def range(self, start_ms=None, end_ms=None, item_ids=None):
+        """Change rows with start_ms <= timestamp <= end_ms (optionally for some items only)."""
+        chunks = []
+        first = self.partition_for(start_ms) if start_ms is not None else None
+        last = self.partition_for(end_ms) if end_ms is not None else None
+        state = self.load_state()
+        for partition in self.partitions():
+            if (first and partition < first) or (last and partition > last):
+                continue
+            data = self._load_partition(partition, state)
+            timestamps = data['timestamp']
+            lo = 0 if start_ms is None else np.searchsorted(timestamps, start_ms, side='left')
+            hi = len(timestamps) if end_ms is None else np.searchsorted(timestamps, end_ms, side='right')
+            chunk = {column: values[lo:hi] for column, values in data.items()}
+            if item_ids is not None:
+                mask = np.isin(chunk['item_id'], list(item_ids))
+                chunk = {column: values[mask] for column, values in chunk.items()}
+            chunks.append(chunk)
+        return self._frame(chunks)
+
+    def item_history(self, item_id):
+        """Every archived change for one item, oldest first, from each partition's item index."""
+        chunks = []
+        state = self.load_state()
+        for partition in self.partitions():
+            data = self._load_partition(partition, state)
+            order, item_ids = self._item_index(partition, data)
+            lo, hi = np.searchsorted(item_ids, [item_id, item_id + 1], side='left')
+            if hi > lo:
+                rows = np.asarray(order[lo:hi])
+                chunks.append({column: values[rows] for column, values in data.items()})
+        return self._frame(chunks)
+
+def main():
+    # Usage: python -m utils.snapshot_archive [osrs_bulk_data.json | --fetch]
+    archive = SnapshotArchive()
+    source = sys.argv[1] if len(sys.argv) > 1 else 'osrs_bulk_data.json'
+    snapshot = BulkSnapshot.from_url() if source == '--fetch' else BulkSnapshot.from_file(source)
+    written = archive.append(snapshot)
+    print(f"Archived {written} changed rows for snapshot {snapshot.jagex_timestamp} into {archive.root}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+import itertools
+import json
+import os
+from .backtest_kernel import as_bars, crossed_above, crossed_below, fill_long_only, run_long_only
+from .indicator_provider import IndicatorProvider, PROJECT_ROOT
+from .metrics import equity_metrics, exposure, positions, trade_metrics
+
+# Optional pre-enriched export; the engine computes indicators from the raw history instead
+ENRICHED_DATA_PATH = os.path.join(PROJECT_ROOT, 'historical_data_327_enriched.json')
+
+MA_PERIODS = [5, 7, 14, 20, 90, 180, 365]
+RSI_PERIODS = [7, 14, 21, 30]
+BB_PERIODS = [5, 7, 14, 20, 90, 180, 365]
+RSI_BUY = 30
+RSI_SELL = 70
+# Bollinger bands are stored at this multiplier; others are rebuilt from the MA and std columns
+STD_DEV = 2
+
+# name -> Strategy subclass, filled by @register_strategy
+STRATEGIES = {}
+
+def register_strategy(cls):
+    STRATEGIES[cls.name] = cls
+    return cls
+
+def load_enriched_data(path=ENRICHED_DATA_PATH):
+    """Load enriched historical data from JSON file."""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def save_json(data, filename):
+    with open(filename, 'w') as f:
+        json.dump(data, f, indent=2)
+
+def print_backtest_summary(label, trades, total_profit):
+    print(f"\n{label}")
+    print(f"Number of trades: {len(trades)}")
+    print(f"Total profit: {total_profit:.2f}")
+    if trades:
+        print(f"First trade: {trades[0]}")
+        print(f"Last trade: {trades[-1]}")
+
+class Strategy:
+    """A long-only strategy: the indicator columns it reads and the entry/exit arrays it derives.
+
+    Subclasses set ``name`` and a default ``param_grid``, store their
+    parameters, and implement ``indicators()`` (a list of (name, period)
+    pairs as understood by ``IndicatorProvider.bars``) and ``signals(bars)``
+    (boolean entry and exit arrays). Position handling, end-of-data close-out
+    and metrics are shared by ``backtest`` and ``StrategyEngine``.
+    """
+
+    name = None
+    param_grid = {}
+
+    def __init__(self, **params):
+        self.params = params
+
+    def __repr__(self):
+        args = ', '.join(f"{key}={value!r}" for key, value in self.params.items())
+        return f"{type(self).__name__}({args})"
+
+    def is_valid(self):
+        """False for grid points that cannot produce a meaningful strategy."""
+        return True
+
+    def indicators(self):
+        raise NotImplementedError
+
+    def signals(self, bars):
+        raise NotImplementedError
+
+    def backtest(self, data):
+        """Returns (trades, total_profit, equity array) for BarArrays or enriched-style rows."""
+        bars = as_bars(data)
+        entries, exits = self.signals(bars)
+        return run_long_only(bars, entries, exits)
+
+    def fill(self, data, resume=None):
+        """``backtest`` plus the end ``FillState``, optionally resuming an earlier fill (see ``fill_long_only``)."""
+        bars = as_bars(data)
+        entries, exits = self.signals(bars)
+        return fill_long_only(bars, entries, exits, resume)
+
+@register_strategy
+class SingleMA(Strategy):
+    """Buy when price crosses above the MA, sell when it crosses back below."""
+
+    name = 'single_ma'
+    param_grid = {'period': MA_PERIODS}
+
+    def __init__(self, period):
+        super().__init__(period=period)
+        self.period = period
+
+    def indicators(self):
+        return [('ma', self.period)]
+
+    def signals(self, bars):
+        ma = bars.column('ma', self.period)
+        return crossed_above(bars.prices, ma), crossed_below(bars.prices, ma)
+
+@register_strategy
+class DualMA(Strategy):
+    """Buy when the short MA crosses above the long MA, sell when it crosses back below."""
+
+    name = 'dual_ma'
+    param_grid = {'short_period': MA_PERIODS, 'long_period': MA_PERIODS}
+
+    def __init__(self, short_period, long_period):
+        super().__init__(short_period=short_period, long_period=long_period)
+        self.short_period = short_period
+        self.long_period = long_period
+
+    def is_valid(self):
+        return self.short_period < self.long_period
+
+    def indicators(self):
+        return [('ma', self.short_period), ('ma', self.long_period)]
+
+    def signals(self, bars):
+        short_ma = bars.column('ma', self.short_period)
+        long_ma = bars.column('ma', self.long_period)
+        return crossed_above(short_ma, long_ma), crossed_below(short_ma, long_ma)
+
+@register_strategy
+class RSIThreshold(Strategy):
+    """Buy when RSI drops below ``buy_level``, sell when it rises above ``sell_level``."""
+
+    name = 'rsi'
+    param_grid = {'period': RSI_PERIODS, 'buy_level': [20, 25, 30, 35], 'sell_level': [65, 70, 75, 80]}
+
+    def __init__(self, period, buy_level=RSI_BUY, sell_level=RSI_SELL):
+        super().__init__(period=period, buy_level=buy_level, sell_level=sell_level)
+        self.period = period
+        self.buy_level = buy_level
+        self.sell_level = sell_level
+
+    def is_valid(self):
+        return self.buy_level < self.sell_level
+
+    def indicators(self):
+        return [('rsi', self.period)]
+
+    def signals(self, bars):
+        rsi = bars.column('rsi', self.period)
+        return rsi < self.buy_level, rsi > self.sell_level
+
+@register_strategy
+class BollingerBreakout(Strategy):
+    """Buy when price crosses below the lower band, sell when it crosses above the upper band."""
+
+    name = 'bollinger'
+    param_grid = {'period': BB_PERIODS, 'std_dev': [1.5, 2, 2.5, 3]}
+
+    def __init__(self, period, std_dev=STD_DEV):
+        super().__init__(period=period, std_dev=std_dev)
+        self.period = period
+        self.std_dev = std_dev
+
+    def indicators(self):
+        if self.std_dev == STD_DEV:
+            return [('bollinger', self.period)]
+        return [('ma', self.period), ('std', self.period)]
+
+    def bands(self, bars):
+        """(upper, lower) band arrays."""
+        if self.std_dev == STD_DEV:
+            return bars.column('bollinger', self.period, 'upper'), bars.column('bollinger', self.period, 'lower')
+        ma = bars.column('ma', self.period)
+        std = bars.column('std', self.period)
+        return ma + self.std_dev * std, ma - self.std_dev * std
+
+    def signals(self, bars):
+        upper, lower = self.bands(bars)
+        return crossed_below(bars.prices, lower), crossed_above(bars.prices, upper)
+
+def make_strategy(name, **params):
+    return STRATEGIES[name](**params)
+
+def expand_grid(name, grid=None):
+    """Yield (name, params) for every valid combination in a strategy's parameter grid."""
+    grid = grid or STRATEGIES[name].param_grid
+    keys = list(grid)
+    for values in itertools.product(*(grid[key] for key in keys)):
+        params = dict(zip(keys, values))
+        if make_strategy(name, **params).is_valid():
+            yield name, params
+
+def required_indicators(strategies):
+    """Union of the (indicator, period) columns a set of strategies reads."""
+    return sorted({indicator for strategy in strategies for indicator in strategy.indicators()})
+
+def summarize(trades, total_profit, equity_curve, dates=None):
+    """Metrics row for one backtest, from the array functions in ``utils.metrics``.
+
+    ``exposure`` needs the bar dates to place the trades and is left out without them.
+    """
+    stats = trade_metrics([t['profit'] for t in trades])
+    risk = equity_metrics(equity_curve)
+    num_trades = len(trades)
+    summary = {
+        'num_trades': num_trades,
+        'win_rate': float(stats['win_rate'][0]),
+        'profit_factor': float(stats['profit_factor'][0]),
+        'avg_profit_per_trade': (total_profit / num_trades) if num_trades > 0 else 0.0,
+        'max_drawdown': float(risk['max_drawdown'][0]),
+        'total_profit': total_profit,
+        'max_drawdown_duration': int(risk['max_drawdown_duration'][0]),
+        'sharpe': float(risk['sharpe'][0]),
+        'sortino': float(risk['sortino'][0]),
+        'calmar': float(risk['calmar'][0]),
+    }
+    if dates is not None:
+        summary['exposure'] = float(exposure(positions(dates, [trades]))[0])
+    return summary
+
+class StrategyEngine:
+    """Runs strategies over items from one IndicatorProvider.
+
+    Every (indicator, period) column is computed once per item for the
+    engine's lifetime, however many strategies or runs read it, so adding a
+    strategy to a session costs only its signal and fill step.
+    """
+
+    def __init__(self, provider=None):
+        self.provider = provider or IndicatorProvider()
+
+    def bars(self, item_id, strategies):
+        return self.provider.bars(item_id, required_indicators(strategies))
+
+    def backtest(self, item_id, strategy):
+        return strategy.backtest(self.bars(item_id, [strategy]))
+
+    def run(self, item_id, strategies, with_trades=False):
+        """Summary row per strategy: item_id, strategy name, params and metrics.
+
+        With ``with_trades`` each row also carries its trade list under 'trades'.
+        """
+        strategies = list(strategies)
+        bars = self.bars(item_id, strategies)
+        rows = []
+        for strategy in strategies:
+            trades, total_profit, equity = strategy.backtest(bars)
+            rows.append({'item_id': item_id, 'strategy': strategy.name, **strategy.params,
+                         **summarize(trades, total_profit, equity, bars.dates)})
+            if with_trades:
+                rows[-1]['trades'] = trades
+        return rows